@@ -0,0 +1,5 @@
+import sys
+from os.path import abspath, dirname
+
+# the modules are imported from the api-esp32-motor-control directory, as main.py does
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
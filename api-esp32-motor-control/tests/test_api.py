@@ -0,0 +1,63 @@
+import os
+import threading
+from time import sleep
+import pytest
+from fastapi.testclient import TestClient
+from utils.config import Config
+from utils.api import API
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    API connected to a pseudo-terminal; a firmware thread answers each start with "starting" after 0.2 s.
+    """
+    firmware, device = os.openpty()
+    (tmp_path / "config.ini").write_text(
+        f"[ESP32]\ncom_port = {os.ttyname(device)}\nbaud_rate = 115200\ntimeout = 2\n\n[API]\nhost = 127.0.0.1\nport = 8081\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    conf = Config()
+    conf.read_config_file()
+    api = API(conf)
+    api.esp32.connect()
+    api.commands = []
+
+    def answer():
+        try:
+            while True:
+                api.commands.append(os.read(firmware, 64))
+                sleep(0.2)
+                os.write(firmware, b"starting\n")
+        except OSError:
+            pass
+    threading.Thread(target=answer, daemon=True).start()
+    yield api
+    api.esp32.disconnect()
+    os.close(firmware)
+    os.close(device)
+
+def test_start(api):
+    response = TestClient(api.app).post("/start")
+
+    assert response.json() == {"message": "running"}
+    assert api.commands == [b"start\n"]
+
+def test_concurrent_starts_send_one_command(api):
+    statuses = []
+    def start():
+        statuses.append(TestClient(api.app).post("/start").status_code)
+    threads = [threading.Thread(target=start) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [200, 409]
+    assert api.commands == [b"start\n"]
+
+def test_start_while_running(api):
+    client = TestClient(api.app)
+    client.post("/start")
+
+    assert client.post("/start").status_code == 409
+    assert api.commands == [b"start\n"]
@@ -0,0 +1,51 @@
+import os
+import pytest
+from utils.esp32Serial import ESP32Serial
+
+@pytest.fixture
+def esp32():
+    """
+    ESP32Serial connected to a pseudo-terminal; the test writes the firmware lines on the other end.
+    """
+    firmware, device = os.openpty()
+    esp32 = ESP32Serial(os.ttyname(device), timeout=0.05)
+    esp32.connect()
+    esp32.firmware = firmware
+    yield esp32
+    esp32.disconnect()
+    os.close(firmware)
+    os.close(device)
+
+def test_lines_become_events(esp32):
+    after = esp32.sequence
+    os.write(esp32.firmware, b"ready\nstarting\n")
+
+    assert esp32.wait_for("starting", timeout=1, after=after)["sequence"] == after + 2
+    assert esp32.state == "running"
+    after = esp32.sequence
+    os.write(esp32.firmware, b"done\n")
+    assert esp32.wait_for("done", timeout=1, after=after)["line"] == "done"
+    assert esp32.state == "done"
+
+def test_line_split_by_the_read_timeout(esp32):
+    after = esp32.sequence
+    os.write(esp32.firmware, b"Error: mo")
+    with pytest.raises(TimeoutError):
+        esp32.wait_for("error", timeout=0.2, after=after)
+
+    os.write(esp32.firmware, b"tor stalled\n")
+    assert esp32.wait_for("error", timeout=1, after=after)["line"] == "Error: motor stalled"
+    assert esp32.state == "error"
+
+def test_only_events_after_the_sequence_count(esp32):
+    os.write(esp32.firmware, b"done\n")
+    esp32.wait_for("done", timeout=1, after=0)
+    after = esp32.sequence
+
+    with pytest.raises(TimeoutError):
+        esp32.wait_for("done", timeout=0.2, after=after)
+
+def test_commands_are_sent_as_lines(esp32):
+    esp32.send_command("start")
+
+    assert os.read(esp32.firmware, 64) == b"start\n"
@@ -1,37 +1,69 @@
 import uvicorn
+import threading
 from utils import ESP32Serial, Config, logger
-from fastapi import FastAPI
-from datetime import datetime
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
 
 class API:
     def __init__(self, conf: Config):
         self.conf = conf
 
         self.esp32 = ESP32Serial(port=conf.com_port, baudrate=conf.baud_rate, timeout=conf.timeout)
+        # one start at a time: held from the state check until the firmware confirms the start
+        self._start_lock = threading.Lock()
 
         self.app = FastAPI()
 
         @self.app.post("/start")
         def motor_start():
+            logger.info("Starting request received.")
+            if not self._start_lock.acquire(blocking=False):
+                logger.info("Starting request rejected: another start is waiting for the motor.")
+                return JSONResponse(status_code=409, content={"message": "busy"})
             try:
-                logger.info("Starting request received.")
-                self.esp32.send_command("start")
-
-                start_time = datetime.now()
-                while True:
-                    if (datetime.now() - start_time).seconds >= self.conf.timeout:
-                        raise TimeoutError("Timeout in motor start response.")
+                if self.esp32.state == "running":
+                    logger.info("Starting request rejected: the motor routine is already running.")
+                    return JSONResponse(status_code=409, content={"message": "busy"})
 
-                    response = self.esp32.read_response()
-                    if response == "starting":
-                        logger.info("Motor is starting.")
-                        break
+                sequence = self.esp32.sequence
+                self.esp32.send_command("start")
+                self.esp32.wait_for("starting", timeout=self.conf.timeout, after=sequence)
+                logger.info("Motor is starting.")
 
                 return {"message": "running"}
             except Exception as e:
                 logger.error(f"Error starting motor: {e}")
                 return {"message": "error"}
-            
+            finally:
+                self._start_lock.release()
+
+        @self.app.get("/status")
+        def motor_status(
+            wait_for: str = Query(None, pattern="^(starting|done|error)$"),
+            after: int = None,
+            timeout: float = Query(30.0, gt=0, le=300)
+        ):
+            """
+            State of the motor routine: idle, running, done or error.
+            - wait_for: holds the request until this event arrives (after the sequence number `after`, default: now),
+              so the caller does not need to poll; 408 if it does not arrive within timeout seconds.
+            """
+            if wait_for is not None:
+                try:
+                    self.esp32.wait_for(wait_for, timeout=timeout, after=after)
+                except TimeoutError as e:
+                    return JSONResponse(status_code=408, content={"message": str(e), **self._status()})
+            return self._status()
+
+    def _status(self) -> dict:
+        event = self.esp32.last_event
+        return {
+            "state": self.esp32.state,
+            "since": self.esp32.state_since.isoformat(),
+            "sequence": self.esp32.sequence,
+            "last_event": {"name": event["name"], "line": event["line"], "time": event["time"].isoformat()} if event else None,
+        }
+
     def start(self):
         try:
             self.esp32.connect()
@@ -48,7 +48,7 @@ class Config:
             # ESP32
             self._com_port = str(config["ESP32"]["com_port"])
             self._baud_rate = int(config["ESP32"]["baud_rate"])
-            self._timeout = int(config["ESP32"]["timeout"])
+            self._timeout = float(config["ESP32"]["timeout"])
 
             # API
             self._host = str(config["API"]["host"])
@@ -1,22 +1,64 @@
 import serial
+import threading
+from time import monotonic
+from datetime import datetime
 from utils.logger_config import logger
 
 class ESP32Serial:
+    """
+    Serial connection with the ESP32 motor controller.
+    - A background reader thread consumes every line sent by the firmware and turns it into an event,
+      so no message is left in the buffer to be mistaken for the answer of a later command.
+    - Events: "starting" (motor routine started), "done" (routine finished), "error" (firmware or serial error)
+      and "message" (any other line).
+    - state: "idle" until the first start, "running" after "starting", "done" after "done", "error" after an error.
+    """
+    EVENTS = {"starting": "running", "done": "done"}
+
     def __init__(self, port, baudrate=115200, timeout=1):
         """
         Initializes the serial connection with ESP32.
 
         :param port: Serial port to which ESP32 is connected.
         :param baudrate: Baud rate for transmission (default: 115200).
-        :param timeout: Timeout for reading in seconds (default: 1).
+        :param timeout: Timeout for reading in seconds (default: 1), also the reaction time of the reader thread to disconnect().
         """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.connection = None
 
+        self._state = "idle"
+        self._state_since = datetime.now()
+        self._events = []           # last events, oldest first
+        self._sequence = 0          # number of the last event received
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._reader = None
+        self._stop = threading.Event()
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def state_since(self):
+        return self._state_since
+
+    @property
+    def sequence(self):
+        """
+        Number of the last event received; pass it to wait_for() to wait only for the events after it.
+        """
+        return self._sequence
+
+    @property
+    def last_event(self):
+        with self._condition:
+            return dict(self._events[-1]) if self._events else None
+
     def connect(self):
-        """Establishes the serial connection."""
+        """Establishes the serial connection and starts the reader thread."""
         try:
             self.connection = serial.Serial(
                 port=self.port,
@@ -27,8 +69,16 @@ class ESP32Serial:
         except serial.SerialException as e:
             raise Exception(f"Error connecting to port {self.port}: {e}")
 
+        self._stop.clear()
+        self._reader = threading.Thread(target=self._read_routine, name="esp32-reader", daemon=True)
+        self._reader.start()
+
     def disconnect(self):
-        """Closes the serial connection."""
+        """Stops the reader thread and closes the serial connection."""
+        self._stop.set()
+        if self._reader is not None:
+            self._reader.join()
+            self._reader = None
         if self.connection and self.connection.is_open:
             self.connection.close()
             logger.info(f"Disconnected from {self.port}.")
@@ -41,15 +91,73 @@ class ESP32Serial:
         """
         if self.connection and self.connection.is_open:
             command_str = command + '\n'  # Adds a new line to the command
-            self.connection.write(command_str.encode('utf-8'))
+            with self._write_lock:
+                self.connection.write(command_str.encode('utf-8'))
             logger.info(f"Command '{command}' sent.")
         else:
             raise Exception("Serial connection is not open.")
 
-    def read_response(self):
-        """Reads the response from the serial connection."""
-        if self.connection and self.connection.is_open:
-            response = self.connection.readline().decode('utf-8').strip()
-            return response
-        else:
+    def wait_for(self, events, timeout:float, after:int=None) -> dict:
+        """
+        Waits for one of the events and returns it.
+
+        :param events: Event name, or names, to wait for (None: any event).
+        :param timeout: Maximum time to wait, in seconds.
+        :param after: Only events received after this sequence number count (default: events from now on).
+        """
+        if isinstance(events, str):
+            events = (events,)
+        deadline = monotonic() + timeout
+        with self._condition:
+            after = self._sequence if after is None else after
+            while True:
+                for event in self._events:
+                    if event["sequence"] > after and (events is None or event["name"] in events):
+                        return dict(event)
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timeout waiting for {', '.join(events) if events else 'an event'} from the ESP32.")
+                self._condition.wait(remaining)
+
+    def read_response(self, timeout:float=None):
+        """Returns the next line received from the ESP32 (the reader thread receives every line)."""
+        if not (self.connection and self.connection.is_open):
             raise Exception("Serial connection is not open.")
+        return self.wait_for(None, self.timeout if timeout is None else timeout)["line"]
+
+    def _read_routine(self):
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                # readline returns a partial line on timeout, kept until the end of the line arrives
+                pending += self.connection.readline()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.error(f"Error reading from {self.port}: {e}")
+                    self._add_event("error", str(e))
+                return
+            if not pending.endswith(b"\n"):
+                continue
+            line = pending.decode('utf-8', errors='replace').strip()
+            pending = b""
+            if not line:
+                continue
+            if line in self.EVENTS:
+                self._add_event(line, line)
+            elif line.lower().startswith("error"):
+                self._add_event("error", line)
+            else:
+                self._add_event("message", line)
+
+    def _add_event(self, name:str, line:str):
+        with self._condition:
+            self._sequence += 1
+            now = datetime.now()
+            self._events.append({"sequence": self._sequence, "name": name, "line": line, "time": now})
+            del self._events[:-100]
+            if name in self.EVENTS:
+                self._state, self._state_since = self.EVENTS[name], now
+            elif name == "error":
+                self._state, self._state_since = "error", now
+            self._condition.notify_all()
+        logger.info(f"ESP32 event '{name}': {line}")
@@ -0,0 +1,53 @@
+"""
+Benchmark of PointCloudManager.filter_by_distance with each outlier filter method, and of the scan line
+filter (scanline_inliers) applied to each scan as LidarSensor does during the acquisition.
+
+Usage (from the api-sick-lidar-measurement directory):
+    python benchmarks/bench_outlier_filters.py [--scans 500 2000 6000] [--methods statistical voxel scanline]
+"""
+import sys
+import argparse
+import numpy as np
+from time import perf_counter
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from utils.PointCloudManager import PointCloudManager
+from utils.scan_geometry import scanline_inliers
+from benchmarks.synthetic import slab_points
+
+METHODS = {
+    "statistical": {"nb_neighbors": 20, "std_ratio": 2.0},
+    "voxel": {"voxel_size": 0.005, "nb_neighbors": 20, "std_ratio": 2.0},
+    "none": {},
+}
+SCANLINE = {"window": 2, "threshold": 0.01, "min_neighbors": 1}
+
+def filter_scans(scans:list) -> np.ndarray:
+    """
+    Scan line filter of every scan, as LidarSensor applies it before accumulating the points.
+    """
+    return np.concatenate([points[scanline_inliers(points[:, 1], **SCANLINE)] for points in scans])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, nargs="+", default=[500, 2000, 6000])
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS) + ["scanline"], default=list(METHODS) + ["scanline"])
+    parser.add_argument("--distance", type=float, default=1.8)
+    args = parser.parse_args()
+
+    for scans in args.scans:
+        points = slab_points(scans)
+        for method in args.methods:
+            if method == "scanline":
+                start = perf_counter()
+                kept = len(filter_scans(np.split(points, scans)))
+                print(f"{len(points):>9d} points | {method:11s} {perf_counter() - start:8.3f} s | {kept:>9d} points kept (per scan)")
+                continue
+            pcm = PointCloudManager()
+            pcm.load_from_array(points)
+            start = perf_counter()
+            pcm.filter_by_distance(args.distance, method, METHODS[method])
+            elapsed = perf_counter() - start
+            print(f"{len(points):>9d} points | {method:11s} {elapsed:8.3f} s | {len(pcm.point_cloud.points):>9d} points kept")
@@ -0,0 +1,73 @@
+"""
+Benchmark of the point accumulator alone, with the scans of a full slab acquisition generated in memory
+(no socket, reader or parser: see the acquisition stage of run_benchmarks.py for the whole pipeline).
+- list: previous accumulator, one tuple of three floats per point, converted with np.array when loaded.
+- float64 / float32: PointBuffer, loaded with PointCloudManager.load_from_array.
+Each variant runs in its own process, so the reported peak RSS is not shared between them.
+
+Usage (from the api-sick-lidar-measurement directory):
+    python benchmarks/bench_point_accumulation.py [--length 10] [--step 0.001] [--values 841]
+"""
+import sys
+import argparse
+import resource
+import subprocess
+from time import perf_counter
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import numpy as np
+from utils.point_buffer import PointBuffer
+from utils.scan_geometry import to_points
+from utils.PointCloudManager import PointCloudManager
+
+VARIANTS = ("list", "float64", "float32")
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_variant(variant: str, scans: int, values: int, step: float) -> None:
+    distances = 1.5 + 0.002 * np.sin(np.arange(values) / 50.0)
+    dtype = np.float32 if variant == "float32" else np.float64
+    baseline = peak_rss_mb()
+
+    start = perf_counter()
+    if variant == "list":
+        pcd = []
+        for n in range(scans):
+            pcd.extend(map(tuple, to_points(distances, 55.0, 1/12, n * step).tolist()))
+    else:
+        pcd = PointBuffer(dtype)
+        for n in range(scans):
+            pcd.append(to_points(distances, 55.0, 1/12, n * step, dtype))
+    accumulated = perf_counter() - start
+    accumulated_rss = peak_rss_mb()
+
+    start = perf_counter()
+    pcm = PointCloudManager()
+    if variant == "list":
+        pcm.load_from_list(pcd)
+    else:
+        pcm.load_from_array(pcd.view())
+    loaded = perf_counter() - start
+
+    print(f"{variant:8s} {scans*values:>10d} points | accumulate {accumulated:6.2f} s, peak RSS +{accumulated_rss-baseline:7.0f} MB"
+          f" | load {loaded:5.2f} s, peak RSS +{peak_rss_mb()-baseline:7.0f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--length", type=float, default=10.0, help="slab length in meters")
+    parser.add_argument("--step", type=float, default=0.001, help="slab displacement between two scans in meters")
+    parser.add_argument("--values", type=int, default=841, help="distance values per scan")
+    parser.add_argument("--variant", choices=VARIANTS, help="run a single variant in this process")
+    args = parser.parse_args()
+
+    scans = int(args.length / args.step)
+    if args.variant:
+        run_variant(args.variant, scans, args.values, args.step)
+    else:
+        for variant in VARIANTS:
+            subprocess.run([sys.executable, abspath(__file__), "--variant", variant,
+                            "--length", str(args.length), "--step", str(args.step), "--values", str(args.values)], check=True)
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark of the CoLa A LMDscandata parser.
+- Compares the previous list based parser with ColaA_TCP.extract_telegram on the same synthetic telegram.
+
+Usage (from the api-sick-lidar-measurement directory):
+    python benchmarks/bench_telegram_parser.py [--scans 2000] [--values 841]
+"""
+import sys
+import math
+import argparse
+from time import perf_counter
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from utils.CoLaA_TCP import ColaA_TCP
+
+def synthetic_telegram(value_count: int = 841, ticks: int = 1000) -> str:
+    """
+    LMS4000 like LMDscandata answer: 55° to 125° with 1/12° of angular step and one encoder.
+    """
+    distances = [int((1500 + 20 * math.sin(n / 50.0)) * 10) for n in range(value_count)]
+    head = f"sRA LMDscandata 1 1 89A27F 0 0 343 347 27477BA9 2747813B 0 0 7 0 0 EA60 168 1 {ticks:X} 0 1 DIST1 3DCCCCCD 00000000 86470 341 {value_count:X}"
+    return " ".join([head] + [f"{d:X}" for d in distances] + ["0"] * 6)
+
+def legacy_extract_telegram(data: str):
+    """
+    Parser used before the vectorized one: one Python object per value and per trigonometric call.
+    """
+    telegram = data.split()
+    encoder = telegram[18:21]
+    body = telegram[21:]
+    scale_factor = 0.1
+    start_angle = int(body[4], 16)/10000.0
+    angle_step = int(body[5], 16) / 10000.0
+    value_count = int(body[6], 16)
+    distances = list(map(lambda x: (int(x, 16) * scale_factor)/1000.0, body[7:7+value_count]))
+    angles = [start_angle + angle_step * n for n in range(value_count)]
+    x = list(map(lambda r, t: r * math.cos(math.radians(t)), distances, angles))
+    y = list(map(lambda r, t: r * math.sin(math.radians(t)), distances, angles))
+    current_position = int(encoder[1], 16) * 0.2 / 1000
+    z = [current_position] * len(x)
+    return list(zip(*(x, y, z)))
+
+def scans_per_second(parser, telegram, scans: int) -> float:
+    start = perf_counter()
+    for _ in range(scans):
+        parser(telegram)
+    return scans / (perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=2000)
+    parser.add_argument("--values", type=int, default=841)
+    args = parser.parse_args()
+
+    telegram = synthetic_telegram(args.values)
+    com = ColaA_TCP("127.0.0.1", 2112)
+
+    before = scans_per_second(legacy_extract_telegram, telegram, args.scans)
+    after_str = scans_per_second(com.extract_telegram, telegram, args.scans)
+    after_bytes = scans_per_second(com.extract_telegram, telegram.encode(), args.scans)
+
+    print(f"{args.values} values per scan, {args.scans} scans")
+    print(f"legacy parser        : {before:10.0f} scans/s")
+    print(f"vectorized (str)     : {after_str:10.0f} scans/s ({after_str/before:.1f}x)")
+    print(f"vectorized (bytes)   : {after_bytes:10.0f} scans/s ({after_bytes/before:.1f}x)")
@@ -0,0 +1,278 @@
+"""
+End-to-end benchmark of the measurement pipeline, offline, with a machine-readable report.
+- parse: ColaA_TCP.extract_telegram on synthetic telegrams (or on a recorded capture with --capture).
+- acquisition: LMS4000 acquisition in stream mode (socket reader, parser workers and _consume) from
+  simulator.py serve in another process. The scans come in real time, so the duration is set by the slab
+  length; the CPU time and the parse latency of the scans give the cost of the pipeline.
+- accumulate: scan points appended to the PointBuffer, as LMS4000 does for each scan,
+  or binned in a HeightMap (variant heightmap), without the acquisition pipeline.
+- load: PointCloudManager.load_from_array of the accumulated points (or of the height map cells).
+- filter: PointCloudManager.filter_by_distance with each outlier filter method, and the scan line filter
+  of every scan (variant scanline), as LidarSensor applies it during the acquisition.
+- wmuss: PointCloudManager.WMUSS.
+- wmrsf: PointCloudManager.WMRSF (robust reference plane on a subsample).
+- plot: WarpingPlot.render of the WMUSS chart.
+- save: save_to_file / save_to_npy in each storage format.
+Each stage runs --repeat times per cloud size; the report keeps every run and the median.
+With --compare, the medians are compared with a previous report and the exit code is 1 if a stage
+got slower than the tolerance.
+
+Usage (from the api-sick-lidar-measurement directory):
+    python benchmarks/run_benchmarks.py [--scans 500 2000 6000] [--representations points heightmap] [--output report.json] [--compare baseline.json]
+"""
+import sys
+import json
+import argparse
+import platform
+import socket
+import subprocess
+import tempfile
+from time import perf_counter, process_time, sleep
+from datetime import datetime
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import numpy as np
+import open3d as o3d
+from utils.CoLaA_TCP import ColaA_TCP
+from utils.lms4000 import LMS4000
+from utils.point_buffer import PointBuffer
+from utils.height_map import HeightMap
+from utils.PointCloudManager import PointCloudManager
+from utils.lms4000_simulator import SlabProfile, Capture, scan_telegram
+from benchmarks.synthetic import slab_points
+from benchmarks.bench_outlier_filters import METHODS, filter_scans
+
+SAVE_FORMATS = ("pcd", "pcd_compressed", "npy")
+
+def synthetic_telegrams(count:int, values:int=841) -> list[bytes]:
+    """
+    LMDscandata events of a slab passing at 1 m/s, as sent by the LMS4000 at 600 Hz.
+    """
+    profile = SlabProfile(slab_length=count / 600.0)
+    sin_angles = np.sin(np.radians(55.0 + np.arange(values) / 12))
+    telegrams = []
+    for n in range(count):
+        z = n / 600.0
+        distances_mm = profile.distances(z, sin_angles) * 1000
+        # without STX/ETX, as returned by the framer
+        telegrams.append(scan_telegram("sSN", n, n, n * 1667, n * 1667, int(z / 0.0002), distances_mm)[1:-1])
+    return telegrams
+
+def percentiles(latencies:list) -> dict:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000, "max_ms": max(latencies) * 1000}
+
+def timed(function) -> float:
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+def bench_parse(telegrams:list, repeat:int) -> dict:
+    com = ColaA_TCP("127.0.0.1", 2112)
+    runs, latencies = [], []
+    for _ in range(repeat):
+        start = perf_counter()
+        for telegram in telegrams:
+            t = perf_counter()
+            com.extract_telegram(telegram)
+            latencies.append(perf_counter() - t)
+        runs.append(perf_counter() - start)
+    return result("parse", "extract_telegram", len(telegrams), runs, unit="scans", latencies=latencies)
+
+def start_simulator(length:float) -> tuple[subprocess.Popen, int]:
+    """
+    simulator.py serve on a free local port, in its own process so its CPU time is not measured.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, join(dirname(dirname(abspath(__file__))), "simulator.py"), "serve", "--port", str(port), "--slab-length", str(length)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, port
+        except OSError:
+            sleep(0.1)
+    process.kill()
+    raise Exception("The simulator did not start.")
+
+def bench_acquisition(length:float, parser_workers:int, repeat:int) -> dict:
+    process, port = start_simulator(length)
+    runs, cpu, latencies = [], [], []
+    try:
+        for _ in range(repeat):
+            sensor = LMS4000("127.0.0.1", port, 55, 125, "stream", parser_workers=parser_workers)
+            start, start_cpu = perf_counter(), process_time()
+            sensor.data_acquisition_routine()
+            runs.append(perf_counter() - start)
+            cpu.append(process_time() - start_cpu)
+            latencies.append(sensor.scan_summary.get("parse_ms"))
+    finally:
+        process.terminate()
+        process.wait()
+    entry = result("acquisition", f"stream_{parser_workers}_parsers", sensor.scans_received, runs, unit="scans")
+    entry.update({"cpu_s": cpu, "cpu_per_scan_ms": float(np.median(cpu)) / max(sensor.scans_received, 1) * 1000, "parse_latency_ms": latencies})
+    print(f"{'':44s} | cpu {entry['cpu_per_scan_ms']:.3f} ms/scan | parse p99 {(latencies[-1] or {}).get('p99', 0):.2f} ms")
+    return entry
+
+def bench_accumulate(scans:list, repeat:int) -> tuple[dict, np.ndarray]:
+    runs, latencies = [], []
+    for _ in range(repeat):
+        buffer = PointBuffer(np.float64, initial_capacity=1_000_000)
+        start = perf_counter()
+        for points in scans:
+            t = perf_counter()
+            buffer.append(points)
+            latencies.append(perf_counter() - t)
+        runs.append(perf_counter() - start)
+    return result("accumulate", "float64", len(buffer), runs, latencies=latencies), buffer.view()
+
+def bench_height_map(scans:list, z_bin_size:float, repeat:int) -> tuple[dict, np.ndarray]:
+    runs, latencies = [], []
+    for _ in range(repeat):
+        height_map = HeightMap(z_bin_size)
+        start = perf_counter()
+        for points in scans:
+            t = perf_counter()
+            height_map.add(points)
+            latencies.append(perf_counter() - t)
+        runs.append(perf_counter() - start)
+    return result("accumulate", "heightmap", height_map.samples, runs, latencies=latencies), height_map.points()
+
+def bench_scanline(scans:list, repeat:int) -> dict:
+    return result("filter", "scanline", sum(len(points) for points in scans), [timed(lambda: filter_scans(scans)) for _ in range(repeat)])
+
+def bench_cloud(points:np.ndarray, distance:float, methods:list, repeat:int, directory:str) -> list[dict]:
+    results = []
+    results.append(result("load", "load_from_array", len(points), [timed(lambda: PointCloudManager().load_from_array(points)) for _ in range(repeat)]))
+
+    for method in methods:
+        runs = []
+        for _ in range(repeat):
+            pcm = PointCloudManager()
+            pcm.load_from_array(points)
+            runs.append(timed(lambda: pcm.filter_by_distance(distance, method, METHODS[method])))
+        results.append(result("filter", method, len(points), runs))
+
+    # the next stages run on the cloud after the default filter, as in the measurement
+    pcm = PointCloudManager()
+    pcm.load_from_array(points)
+    pcm.filter_by_distance(distance, "statistical", METHODS["statistical"])
+    filtered = len(pcm.point_cloud.points)
+
+    runs, plots = [], []
+    for _ in range(repeat):
+        start = perf_counter()
+        plots.append(pcm.WMUSS()[1])
+        runs.append(perf_counter() - start)
+    results.append(result("wmuss", "WMUSS", filtered, runs))
+    results.append(result("wmrsf", "WMRSF", filtered, [timed(pcm.WMRSF) for _ in range(repeat)]))
+    results.append(result("plot", "render", filtered, [timed(plot.render) for plot in plots]))
+
+    for format in SAVE_FORMATS:
+        filename = join(directory, f"bench_{format}")
+        if format == "npy":
+            save = lambda: pcm.save_to_npy(filename, {"benchmark": True})
+        else:
+            save = lambda: pcm.save_to_file(filename, format="pcd", compressed=format == "pcd_compressed")
+        results.append(result("save", format, filtered, [timed(save) for _ in range(repeat)]))
+    return results
+
+def result(stage:str, variant:str, size:int, runs:list, unit:str="points", latencies:list=None) -> dict:
+    median = float(np.median(runs))
+    entry = {
+        "stage": stage,
+        "variant": variant,
+        "size": size,
+        "unit": unit,
+        "runs_s": runs,
+        "median_s": median,
+        "throughput_per_s": size / median if median > 0 else None,
+    }
+    if latencies:
+        entry["latency"] = percentiles(latencies)
+    print(f"{stage:10s} {variant:16s} {size:>9d} {unit:6s} | median {median:8.4f} s | {entry['throughput_per_s'] or 0:14.0f} {unit}/s")
+    return entry
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=dirname(abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "open3d": o3d.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+def compare(report:dict, baseline_path:str, tolerance:float) -> bool:
+    """
+    Prints the median ratio of each stage against the baseline report and returns False on a regression.
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    previous = {(r["stage"], r["variant"], r["size"]): r["median_s"] for r in baseline["results"]}
+    ok = True
+    print(f"\nComparison with {baseline_path} ({baseline['environment'].get('commit', '')}):")
+    for r in report["results"]:
+        key = (r["stage"], r["variant"], r["size"])
+        if key not in previous:
+            continue
+        ratio = r["median_s"] / previous[key] if previous[key] > 0 else float("inf")
+        regression = ratio > 1 + tolerance
+        ok &= not regression
+        print(f"{r['stage']:10s} {r['variant']:16s} {r['size']:>9d} | {previous[key]:8.4f} s -> {r['median_s']:8.4f} s ({ratio:5.2f}x){'  REGRESSION' if regression else ''}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, nargs="+", default=[500, 2000, 6000], help="cloud sizes, in scans of 841 points")
+    parser.add_argument("--telegrams", type=int, default=2000, help="telegrams parsed by the parse stage")
+    parser.add_argument("--capture", help="recorded capture (simulator.py record) to parse instead of synthetic telegrams")
+    parser.add_argument("--acquisition-length", type=float, default=2.0, help="slab length, in meters, of the acquisition stage (0 skips it)")
+    parser.add_argument("--parser-workers", type=int, default=1, help="parser workers of the acquisition stage")
+    parser.add_argument("--filters", nargs="+", choices=list(METHODS), default=list(METHODS))
+    parser.add_argument("--representations", nargs="+", choices=["points", "heightmap"], default=["points", "heightmap"],
+                        help="clouds measured after the accumulate stage: raw points and/or height map cells")
+    parser.add_argument("--z-bin-size", type=float, default=0.005, help="Z bin of the height map, in meters")
+    parser.add_argument("--distance", type=float, default=1.8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="previous report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="slowdown accepted by --compare (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    telegrams = [telegram for _, telegram in Capture.load(args.capture)] if args.capture else synthetic_telegrams(args.telegrams)
+    results = [bench_parse(telegrams, args.repeat)]
+    if args.acquisition_length > 0:
+        results.append(bench_acquisition(args.acquisition_length, args.parser_workers, args.repeat))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for scans in args.scans:
+            scan_points = np.split(slab_points(scans), scans)
+            if "points" in args.representations:
+                accumulated, points = bench_accumulate(scan_points, args.repeat)
+                results.append(accumulated)
+                results.append(bench_scanline(scan_points, args.repeat))
+                results.extend(bench_cloud(points, args.distance, args.filters, args.repeat, directory))
+            if "heightmap" in args.representations:
+                accumulated, points = bench_height_map(scan_points, args.z_bin_size, args.repeat)
+                results.append(accumulated)
+                results.extend(bench_cloud(points, args.distance, args.filters, args.repeat, directory))
+
+    report = {"environment": environment(), "parameters": vars(args), "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nReport written to {args.output}")
+
+    if args.compare and not compare(report, args.compare, args.tolerance):
+        sys.exit(1)
@@ -0,0 +1,21 @@
+"""
+Synthetic LMS4000 data used by the benchmarks.
+"""
+import numpy as np
+from utils.scan_geometry import to_points
+
+def slab_points(scans:int, values:int=841, step:float=0.001, outliers:float=0.001, seed:int=0) -> np.ndarray:
+    """
+    Scan-ordered (scans*values, 3) cloud of a warped slab seen from 1.5 m, like the LMS4000 acquisition produces.
+    - step: slab displacement between two scans, in meters.
+    - outliers: fraction of points replaced by spurious returns (spikes of up to 0.5 m).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.empty((scans * values, 3))
+    for n in range(scans):
+        z = n * step
+        distances = 1.5 - 0.01 * np.sin(np.pi * z / max(scans * step, step)) + rng.normal(0, 0.001, values)
+        points[n*values:(n+1)*values] = to_points(distances, 55.0, 1/12, z)
+    spikes = rng.random(len(points)) < outliers
+    points[spikes, 1] += rng.uniform(-0.5, 0.5, int(spikes.sum()))
+    return points
@@ -0,0 +1,56 @@
+import argparse
+from os.path import join, isabs
+from os import getcwd
+from datetime import datetime
+from utils import Config, logger
+from utils.post_processing import warping_task
+from utils.measurement_history import end_time
+from utils.reprocessing import ResultCache, find_point_clouds, reprocess, write_results
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Recomputes the warping of the saved point clouds with the filtering and warping parameters of config.ini.",
+        epilog="The saved point clouds were already cut by distance and filtered when they were measured, so the "
+               "reprocessing can only remove more points: a looser distance or filter does not bring back the removed ones."
+    )
+    parser.add_argument("directory", nargs="?", help="Directory of the point clouds (default: [STORAGE] directory).")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, help="First measurement time, e.g. 2024-05-01 or 2024-05-01T06:00.")
+    parser.add_argument("--to", dest="end", type=end_time, help="Last measurement time, e.g. 2024-05-31 (the whole day) or 2024-05-31T18:00.")
+    parser.add_argument("--method", choices=[method for method in Config.WARPING_METHODS if method != "incremental"], help="Warping method (default: [API] warping_method).")
+    parser.add_argument("--distance", type=float, help="Distance cut, in meters (default: [API] distance).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU core).")
+    parser.add_argument("--output", default="reprocessed.csv", help="Results file, .csv or .parquet.")
+    parser.add_argument("--cache", help="Cache of the results (default: reprocess_cache.db in the directory).")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        conf = Config()
+        conf.read_config_file()
+
+        directory = args.directory or conf.STORAGE_directory
+        directory = directory if isabs(directory) else join(getcwd(), directory)
+
+        task = warping_task(conf)
+        if args.method:
+            task["warping_method"] = args.method
+        if args.distance is not None:
+            task["distance"] = args.distance
+
+        files = find_point_clouds(directory, args.start, args.end)
+        cache = ResultCache(args.cache or join(directory, "reprocess_cache.db"))
+        try:
+            rows = reprocess(files, task, cache, args.workers)
+        finally:
+            cache.close()
+        write_results(rows, args.output)
+
+        errors = sum(1 for row in rows if row["error"])
+        print(f"{len(rows)} point clouds, {sum(1 for row in rows if row['cached'])} from the cache, {errors} with errors: {args.output}")
+    except KeyboardInterrupt:
+        logger.info("Reprocessing interrupted; the results already computed are cached.")
+    except Exception as e:
+        logger.error(f"Error reprocessing the point clouds: {e}")
+        print(f"Error: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,54 @@
+import argparse
+from utils.logger_config import logger
+from utils.lms4000_simulator import LMS4000Simulator, SlabProfile, Capture
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local LMS4000 (CoLa A) simulator, to run the measurement without the sensor.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve synthetic scans or replay a capture.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=2112)
+    serve.add_argument("--scan-frequency", type=float, default=600.0, help="Scans per second (Hz).")
+    serve.add_argument("--start-angle", type=float, default=55.0)
+    serve.add_argument("--stop-angle", type=float, default=125.0)
+    serve.add_argument("--distance", type=float, default=1.5, help="Distance from the sensor to the slab surface (m).")
+    serve.add_argument("--slab-length", type=float, default=10.0, help="Slab length (m).")
+    serve.add_argument("--warping", type=float, default=0.01, help="Warping of the slab (m).")
+    serve.add_argument("--speed", type=float, default=1.0, help="Conveyor speed (m/s).")
+    serve.add_argument("--noise", type=float, default=0.001, help="Standard deviation of the range noise (m).")
+    serve.add_argument("--replay", help="Capture file to replay at its original timing instead of synthetic scans.")
+
+    record = subparsers.add_parser("record", help="Record the scans of a real sensor to a capture file.")
+    record.add_argument("--ip", default="169.254.241.41")
+    record.add_argument("--port", type=int, default=2112)
+    record.add_argument("--duration", type=float, default=10.0, help="Seconds to record.")
+    record.add_argument("output", help="Capture file.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        if args.command == "record":
+            Capture.record(args.ip, args.port, args.output, args.duration)
+        else:
+            simulator = LMS4000Simulator(
+                host=args.host,
+                port=args.port,
+                scan_frequency=args.scan_frequency,
+                start_angle=args.start_angle,
+                stop_angle=args.stop_angle,
+                profile=SlabProfile(
+                    distance=args.distance,
+                    slab_length=args.slab_length,
+                    warping=args.warping,
+                    speed=args.speed,
+                    noise=args.noise
+                ),
+                capture=Capture.load(args.replay) if args.replay else None
+            )
+            simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(e)
@@ -0,0 +1,38 @@
+import sys
+import time
+from configparser import ConfigParser
+from os.path import abspath, dirname, join
+import pytest
+
+# the modules are imported from the api-sick-lidar-measurement directory, as main.py does
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+CONFIG = join(dirname(dirname(abspath(__file__))), "config.ini")
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """
+    Writes a copy of the shipped config.ini, with the given changes, in the working directory.
+    """
+    def write(**sections):
+        config = ConfigParser()
+        config.read(CONFIG)
+        for section, values in sections.items():
+            if not config.has_section(section):
+                config.add_section(section)
+            config[section].update(values)
+        with open(tmp_path / "config.ini", "w") as file:
+            config.write(file)
+    monkeypatch.chdir(tmp_path)
+    return write
+
+@pytest.fixture
+def local_utc_minus_3(monkeypatch):
+    """
+    Local time zone of the process set to UTC-3 for the test, so aware and local times differ.
+    """
+    with monkeypatch.context() as patch:
+        patch.setenv("TZ", "BRT3")
+        time.tzset()
+        yield
+    time.tzset()
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from utils.config import Config
+from utils.api import API
+
+START = datetime(2024, 5, 1, 6, 0)
+
+@pytest.fixture
+def api(config_file):
+    config_file(LMS4000={"persistent_session": "false"})
+    conf = Config()
+    conf.read_config_file()
+    api = API(conf)
+    for n in range(48):
+        api.measure.history.add(START + timedelta(hours=n), 0.01, 1000, {})
+    yield api
+    api.jobs.shutdown()
+    api.measure.shutdown()
+
+def measurements(api:API, **params) -> list[str]:
+    response = TestClient(api.app).get("/measurements", params=dict(params, limit=1000))
+    assert response.status_code == 200
+    return [item["timestamp"] for item in response.json()["items"]]
+
+def test_date_only_to_includes_the_whole_day(api):
+    items = measurements(api, **{"from": "2024-05-01", "to": "2024-05-01"})
+
+    assert len(items) == 18
+    assert items[0] == "2024-05-01T23:00:00" and items[-1] == "2024-05-01T06:00:00"
+
+def test_times_with_a_zone_are_converted_to_local_time(api, local_utc_minus_3):
+    # 12:00 to 15:00 UTC is 09:00 to 12:00 local time
+    items = measurements(api, **{"from": "2024-05-01T12:00:00Z", "to": "2024-05-01T15:00:00+00:00"})
+
+    assert items == [f"2024-05-01T{hour:02d}:00:00" for hour in range(12, 8, -1)]
+
+def test_invalid_to(api):
+    assert TestClient(api.app).get("/measurements", params={"to": "yesterday"}).status_code == 422
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from utils.CoLaA_TCP import ColaA_TCP
+
+# LMDscandata answer of 3 beams from 90° in steps of 0.5°, with the LMS4000 scale factor (0.1) and a zero value,
+# at 1000 encoder ticks
+TELEGRAM = (
+    b"sRA LMDscandata 1 1 89A27F 0 0 7 9 3E8 7D0 0 0 0 0 0 EA60 C350 "
+    b"1 3E8 0 "
+    b"1 DIST1 3DCCCCCD 00000000 DBBA0 1388 3 2710 0 4E20 "
+    b"0 0 0 0 0 0"
+)
+
+def test_extract_telegram():
+    points = ColaA_TCP("127.0.0.1", 2112, encoder_resolution=0.2).extract_telegram(memoryview(TELEGRAM))
+
+    assert points.shape == (3, 3)
+    np.testing.assert_allclose(points[:, 1], [1.0, 0.0, 2.0 * np.cos(np.radians(1.0))], atol=1e-6)
+    np.testing.assert_allclose(points[:, 0], [0.0, 0.0, -2.0 * np.sin(np.radians(1.0))], atol=1e-6)
+    # 1000 ticks of 0.2 mm
+    np.testing.assert_allclose(points[:, 2], 0.2)
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_extract_telegram_point_dtype(dtype):
+    assert ColaA_TCP("127.0.0.1", 2112, dtype).extract_telegram(TELEGRAM.decode()).dtype == dtype
+
+def test_extract_header():
+    assert ColaA_TCP.extract_header(memoryview(TELEGRAM)) == (7, 9, 1000, 2000, (0, 0))
@@ -0,0 +1,75 @@
+import socket
+import struct
+import numpy as np
+import pytest
+from utils.CoLaB_TCP import ColaB_TCP
+
+def scan_payload(command:bytes=b"sRA", encoder_ticks:int=1000, distances_mm=(1000, 2000, 0), start_angle:float=90.0,
+                 angle_step:float=0.5, telegram_counter:int=7, scan_counter:int=9) -> bytes:
+    """
+    LMDscandata payload in the binary layout read by ColaB_TCP (one encoder, one 16-bit distance channel, scale 1).
+    """
+    header = ColaB_TCP.SCAN_HEADER.pack(1, 1, 0x89A27F, 0, 0, telegram_counter, scan_counter, 1000, 2000, 0, 0, 0, 60000, 50000, 1)
+    encoder = ColaB_TCP.ENCODER.pack(encoder_ticks, 0)
+    channel = ColaB_TCP.CHANNEL.pack(b"DIST1", 1.0, 0.0, int(start_angle * 10000), int(angle_step * 10000), len(distances_mm))
+    values = np.asarray(distances_mm, dtype='>u2').tobytes()
+    return command + b" LMDscandata " + header + encoder + struct.pack('>H', 1) + channel + values
+
+def frame(payload:bytes) -> bytes:
+    return ColaB_TCP.STX + struct.pack('>I', len(payload)) + payload + bytes([ColaB_TCP.checksum(payload)])
+
+@pytest.fixture
+def connection():
+    """
+    ColaB_TCP connected to one end of a socket pair; the test plays the sensor on the other end.
+    """
+    client, sensor = socket.socketpair()
+    com = ColaB_TCP("127.0.0.1", 2111, buffer_size=16)
+    com.socket_sick = client
+    yield com, sensor
+    client.close()
+    sensor.close()
+
+def test_extract_telegram_decodes_distances_angles_and_encoder():
+    points = ColaB_TCP("127.0.0.1", 2111, encoder_resolution=0.2).extract_telegram(memoryview(scan_payload()))
+
+    np.testing.assert_allclose(points[:, 0], [0.0, -2.0 * np.sin(np.radians(0.5)), 0.0], atol=1e-9)
+    np.testing.assert_allclose(points[:, 1], [1.0, 2.0 * np.cos(np.radians(0.5)), 0.0], atol=1e-9)
+    # 1000 ticks of 0.2 mm
+    np.testing.assert_allclose(points[:, 2], 0.2)
+
+def test_extract_telegram_without_distance_channel():
+    payload = scan_payload()
+    head = len(b"sRA LMDscandata ") + ColaB_TCP.SCAN_HEADER.size + ColaB_TCP.ENCODER.size
+    with pytest.raises(Exception, match="no distance channel"):
+        ColaB_TCP("127.0.0.1", 2111).extract_telegram(memoryview(payload[:head] + struct.pack('>H', 0)))
+
+def test_receive_telegram_reads_split_frames_and_grows_the_buffer(connection):
+    com, sensor = connection
+    payload = scan_payload()
+    data = frame(payload)
+    sensor.sendall(data[:5])
+    sensor.sendall(data[5:])
+
+    assert bytes(com.receive_telegram()) == payload
+
+def test_receive_telegram_rejects_a_bad_checksum(connection):
+    com, sensor = connection
+    data = bytearray(frame(b"sAN Run \x01"))
+    data[-1] ^= 0xFF
+    sensor.sendall(data)
+
+    with pytest.raises(Exception, match="checksum"):
+        com.receive_telegram()
+
+def test_send_socket_skips_streamed_scans(connection):
+    com, sensor = connection
+    sensor.sendall(frame(scan_payload(b"sSN")) + frame(scan_payload(b"sSN")) + frame(b"sAN Run \x01"))
+
+    assert bytes(com.send_socket(b"sMN Run")) == b"sAN Run \x01"
+    assert sensor.recv(64) == frame(b"sMN Run")
+
+def test_extract_header():
+    header = ColaB_TCP("127.0.0.1", 2111).extract_header(memoryview(scan_payload(telegram_counter=0xFFFF, scan_counter=3)))
+
+    assert header == (0xFFFF, 3, 1000, 2000, (0, 0))
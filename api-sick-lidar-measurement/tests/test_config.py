@@ -0,0 +1,25 @@
+import pytest
+from utils.config import Config
+
+def read() -> Config:
+    conf = Config()
+    conf.read_config_file()
+    return conf
+
+@pytest.mark.parametrize("method", Config.WARPING_METHODS)
+def test_warping_methods(config_file, method):
+    config_file(API={"warping_method": method})
+
+    assert read().warping_method == method
+
+def test_unsupported_warping_method(config_file):
+    config_file(API={"warping_method": "wmus"})
+
+    with pytest.raises(Exception, match="Unsupported warping method: wmus"):
+        read()
+
+def test_surface_iterations(config_file):
+    config_file(SURFACE={"iterations": "0"})
+
+    with pytest.raises(Exception, match="iterations must be at least 1"):
+        read()
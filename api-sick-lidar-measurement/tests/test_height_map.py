@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from utils.height_map import HeightMap
+
+def scan(z:float, y=1.5, beams:int=4) -> np.ndarray:
+    return np.column_stack((np.arange(beams, dtype=float), np.broadcast_to(y, beams), np.full(beams, z)))
+
+def test_scans_in_the_same_row_are_averaged():
+    height_map = HeightMap(z_bin_size=0.01)
+    height_map.add(scan(0.001, y=1.4))
+    height_map.add(scan(0.009, y=1.6))
+    height_map.add(scan(0.015))
+
+    assert height_map.shape == (2, 4)
+    assert height_map.samples == 12 and height_map.cells == 8
+    points = height_map.points()
+    np.testing.assert_allclose(points[:4], scan(0.005, y=1.5))
+    np.testing.assert_allclose(points[4:], scan(0.015))
+
+def test_rows_grow_past_the_initial_capacity():
+    height_map = HeightMap(z_bin_size=0.005, initial_rows=4)
+    for z in np.arange(0.1, 0.2, 0.005):
+        height_map.add(scan(z + 0.001))
+
+    assert height_map.shape == (20, 4)
+    np.testing.assert_allclose(np.unique(height_map.points()[:, 2]), np.arange(0.1, 0.2, 0.005) + 0.0025)
+
+def test_invalid_points_leave_their_cell_untouched():
+    height_map = HeightMap(z_bin_size=0.01)
+    height_map.add(scan(0.0, y=[1.5, 9.0, 1.5, 1.5]), valid=np.array([True, False, True, True]))
+    height_map.add(scan(0.0))
+
+    assert height_map.samples == 7 and height_map.cells == 4
+    np.testing.assert_allclose(height_map.points()[:, 1], 1.5)
+
+def test_scan_across_rows():
+    # a pitched sensor sees one scan over several Z rows
+    points = scan(0.0)
+    points[:, 2] = [0.0, 0.01, 0.02, 0.03]
+    height_map = HeightMap(z_bin_size=0.01)
+    height_map.add(points)
+
+    assert height_map.shape == (4, 4) and height_map.cells == 4
+    np.testing.assert_allclose(height_map.points()[:, 0], [0, 1, 2, 3])
+
+def test_invalid_scans():
+    height_map = HeightMap(z_bin_size=0.01)
+    height_map.add(scan(0.1))
+
+    with pytest.raises(ValueError, match="4 beams"):
+        height_map.add(scan(0.1, beams=5))
+    with pytest.raises(ValueError, match="only grows forward"):
+        height_map.add(scan(0.05))
+    with pytest.raises(ValueError, match="positive"):
+        HeightMap(z_bin_size=0)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from utils.scan_geometry import to_points
+from utils.incremental_warping import IncrementalWarping
+from utils.PointCloudManager import PointCloudManager
+
+def scans(count:int=200, warping:float=0.01, seed:int=0) -> list[np.ndarray]:
+    """
+    Scans of a slab seen from 1.5 m, lifted by warping * sin along its length, with range noise.
+    """
+    rng = np.random.default_rng(seed)
+    result = []
+    for n in range(count):
+        z = n * 0.005
+        distances = 1.5 - warping * np.sin(np.pi * n / count) + rng.normal(0, 0.001, 841)
+        result.append(to_points(distances, 55.0, 1/12, z))
+    return result
+
+def test_matches_wmuss_on_the_same_points():
+    data = scans()
+    incremental = IncrementalWarping(y_resolution=0.0001)
+    for points in data:
+        incremental.update(points)
+    pcm = PointCloudManager()
+    pcm.load_from_array(np.concatenate(data))
+    expected, _ = pcm.WMUSS()
+
+    result = incremental.finalize()
+    assert result["points"] == 200 * 841
+    assert result["warping"] == pytest.approx(expected, abs=0.0001)
+    assert incremental.std == pytest.approx(np.concatenate(data)[:, 1].std())
+
+def test_provisional_warping_grows_with_the_scans():
+    data = scans()
+    incremental = IncrementalWarping()
+    assert incremental.provisional() == 0.0
+
+    for points in data[:10]:
+        incremental.update(points)
+    first = incremental.provisional()
+    for points in data[10:]:
+        incremental.update(points)
+
+    assert 0 < first < incremental.provisional()
+
+def test_distance_cut():
+    incremental = IncrementalWarping(distance=1.0)
+    incremental.update(np.array([[0.0, 0.5, 0.0], [0.0, 2.0, 0.0]]))
+
+    assert incremental.count == 1
+
+def test_finalize_without_points():
+    with pytest.raises(Exception, match="No points"):
+        IncrementalWarping().finalize()
+
+def test_plot_uses_the_z_profile():
+    incremental = IncrementalWarping(z_bin_size=0.05)
+    for points in scans():
+        incremental.update(points)
+
+    z, y_min, y_max = incremental.z_profile()
+    assert len(z) == 20 and np.all(y_min <= y_max)
+    assert incremental.plot() is not None
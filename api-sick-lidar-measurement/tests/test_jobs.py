@@ -0,0 +1,87 @@
+import threading
+from time import sleep
+import pytest
+from utils.jobs import Job, JobManager
+
+class FakeMeasurement():
+    """
+    Measurement whose acquisition lasts until the test releases it.
+    """
+    post_processing_workers = 1
+
+    def __init__(self, error:str=None) -> None:
+        self.release = threading.Event()
+        self.error = error
+
+    def measurement_routine(self, progress=None, acquired=None) -> dict:
+        progress("acquisition", "running")
+        self.release.wait(5)
+        progress("acquisition", "done")
+        if self.error:
+            raise Exception(self.error)
+        return {"warping": "1.000"}
+
+def wait_until(condition, timeout:float=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        sleep(0.01)
+    raise TimeoutError
+
+@pytest.fixture
+def measurement():
+    measurement = FakeMeasurement()
+    yield measurement
+    measurement.release.set()
+
+def test_start_is_rejected_while_a_measurement_is_running(measurement):
+    jobs = JobManager(measurement, max_queued=0)
+    job = jobs.submit()
+    wait_until(lambda: job.state == "running")
+
+    assert jobs.submit() is None
+
+    measurement.release.set()
+    wait_until(lambda: job.done)
+    assert jobs.submit() is not None
+    jobs.shutdown()
+
+def test_jobs_are_queued_up_to_max_queued(measurement):
+    jobs = JobManager(measurement, max_queued=1)
+    first = jobs.submit()
+    wait_until(lambda: first.state == "running")
+    second = jobs.submit()
+
+    assert second is not None and second.acquiring
+    assert jobs.submit() is None
+    jobs.shutdown()
+
+def test_finished_job_has_the_result_and_the_stages(measurement):
+    jobs = JobManager(measurement)
+    job = jobs.submit()
+    measurement.release.set()
+    wait_until(lambda: job.done)
+    info = jobs.get(job.id).to_dict()
+
+    assert info["state"] == "success"
+    assert info["result"] == {"warping": "1.000"}
+    assert [(stage["name"], stage["state"]) for stage in info["stages"]] == [("acquisition", "done")]
+    assert info["stages"][0]["duration"] >= 0
+    jobs.shutdown()
+
+def test_failed_job_keeps_the_error():
+    measurement = FakeMeasurement(error="sensor not found")
+    measurement.release.set()
+    jobs = JobManager(measurement)
+    job = jobs.submit()
+    wait_until(lambda: job.done)
+
+    assert job.to_dict()["state"] == "error"
+    assert job.to_dict()["error"] == "sensor not found"
+    jobs.shutdown()
+
+def test_unknown_job(measurement):
+    assert JobManager(measurement).get("missing") is None
+
+def test_new_job_is_queued():
+    assert Job().to_dict()["state"] == "queued"
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from utils.lms4000 import LMS4000
+from utils.lms4000_simulator import LMS4000Simulator, SlabProfile
+from utils.sensor_array import SensorArray
+from utils.height_map import HeightMap
+
+@pytest.fixture
+def simulator():
+    simulator = LMS4000Simulator(port=0, profile=SlabProfile(slab_length=0.3, speed=1.0))
+    simulator.start()
+    yield simulator
+    simulator.stop()
+
+@pytest.fixture(autouse=True)
+def short_stop(monkeypatch):
+    # the simulated motor stops at the end of the slab, no need to wait the 2 s of a real conveyor
+    monkeypatch.setattr(LMS4000, "STOPPED_TIMEOUT", 0.2)
+
+def acquire(simulator, mode, **kwargs) -> LMS4000:
+    host, port = simulator.address
+    sensor = LMS4000(host, port, 55, 125, mode, **kwargs)
+    sensor.data_acquisition_routine()
+    return sensor
+
+@pytest.mark.parametrize("mode", ["poll", "stream"])
+def test_acquisition_covers_the_slab(simulator, mode):
+    sensor = acquire(simulator, mode)
+    points = sensor.pcd
+
+    assert sensor.scans_received > 10
+    # one row per beam of every stored scan (the scan that ends the acquisition is not stored)
+    assert points.shape[1] == 3 and len(points) % 841 == 0
+    assert len(points) // 841 >= sensor.scans_received - 1
+    assert points[0, 2] == pytest.approx(0, abs=0.01)
+    assert points[-1, 2] == pytest.approx(0.3, abs=0.001)
+    assert np.all(np.diff(points[:, 2]) >= 0)
+
+def test_unsupported_acquisition_mode():
+    with pytest.raises(ValueError, match="acquisition mode"):
+        LMS4000("127.0.0.1", 2112, 55, 125, "push")
+
+def test_parser_workers_keep_the_scan_order(simulator):
+    sensor = acquire(simulator, "stream", parser_workers=3)
+
+    assert np.all(np.diff(sensor.pcd[:, 2]) >= 0)
+    assert sensor.frames_received >= sensor.scans_received
+    assert 0 < sensor.queue_max_depth <= 1200
+
+def test_pose_is_applied_after_the_scanline_filter(simulator):
+    sensor = acquire(simulator, "stream", pose=(0, 0.1, 0, 0, 0, 90), scanline_filter={"window": 2, "threshold": 0.01})
+    points = sensor.pcd
+
+    # the filter ran on the flat scan lines in the sensor frame and kept them; the yaw turned Y into -X
+    assert len(points) % 841 == 0
+    assert points[:, 0].mean() == pytest.approx(-1.5, abs=0.02)
+    assert points[:, 1].min() == pytest.approx(0.1 + 1.5 / np.tan(np.radians(125)), abs=0.02)
+
+def test_scanline_filter_removes_the_points_without_neighbors(simulator):
+    # 1 mm of noise: a point with both neighbors within 0.5 mm is kept, many are not
+    sensor = acquire(simulator, "stream", scanline_filter={"window": 1, "threshold": 0.0005, "min_neighbors": 2})
+
+    assert 0 < len(sensor.pcd) < (sensor.scans_received - 1) * 841
+
+def test_sensor_array_merges_the_sensors(simulator):
+    other = LMS4000Simulator(port=0, profile=SlabProfile(slab_length=0.3, speed=1.0, distance=1.2))
+    other.start()
+    try:
+        sensors = [
+            LMS4000(*server.address, 55, 125, "stream", name=name)
+            for name, server in (("top", simulator), ("side", other))
+        ]
+        array = SensorArray(sensors)
+        array.data_acquisition_routine()
+    finally:
+        other.stop()
+
+    assert len(array.pcd) == len(sensors[0].pcd) + len(sensors[1].pcd)
+    assert set(array.scan_summary) == {"top", "side"}
+    assert {"top_scanning", "side_scanning", "scanning"} <= set(array.timings)
+
+def test_height_map_acquisition(simulator):
+    sensor = acquire(simulator, "stream", height_map=HeightMap(z_bin_size=0.01))
+    points = sensor.pcd
+
+    # one point per beam and 1 cm row of the 0.3 m slab, whatever the number of scans
+    assert sensor.height_map.samples >= (sensor.scans_received - 1) * 841
+    assert len(points) == sensor.height_map.cells and len(points) <= 31 * 841
+    assert points[:, 2].max() == pytest.approx(0.305)
+
+def test_stream_scan_summary(simulator):
+    sensor = acquire(simulator, "stream")
+    summary = sensor.scan_summary
+
+    assert summary["scans"] == sensor.scans_received
+    assert summary["missing_scans"] == 0 and summary["dropped_by_host"] == 0
+    assert summary["sensor_scan_rate"] == pytest.approx(600, rel=0.2)
+    assert summary["latency_ms"]["p50"] <= summary["latency_ms"]["max"]
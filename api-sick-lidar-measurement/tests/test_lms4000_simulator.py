@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from utils.CoLaA_TCP import ColaA_TCP
+from utils.lms4000_simulator import LMS4000Simulator, SlabProfile, Capture, scan_telegram
+
+@pytest.fixture
+def simulator():
+    simulator = LMS4000Simulator(port=0, scan_frequency=200, profile=SlabProfile(slab_length=0.5, speed=1.0))
+    simulator.start()
+    yield simulator
+    simulator.stop()
+
+def client(simulator:LMS4000Simulator) -> ColaA_TCP:
+    com = ColaA_TCP(*simulator.address)
+    com.connect()
+    return com
+
+def test_scan_telegram_is_read_by_the_driver():
+    distances = np.array([1000.0, 1500.0, 2000.0])
+    telegram = scan_telegram("sSN", 7, 9, 1000, 2000, 500, distances, start_angle=90, angle_step=0.5)
+    com = ColaA_TCP("127.0.0.1", 2112)
+
+    points = com.extract_telegram(telegram[1:-1])
+    np.testing.assert_allclose(np.hypot(points[:, 0], points[:, 1]), distances / 1000, atol=1e-6)
+    np.testing.assert_allclose(points[:, 2], 0.1)
+    assert ColaA_TCP.extract_header(telegram[1:-1])[:4] == (7, 9, 1000, 2000)
+
+def test_slab_profile_stops_at_the_end_of_travel():
+    profile = SlabProfile(slab_length=2.0, speed=0.5, travel=1.0)
+
+    assert profile.position(1.0) == 0.5
+    assert profile.position(10.0) == 1.0
+
+def test_polled_scans_follow_the_encoder(simulator):
+    com = client(simulator)
+    try:
+        com.login()
+        com.reset_encoder_values()
+        first = com.poll_one_telegram()
+        second = com.poll_one_telegram()
+    finally:
+        com.release()
+
+    assert first.shape == second.shape
+    assert second[0, 2] >= first[0, 2]
+
+def test_capture_is_recorded_and_replayed(simulator, tmp_path):
+    path = str(tmp_path / "capture.bin")
+    Capture.record(*simulator.address, path, duration=0.2)
+    capture = Capture.load(path)
+
+    assert len(capture) > 10
+    times = [seconds for seconds, _ in capture]
+    assert times == sorted(times)
+    assert all(telegram.startswith(b"sSN LMDscandata") for _, telegram in capture)
+
+    replay = LMS4000Simulator(port=0, capture=capture)
+    replay.start()
+    com = client(replay)
+    try:
+        polled = bytes(com.poll_one_frame())
+        com.start_scan_stream()
+        streamed = [bytes(com.read_stream_frame()) for _ in range(3)]
+        com.stop_scan_stream()
+    finally:
+        com.release()
+        replay.stop()
+
+    assert polled == b"sRA" + capture[0][1][3:]
+    assert streamed == [telegram for _, telegram in list(capture)[:3]]
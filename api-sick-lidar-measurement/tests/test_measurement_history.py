@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from utils.measurement_history import MeasurementHistory, end_time, local_time
+
+START = datetime(2024, 5, 1, 6, 0)
+
+@pytest.fixture
+def history(tmp_path):
+    history = MeasurementHistory(str(tmp_path / "db" / "history.db"))
+    for n in range(10):
+        history.add(START + timedelta(hours=n), n / 100, 1000 + n, {"acquisition": 1.5}, f"cloud_{n}.npy")
+    yield history
+    history.close()
+
+def test_add_and_query_newest_first(history):
+    rows, total = history.query()
+
+    assert total == 10
+    assert [row["point_count"] for row in rows] == list(range(1009, 999, -1))
+    assert rows[0] == {
+        "id": 10, "timestamp": (START + timedelta(hours=9)).isoformat(), "warping": 0.09,
+        "point_count": 1009, "timings": {"acquisition": 1.5}, "file_path": "cloud_9.npy",
+    }
+
+def test_query_by_time_and_warping(history):
+    rows, total = history.query(start=START + timedelta(hours=2), end=START + timedelta(hours=7), min_warping=0.04)
+
+    assert total == 4
+    assert [row["warping"] for row in rows] == [0.07, 0.06, 0.05, 0.04]
+
+def test_query_pagination(history):
+    rows, total = history.query(max_warping=0.05, limit=2, offset=2)
+
+    assert total == 6
+    assert [row["id"] for row in rows] == [4, 3]
+
+def test_aware_times_are_compared_in_local_time(history, local_utc_minus_3):
+    # 17:00 UTC is 14:00 local time, the last two measurements
+    start = datetime(2024, 5, 1, 17, 0, tzinfo=timezone.utc)
+    rows, total = history.query(start=start)
+
+    assert local_time(start) == START + timedelta(hours=8)
+    assert total == 2
+
+def test_end_time_includes_the_whole_day(local_utc_minus_3):
+    assert end_time("2024-05-31") == datetime(2024, 5, 31, 23, 59, 59, 999999)
+    assert end_time("2024-05-31T18:00") == datetime(2024, 5, 31, 18, 0)
+    assert end_time("2024-05-31T18:00:00Z") == datetime(2024, 5, 31, 15, 0)
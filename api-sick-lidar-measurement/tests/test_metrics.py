@@ -0,0 +1,50 @@
+import pytest
+from utils.metrics import MetricsRegistry
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("measurements_total", "Measurements run.", ("result",))
+    gauge = registry.gauge("last_warping_meters", "Warping of the last measurement.")
+    counter.inc(result="success")
+    counter.inc(2, result="success")
+    counter.inc(result="error")
+    gauge.set(0.0125)
+
+    assert registry.render() == (
+        "# HELP measurements_total Measurements run.\n"
+        "# TYPE measurements_total counter\n"
+        'measurements_total{result="error"} 1\n'
+        'measurements_total{result="success"} 3\n'
+        "# HELP last_warping_meters Warping of the last measurement.\n"
+        "# TYPE last_warping_meters gauge\n"
+        "last_warping_meters 0.0125\n"
+    )
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage duration.", ("stage",), (0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, stage="acquisition")
+
+    assert registry.render().splitlines()[2:] == [
+        'stage_seconds_bucket{stage="acquisition",le="0.1"} 1',
+        'stage_seconds_bucket{stage="acquisition",le="1"} 2',
+        'stage_seconds_bucket{stage="acquisition",le="+Inf"} 3',
+        'stage_seconds_sum{stage="acquisition"} 5.55',
+        'stage_seconds_count{stage="acquisition"} 3',
+    ]
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.gauge("scan_rate", "Scan rate.", ("sensor",)).set(600, sensor='a"b\\c')
+
+    assert registry.render().splitlines()[-1] == 'scan_rate{sensor="a\\"b\\\\c"} 600'
+
+def test_wrong_labels_and_duplicate_names():
+    registry = MetricsRegistry()
+    counter = registry.counter("scans_total", "Scans.", ("sensor",))
+
+    with pytest.raises(ValueError, match="expects the labels sensor"):
+        counter.inc(where="host")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("scans_total", "Scans.")
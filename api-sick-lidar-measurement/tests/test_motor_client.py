@@ -0,0 +1,70 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.motor_client import MotorClient
+
+class MotorAPI(BaseHTTPRequestHandler):
+    """
+    POST /start of the motor control API, answering server.answer = (status, message).
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.server.clients.add(self.client_address)
+        status, message = self.server.answer
+        body = json.dumps({"message": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def motor_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MotorAPI)
+    server.daemon_threads = True
+    server.answer, server.clients = (200, "running"), set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(motor_api):
+    client = MotorClient(*motor_api.server_address)
+    yield client
+    client.close()
+
+def test_start_reuses_the_connection(motor_api, client):
+    client.start()
+    client.start()
+
+    assert len(motor_api.clients) == 1
+
+def test_start_not_running(motor_api, client):
+    motor_api.answer = (200, "idle")
+
+    with pytest.raises(Exception, match="Error starting the motor: idle"):
+        client.start()
+
+def test_start_rejected(motor_api, client):
+    motor_api.answer = (409, "busy")
+
+    with pytest.raises(Exception, match="Error in requisition: 409"):
+        client.start()
+
+def test_start_without_motor_api():
+    with socket.socket() as free:
+        free.bind(("127.0.0.1", 0))
+        port = free.getsockname()[1]
+    client = MotorClient("127.0.0.1", port, connect_timeout=0.2, retries=1)
+
+    with pytest.raises(Exception, match="Error in requisition"):
+        client.start()
+    client.close()
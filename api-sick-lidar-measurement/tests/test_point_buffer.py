@@ -0,0 +1,37 @@
+import numpy as np
+from utils.point_buffer import PointBuffer
+
+def test_append_grows_and_keeps_the_points():
+    buffer = PointBuffer(np.float64, initial_capacity=4)
+    scans = [np.full((3, 3), n, dtype=np.float64) for n in range(5)]
+    for points in scans:
+        buffer.append(points)
+
+    assert len(buffer) == 15
+    assert buffer.capacity >= 15
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(scans))
+
+def test_view_does_not_copy():
+    buffer = PointBuffer(np.float64, initial_capacity=10)
+    buffer.append(np.ones((2, 3)))
+
+    buffer.view()[0, 0] = 5.0
+
+    assert buffer.view()[0, 0] == 5.0
+
+def test_float32_storage():
+    buffer = PointBuffer(np.float32)
+    buffer.append(np.array([[0.1, 0.2, 0.3]]))
+
+    assert buffer.view().dtype == np.float32
+    assert buffer.nbytes == buffer.capacity * 3 * 4
+
+def test_clear_keeps_the_storage():
+    buffer = PointBuffer(np.float64, initial_capacity=4)
+    buffer.append(np.ones((8, 3)))
+    capacity = buffer.capacity
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.capacity == capacity
+    assert buffer.view().shape == (0, 3)
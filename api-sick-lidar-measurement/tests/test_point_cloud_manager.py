@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from utils.PointCloudManager import PointCloudManager
+
+def surface(nx:int=60, nz:int=60, y:float=1.5, seed:int=0) -> np.ndarray:
+    """
+    Flat surface at Y = y over a 0.6 m x 0.6 m grid of X and Z, with 1 mm of noise.
+    """
+    rng = np.random.default_rng(seed)
+    x, z = np.meshgrid(np.linspace(-0.3, 0.3, nx), np.linspace(0, 0.6, nz))
+    return np.column_stack((x.ravel(), y + rng.normal(0, 0.001, x.size), z.ravel()))
+
+def manager(points:np.ndarray) -> PointCloudManager:
+    pcm = PointCloudManager()
+    pcm.load_from_array(points)
+    return pcm
+
+def test_distance_cut():
+    points = np.vstack((surface(), [[0.0, 3.0, 0.1], [0.0, 2.5, 0.2]]))
+    pcm = manager(points)
+    pcm.filter_by_distance(2, "none")
+
+    assert len(pcm.point_cloud.points) == len(points) - 2
+
+def test_statistical_filter_removes_isolated_spikes():
+    points = np.vstack((surface(), [[0.0, 1.0, 0.3], [0.1, 1.1, 0.4]]))
+    pcm = manager(points)
+    pcm.filter_by_distance(0, "statistical", {"nb_neighbors": 20, "std_ratio": 2.0})
+    kept = np.asarray(pcm.point_cloud.points)
+
+    assert kept[:, 1].min() > 1.4
+
+def test_voxel_filter_downsamples():
+    pcm = manager(surface())
+    pcm.filter_by_distance(0, "voxel", {"voxel_size": 0.05, "nb_neighbors": 5, "std_ratio": 2.0})
+
+    assert 0 < len(pcm.point_cloud.points) < 200
+
+@pytest.mark.parametrize("method", ["median", "scanline"])
+def test_unsupported_outlier_filter(method):
+    # the scan line filter runs on each scan during the acquisition (LidarSensor), not on the merged cloud
+    with pytest.raises(Exception, match="Unsupported outlier filter"):
+        manager(surface()).filter_by_distance(0, method)
+
+def stack(bows=(0.0, 0.01, 0.0), thickness:float=0.05, gap:float=0.03, length:float=1.0, points_per_slab:int=20000, seed:int=0) -> np.ndarray:
+    """
+    Side faces of a stack of slabs along X, seen by a lateral scan; each slab bowed along Z by its bow (meters).
+    """
+    rng = np.random.default_rng(seed)
+    slabs = []
+    for n, bow in enumerate(bows):
+        z = rng.uniform(0, length, points_per_slab)
+        x = n * (thickness + gap) + rng.uniform(0, thickness, points_per_slab) + bow * np.sin(np.pi * z / length)
+        slabs.append(np.column_stack((x, rng.uniform(1.4, 1.6, points_per_slab), z)))
+    return np.vstack(slabs)
+
+def test_wmlss_finds_every_slab_and_its_warping():
+    warping, slabs = manager(stack()).WMLSS(stack_axis=0, z_bin_size=0.05)
+
+    assert [slab["slab"] for slab in slabs] == [0, 1, 2]
+    assert [slab["warping"] for slab in slabs] == pytest.approx([0, 0.01, 0], abs=0.002)
+    assert warping == slabs[1]["warping"]
+    assert slabs[1]["max_deviation_z"] == pytest.approx(0.5, abs=0.1)
+    assert slabs[0]["bottom"] == pytest.approx(0, abs=0.005) and slabs[0]["top"] == pytest.approx(0.05, abs=0.005)
+    # the points on the edges of the histogram runs may be left out
+    assert sum(slab["points"] for slab in slabs) == pytest.approx(60000, abs=10)
+
+def test_wmlss_ignores_thin_runs_and_small_slabs():
+    points = np.vstack((stack(bows=(0.0, 0.0)), [[0.3, 1.5, 0.5]] * 50))
+    warping, slabs = manager(points).WMLSS(min_points=100)
+
+    assert len(slabs) == 2
+
+def test_wmlss_without_slabs():
+    with pytest.raises(Exception, match="No slab was found"):
+        manager(stack(bows=(0.0, 0.0), thickness=0.01)).WMLSS(min_thickness=0.02)
+
+def bowed_surface(bow:float=0.01, tilt:float=0.0, n:int=100) -> np.ndarray:
+    """
+    0.6 m x 1 m surface at Y = 1.5, bowed along Z by bow (meters) and tilted by tilt (Y/Z slope).
+    """
+    x, z = np.meshgrid(np.linspace(-0.3, 0.3, n), np.linspace(0, 1, n))
+    y = 1.5 - bow * np.sin(np.pi * z) + tilt * z
+    return np.column_stack((x.ravel(), y.ravel(), z.ravel()))
+
+def test_wmrsf_is_not_biased_by_the_tilt():
+    flat, _ = manager(bowed_surface()).WMRSF(outlier_sigma=10)
+    tilted, plot = manager(bowed_surface(tilt=0.05)).WMRSF(outlier_sigma=10)
+
+    # largest deviation from the mean plane of a half sine: 2/pi of the bow, at the ends
+    assert flat == pytest.approx(tilted, rel=1e-6)
+    assert 0.005 < flat < 0.01
+    assert plot.etag
+
+def test_wmrsf_subsample_is_reproducible():
+    points = bowed_surface(n=300)
+
+    assert manager(points).WMRSF(sample_size=5000, seed=1)[0] == manager(points).WMRSF(sample_size=5000, seed=1)[0]
+
+def test_wmrsf_needs_one_iteration():
+    with pytest.raises(Exception, match="At least one iteration"):
+        manager(bowed_surface()).WMRSF(iterations=0)
@@ -0,0 +1,67 @@
+import json
+import os
+import numpy as np
+import pytest
+from utils.PointCloudManager import PointCloudManager
+from utils.point_cloud_writer import PointCloudWriter
+
+@pytest.fixture
+def pcm():
+    pcm = PointCloudManager()
+    pcm.load_from_array(np.random.default_rng(0).random((500, 3)))
+    return pcm
+
+@pytest.mark.parametrize("format", PointCloudWriter.FORMATS)
+def test_write_saves_the_points_and_the_metadata(tmp_path, pcm, format):
+    writer = PointCloudWriter(str(tmp_path), format)
+    path = writer.write(pcm, "20240501_060000", {"warping": 0.01})
+
+    assert path == writer.path_for("20240501_060000")
+    points = PointCloudManager.load_points(path)
+    np.testing.assert_allclose(points, np.asarray(pcm.point_cloud.points), atol=1e-4 if format == "pcd_ascii" else 1e-6)
+    with open(tmp_path / "20240501_060000.json") as file:
+        assert json.load(file) == {"warping": 0.01}
+
+def test_npy_is_memory_mapped(tmp_path, pcm):
+    path = PointCloudWriter(str(tmp_path), "npy").write(pcm, "a")
+
+    assert isinstance(PointCloudManager.load_points(path), np.memmap)
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported storage format"):
+        PointCloudWriter(str(tmp_path), "las")
+
+def write_files(writer:PointCloudWriter, pcm:PointCloudManager, count:int, age_days:float=0):
+    for n in range(count):
+        path = writer.write(pcm, f"cloud_{n}")
+        mtime = os.path.getmtime(path) - age_days * 86400 + n
+        os.utime(path, (mtime, mtime))
+
+def test_retention_keeps_the_newest_files(tmp_path, pcm):
+    writer = PointCloudWriter(str(tmp_path), "npy", max_files=2)
+    write_files(writer, pcm, 4)
+    writer.apply_retention()
+
+    assert sorted(os.listdir(tmp_path)) == ["cloud_2.json", "cloud_2.npy", "cloud_3.json", "cloud_3.npy"]
+
+def test_retention_by_age(tmp_path, pcm):
+    writer = PointCloudWriter(str(tmp_path), "pcd", max_age_days=30)
+    write_files(writer, pcm, 2, age_days=31)
+    writer.write(pcm, "new")
+    writer.apply_retention()
+
+    assert sorted(os.listdir(tmp_path)) == ["new.json", "new.pcd"]
+
+def test_retention_is_disabled_by_default(tmp_path, pcm):
+    writer = PointCloudWriter(str(tmp_path), "npy")
+    write_files(writer, pcm, 3, age_days=365)
+    writer.apply_retention()
+
+    assert len(os.listdir(tmp_path)) == 6
+
+def test_npy_file_is_loaded_into_open3d(tmp_path, pcm):
+    path = PointCloudWriter(str(tmp_path), "npy").write(pcm, "a")
+    loaded = PointCloudManager()
+    loaded.load_from_file(path)
+
+    np.testing.assert_allclose(np.asarray(loaded.point_cloud.points), np.asarray(pcm.point_cloud.points), atol=1e-6)
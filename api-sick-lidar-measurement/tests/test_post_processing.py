@@ -0,0 +1,89 @@
+import os
+import json
+import signal
+from time import sleep
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pytest
+from utils.PointCloudManager import PointCloudManager
+from utils.post_processing import PostProcessor, compute_warping
+
+@pytest.fixture(scope="module")
+def processor():
+    processor = PostProcessor(workers=1)
+    processor.start()
+    yield processor
+    processor.shutdown()
+
+def task(tmp_path, warping_method:str="wmuss") -> dict:
+    return {
+        "warping_method": warping_method, "distance": 0, "filter_method": "none", "filter_params": {},
+        "wmlss_params": {}, "surface_params": {},
+        "storage": {"directory": str(tmp_path), "format": "npy", "name": "slab"},
+        "metadata": {"sensors": {}},
+    }
+
+def test_points_are_processed_in_a_worker_process(processor, tmp_path):
+    rng = np.random.default_rng(0)
+    points = np.column_stack((rng.uniform(-0.3, 0.3, 5000), 1.5 + rng.normal(0, 0.001, 5000), rng.uniform(0, 1, 5000)))
+    result = processor.submit(points, task(tmp_path)).result(timeout=60)
+    # the caller may reuse its array as soon as submit() returns
+    points[:] = 0
+
+    assert 0 < result["warping"] < 0.005
+    assert result["plot"].render().startswith(b"\x89PNG")
+    assert {"loading", "filtering", "warping", "saving"} <= set(result["timings"])
+    saved = np.load(result["file_path"])
+    assert len(saved) == result["points"] == 5000 and saved[:, 1].mean() == pytest.approx(1.5, abs=0.001)
+    with open(tmp_path / "slab.json") as file:
+        assert json.load(file)["warping"] == result["warping"]
+
+def test_incremental_measurement_is_only_saved(processor, tmp_path):
+    result = processor.submit(np.ones((100, 3), dtype=np.float32), task(tmp_path, "incremental")).result(timeout=60)
+
+    assert result["warping"] is None and result["plot"] is None
+    assert result["points"] == 100 and "warping" not in result["timings"]
+
+def test_at_least_one_worker():
+    with pytest.raises(ValueError, match="At least one"):
+        PostProcessor(workers=0)
+
+def test_unsupported_warping_method():
+    pcm = PointCloudManager()
+    pcm.load_from_array(np.ones((10, 3)))
+    task = {"warping_method": "wmus", "distance": 0, "filter_method": "none", "filter_params": {}}
+
+    with pytest.raises(ValueError, match="Unsupported warping method: wmus"):
+        compute_warping(pcm, task, {})
+
+def kill_workers(processor:PostProcessor):
+    for pid in list(processor._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+def test_dead_worker_only_fails_its_measurement(tmp_path):
+    processor = PostProcessor(workers=1)
+    processor.start()
+    try:
+        # a few seconds of statistical filtering, killed in the middle
+        points = np.random.default_rng(0).random((300_000, 3))
+        running = processor.submit(points, dict(task(tmp_path), filter_method="statistical", filter_params={}))
+        sleep(1)
+        kill_workers(processor)
+        with pytest.raises(BrokenProcessPool):
+            running.result(timeout=60)
+
+        assert processor.submit(np.ones((100, 3)), task(tmp_path, "incremental")).result(timeout=60)["points"] == 100
+    finally:
+        processor.shutdown()
+
+def test_pool_broken_between_measurements_is_replaced(tmp_path):
+    processor = PostProcessor(workers=1)
+    processor.start()
+    try:
+        processor.submit(np.ones((100, 3)), task(tmp_path, "incremental")).result(timeout=60)
+        kill_workers(processor)
+        sleep(0.5)
+
+        assert processor.submit(np.ones((100, 3)), task(tmp_path, "incremental")).result(timeout=60)["points"] == 100
+    finally:
+        processor.shutdown()
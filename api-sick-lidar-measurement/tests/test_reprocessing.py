@@ -0,0 +1,63 @@
+import os
+from datetime import datetime
+import numpy as np
+import pytest
+from utils.measurement_history import end_time
+from utils.reprocessing import ResultCache, find_point_clouds, reprocess
+
+TASK = {
+    "warping_method": "wmuss", "distance": 0, "filter_method": "none", "filter_params": {},
+    "wmlss_params": {}, "surface_params": {},
+}
+
+def save(directory, name:str, points:np.ndarray=None) -> str:
+    path = os.path.join(directory, name)
+    if name.endswith(".npy"):
+        np.save(path, points if points is not None else np.random.default_rng(0).random((200, 3)))
+    else:
+        open(path, "w").close()
+    return path
+
+def test_find_point_clouds_by_time(tmp_path):
+    for name in ("20240430_235959.npy", "20240501_060000.pcd", "20240501_180000.ply", "20240502_000000.npy",
+                 "20240501_120000.json", "slab.npy"):
+        save(tmp_path, name)
+
+    names = lambda files: [os.path.basename(path) for path in files]
+    assert names(find_point_clouds(str(tmp_path))) == ["20240430_235959.npy", "20240501_060000.pcd", "20240501_180000.ply", "20240502_000000.npy", "slab.npy"]
+    assert names(find_point_clouds(str(tmp_path), datetime(2024, 5, 1), end_time("2024-05-01"))) == ["20240501_060000.pcd", "20240501_180000.ply"]
+    assert names(find_point_clouds(str(tmp_path), end=end_time("2024-05-01T06:00"))) == ["20240430_235959.npy", "20240501_060000.pcd"]
+
+def test_cache_key_changes_with_the_file(tmp_path):
+    path = save(tmp_path, "20240501_060000.npy")
+    parameters = ResultCache.parameters_key(TASK)
+    key = ResultCache.key(parameters, path)
+
+    assert parameters == ResultCache.parameters_key(dict(reversed(list(TASK.items()))))
+    assert parameters != ResultCache.parameters_key(dict(TASK, distance=2))
+    os.utime(path, ns=(0, 0))
+    assert ResultCache.key(parameters, path) != key
+
+def test_reprocess_caches_the_results(tmp_path):
+    rng = np.random.default_rng(0)
+    good = save(tmp_path, "20240501_060000.npy", np.column_stack((rng.random(500), 1.5 + rng.normal(0, 0.001, 500), rng.random(500))))
+    bad = save(tmp_path, "20240501_070000.pcd")
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    try:
+        first = reprocess([good, bad], TASK, cache, workers=1)
+        second = reprocess([good, bad], TASK, cache, workers=1)
+    finally:
+        cache.close()
+
+    assert [row["file"] for row in first] == [good, bad]
+    assert first[0]["points"] == 500 and 0 < first[0]["warping"] < 0.005 and not first[0]["error"]
+    assert first[0]["timestamp"] == "2024-05-01T06:00:00"
+    assert first[1]["error"]
+    # the failed file is processed again, the other one comes from the cache
+    assert [row["cached"] for row in second] == [True, False]
+    assert second[0]["warping"] == first[0]["warping"]
+
+@pytest.mark.parametrize("changes", [{"warping_method": "incremental"}, {"filter_method": "scanline"}])
+def test_reprocess_needs_the_point_clouds_only(tmp_path, changes):
+    with pytest.raises(ValueError, match="scans of the acquisition"):
+        reprocess([], dict(TASK, **changes), None)
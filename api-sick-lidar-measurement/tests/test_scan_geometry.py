@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from utils.scan_geometry import trig_tables, to_points, decode_hex_tokens, pose_transform, scanline_inliers
+
+def tokens(text:bytes):
+    raw = np.frombuffer(text, dtype=np.uint8)
+    separators = np.flatnonzero(raw == 0x20)
+    return raw, np.r_[0, separators + 1], np.r_[separators, len(raw)]
+
+def test_decode_hex_tokens():
+    raw, starts, ends = tokens(b"0 A ff 10000 FFFF")
+
+    np.testing.assert_array_equal(decode_hex_tokens(raw, starts, ends), [0, 10, 255, 65536, 65535])
+
+def test_decode_hex_tokens_zero_values():
+    raw, starts, ends = tokens(b"0 0 0")
+
+    np.testing.assert_array_equal(decode_hex_tokens(raw, starts, ends), [0, 0, 0])
+
+def test_trig_tables_are_cached_and_read_only():
+    cos, sin = trig_tables(55.0, 1/12, 841)
+
+    assert trig_tables(55.0, 1/12, 841)[0] is cos
+    assert sin[0] == pytest.approx(np.sin(np.radians(55.0)))
+    assert sin[-1] == pytest.approx(np.sin(np.radians(125.0)))
+    with pytest.raises(ValueError):
+        cos[0] = 0
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_to_points(dtype):
+    points = to_points(np.array([1.0, 2.0]), 0.0, 90.0, 0.5, dtype)
+
+    assert points.dtype == dtype
+    np.testing.assert_allclose(points, [[1.0, 0.0, 0.5], [0.0, 2.0, 0.5]], atol=1e-6)
+
+def test_pose_transform():
+    rotation, translation = pose_transform((0.1, 0.2, 0.3, 0, 0, 90))
+    points = np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 1.0]]) @ rotation.T + translation
+
+    np.testing.assert_allclose(points, [[0.1, 1.2, 0.3], [-1.9, 0.2, 1.3]], atol=1e-12)
+
+def test_pose_transform_pitch_then_yaw():
+    rotation, _ = pose_transform((0, 0, 0, 0, 90, 90))
+
+    # pitch turns X into -Z, then yaw leaves Z as it is
+    np.testing.assert_allclose(rotation @ [1.0, 0.0, 0.0], [0.0, 0.0, -1.0], atol=1e-12)
+
+def test_scanline_inliers_removes_isolated_points():
+    y = np.full(20, 1.5)
+    y[5] = 1.2              # spike between two surface points
+    y[12:14] = 1.8          # two neighbor points on another surface support each other
+
+    assert np.flatnonzero(~scanline_inliers(y, window=2, threshold=0.01)).tolist() == [5]
+    # the ends of the scan and the points next to the other surface have only two close neighbors
+    assert np.flatnonzero(~scanline_inliers(y, window=2, threshold=0.01, min_neighbors=3)).tolist() == [0, 5, 11, 12, 13, 14, 19]
@@ -0,0 +1,40 @@
+import pytest
+from utils.scan_monitor import ScanMonitor, ScanHeader
+
+def header(scan_counter:int, transmission:int, status=(0, 0)) -> ScanHeader:
+    return ScanHeader(scan_counter, scan_counter, transmission, transmission, status)
+
+def monitor(counters, period_us:int=1000, start_us:int=0, continuous:bool=True) -> ScanMonitor:
+    monitor = ScanMonitor(continuous)
+    for n, counter in enumerate(counters):
+        sent = start_us + n * period_us
+        monitor.add(header(counter % ScanMonitor.COUNTER_MODULO, sent % ScanMonitor.CLOCK_MODULO), sent / 1e6 + 0.5, sent / 1e6 + 0.501)
+    return monitor
+
+def test_scan_and_clock_counters_wrap_around():
+    summary = monitor(range(65530, 65542), start_us=ScanMonitor.CLOCK_MODULO - 5000).summary()
+
+    assert summary["missing_scans"] == 0 and summary["gaps"] == 0
+    assert summary["sensor_scan_rate"] == pytest.approx(1000)
+    assert summary["latency_ms"]["max"] == pytest.approx(0, abs=1e-6)
+    assert summary["parse_ms"]["p50"] == pytest.approx(1)
+
+def test_gaps_are_split_between_host_and_sensor():
+    summary = monitor([65534, 65535, 2, 3, 4, 8]).summary(dropped=4)
+
+    assert summary["missing_scans"] == 5
+    assert summary["gaps"] == 2 and summary["largest_gap"] == 3
+    assert summary["dropped_by_host"] == 4 and summary["lost_before_host"] == 1
+
+def test_polled_scans_have_no_loss_count():
+    summary = monitor([1, 5, 9], continuous=False).summary()
+
+    assert "missing_scans" not in summary and summary["scans"] == 3
+
+def test_status_errors_and_short_acquisitions():
+    scans = ScanMonitor()
+    scans.add(header(1, 0, status=(0, 1)), 0.0, 0.0)
+    assert scans.summary() == {"scans": 1}
+
+    scans.add(header(2, 1000), 0.001, 0.001)
+    assert scans.summary()["status_errors"] == 1
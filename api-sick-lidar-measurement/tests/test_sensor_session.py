@@ -0,0 +1,79 @@
+import socket
+import pytest
+from utils.sensor_session import SensorSession
+
+class FakeSensor():
+    """
+    Protocol class that records the telegrams sent, in order, in a list shared by every connection.
+    """
+    calls = []
+    fail_on = None
+
+    def __init__(self, ip, port, dtype, encoder_resolution) -> None:
+        self.socket_sick = None
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            FakeSensor.calls.append(name)
+            if name == FakeSensor.fail_on:
+                raise ConnectionError("connection lost")
+        return call
+
+    def connect(self):
+        FakeSensor.calls.append("connect")
+        self.socket_sick = socket.socket()
+
+    def release(self):
+        FakeSensor.calls.append("release")
+        self.socket_sick.close()
+
+CONFIGURATION = {"config_scandata_content": {}}
+
+@pytest.fixture
+def session():
+    FakeSensor.calls, FakeSensor.fail_on = [], None
+    session = SensorSession(FakeSensor, "127.0.0.1", 2112, float, keepalive_interval=0)
+    yield session
+    session.close()
+
+def test_configuration_is_sent_once_per_connection(session):
+    with session.acquire(CONFIGURATION):
+        pass
+    with session.acquire(CONFIGURATION):
+        pass
+
+    assert FakeSensor.calls == [
+        "connect", "login", "config_scandata_content", "reset_encoder_values", "logout",
+        "login", "reset_encoder_values", "logout",
+    ]
+    assert session.connections == 1
+    assert set(session.timings) == {"parameterize", "encoder_reset"}
+
+def test_changed_configuration_is_sent_again(session):
+    with session.acquire(CONFIGURATION):
+        pass
+    with session.acquire({"config_scandata_content": {"encoder": False}}):
+        pass
+
+    assert FakeSensor.calls.count("config_scandata_content") == 2
+
+def test_failed_measurement_reconnects_and_reconfigures(session):
+    with pytest.raises(RuntimeError):
+        with session.acquire(CONFIGURATION):
+            raise RuntimeError("stream stopped")
+    assert not session.connected
+
+    FakeSensor.calls = []
+    with session.acquire(CONFIGURATION):
+        pass
+    assert FakeSensor.calls[:3] == ["connect", "login", "config_scandata_content"]
+    assert session.connections == 2
+
+def test_failed_encoder_reset_closes_the_connection(session):
+    FakeSensor.fail_on = "reset_encoder_values"
+
+    with pytest.raises(Exception, match="Error in sensor session: connection lost"):
+        with session.acquire(CONFIGURATION):
+            pass
+    assert FakeSensor.calls[-1] == "release"
+    assert not session.connected
@@ -0,0 +1,65 @@
+import socket
+import pytest
+from utils.telegram_framer import TelegramFramer
+
+@pytest.fixture
+def pair():
+    """
+    Framer on one end of a socket pair; the test plays the sensor on the other end.
+    """
+    receiver, sender = socket.socketpair()
+    yield receiver, sender
+    receiver.close()
+    sender.close()
+
+def test_partial_frame_is_completed_by_the_next_receive(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver)
+    sender.sendall(b"\x02sAN Run")
+    sender.sendall(b" 1\x03")
+
+    assert bytes(framer.next_frame()) == b"sAN Run 1"
+
+def test_merged_frames_are_returned_one_per_call(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver)
+    sender.sendall(b"\x02first\x03\x02second\x03\x02thi")
+
+    assert bytes(framer.next_frame()) == b"first"
+    assert bytes(framer.next_frame()) == b"second"
+    sender.sendall(b"rd\x03")
+    assert bytes(framer.next_frame()) == b"third"
+
+def test_bytes_without_stx_are_skipped(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver)
+    sender.sendall(b"noise\x03\x02frame\x03")
+
+    assert bytes(framer.next_frame()) == b"frame"
+
+def test_partial_frame_is_moved_to_the_start_of_the_buffer(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver, capacity=16)
+    sender.sendall(b"\x02abcdefgh\x03\x02ijklm")
+    assert bytes(framer.next_frame()) == b"abcdefgh"
+
+    sender.sendall(b"nop\x03")
+    assert bytes(framer.next_frame()) == b"ijklmnop"
+    assert framer.capacity == 16
+
+def test_frame_bigger_than_the_buffer_grows_it(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver, capacity=8)
+    sender.sendall(b"\x02" + b"x" * 40 + b"\x03")
+
+    assert bytes(framer.next_frame()) == b"x" * 40
+    assert framer.capacity >= 42
+
+def test_closed_connection(pair):
+    receiver, sender = pair
+    framer = TelegramFramer(receiver)
+    sender.sendall(b"\x02partial")
+    sender.close()
+
+    with pytest.raises(ConnectionError):
+        framer.next_frame()
@@ -0,0 +1,34 @@
+import pickle
+import numpy as np
+import pytest
+from utils.warping_plot import WarpingPlot
+
+def plot(bins:int=100) -> WarpingPlot:
+    z = np.linspace(0, 1, 10000)
+    y = 1.5 + 0.01 * np.sin(np.pi * z)
+    return WarpingPlot.from_points(z, y, 1.5, 1.53, 1.47, (0.5, 1.51), 0.01, bins=bins)
+
+def test_envelope_has_one_bin_per_occupied_interval():
+    chart = plot(bins=100)
+
+    assert len(chart._z) == 100
+    assert np.all(chart._y_min <= chart._y_max)
+    assert chart._y_max.max() == pytest.approx(1.51, abs=1e-6)
+
+def test_render_is_a_cached_png():
+    chart = plot()
+    png = chart.render()
+
+    assert png.startswith(b"\x89PNG")
+    assert chart.render() is png
+
+def test_etag_is_unique_per_measurement():
+    assert plot().etag != plot().etag
+
+def test_pickled_plot_keeps_its_etag_and_renders():
+    # the plot comes back from the post-processing worker process pickled
+    chart = plot()
+    copy = pickle.loads(pickle.dumps(chart))
+
+    assert copy.etag == chart.etag
+    assert copy.render().startswith(b"\x89PNG")
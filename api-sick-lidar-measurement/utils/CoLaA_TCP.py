@@ -1,20 +1,28 @@
 import socket
-import math
 import struct
 import time
-from datetime import datetime
+import numpy as np
 from utils.logger_config import logger
+from utils.scan_geometry import to_points, decode_hex_tokens
+from utils.telegram_framer import TelegramFramer
+from utils.scan_monitor import ScanHeader
 
 class ColaA_TCP():
     """
-    Class that implements the comunication by Sick CoLa A protocol via TCP with the LMS4000 sensor.
+    Class that implements the comunication by Sick CoLa A protocol via TCP with the LMS4000 and LMS5xx sensors.
     """
-    def __init__(self, ip:str, port:int) -> None:
+    def __init__(self, ip:str, port:int, dtype=np.float64, encoder_resolution:float=0.2) -> None:
         # --- Dados do arquivo de configuração --- #
         self._ip = ip
         self._port = port
+        # --- Tipo dos pontos extraídos dos telegramas --- #
+        self._dtype = dtype
+        # --- Encoder resolution, in mm per tick --- #
+        self._encoder_resolution = encoder_resolution
         # --- Objeto comunicação Socket --- #
         self.socket_sick = None
+        # --- Separa os telegramas recebidos (STX ... ETX) --- #
+        self._framer = None
     
     @staticmethod
     def int_2hex(decimal_number, factor) -> str:
@@ -31,70 +39,105 @@ class ColaA_TCP():
         data = data.replace('\x03','')
         return data
     
-    @staticmethod
-    def to_cartesian(
-            distances: list[float], 
-            angles: list[float]
-        ) -> tuple[list[float], list[float]]:
-        x = list(map(lambda r, t: r * math.cos(math.radians(t)), distances, angles))
-        y = list(map(lambda r, t: r * math.sin(math.radians(t)), distances, angles))
-        return x, y
-    
     def send_socket(
             self,
-            message : str,
-            buffer : int
+            message : str
         ) -> str:
+        """
+        Sends a message and returns the answer as text, without STX and ETX.
+        - Scans pushed by an active event subscription (sSN) are skipped.
+        """
         #print("sending message: "+ message)
+        self._send_telegram(message)
+
+        while True:
+            frame = self.receive_frame()
+            if frame[:4] != b"sSN ":
+                break
+        data = str(frame, 'ascii')
+        #print("received message: "+ data)
+        return data
+    
+    def _send_telegram(self, message: str) -> None:
+        """
+        Frames the message with STX/ETX and sends it once, reconnecting if the connection was aborted.
+        """
+        frame = f'\x02{message}\x03'.encode()
         try:
-            message = f'\x02{message}\x03'.encode()
-            self.socket_sick.send(message)
+            self.socket_sick.sendall(frame)
         except ConnectionAbortedError:
             self.connect()
             time.sleep(0.1)
-        finally:
-            message = f'\x02{message}\x03'.encode()
-            self.socket_sick.send(message)
-
-        data = self.socket_sick.recv(buffer)
-        data = data.decode()
-        data = self.remove_outprov(data=data)
-        #print("received message: "+ data)
-        return data
+            self.socket_sick.sendall(frame)
+    
+    def receive_frame(self) -> memoryview:
+        """
+        Returns the next complete telegram received, without STX and ETX.
+        - The memoryview points into the receive buffer and is only valid until the next receive.
+        """
+        return self._framer.next_frame()
+    
+    def receive_telegram(self) -> str:
+        """
+        Returns the next complete telegram received as text, without STX and ETX.
+        """
+        return str(self.receive_frame(), 'ascii')
+    
+    @staticmethod
+    def hex_2int(token: bytes) -> int:
+        """
+        Converts a hexadecimal token to a signed 32-bit integer.
+        """
+        value = int(token, 16)
+        return value - (1 << 32) if value >= (1 << 31) else value
+    
+    @staticmethod
+    def extract_header(data) -> ScanHeader:
+        """
+        Decodes the counters, times (microseconds) and device status of an LMDscandata telegram.
+        """
+        # tokens 0 to 10 fit in the first bytes of the telegram, the rest is not copied
+        tokens = bytes(data[:256]).split(b" ", 11)
+        return ScanHeader(
+            telegram_counter=int(tokens[7], 16),
+            scan_counter=int(tokens[8], 16),
+            time_since_startup=int(tokens[9], 16),
+            time_of_transmission=int(tokens[10], 16),
+            device_status=(int(tokens[5], 16), int(tokens[6], 16))
+        )
     
-    def extract_telegram(self, data: str):
+    def extract_telegram(self, data) -> np.ndarray:
+        """
+        Decodes an LMDscandata answer (sRA) or event (sSN) into an (N, 3) array of points in meters.
+        - The telegram is tokenized once with NumPy and all the distance tokens are decoded in bulk.
+        - The beam angles come from a table cached by (start angle, angle step, value count).
+        """
         try:
-            telegram = data.split()
-            head = telegram[:18]
-            encoder = telegram[18:21]
-            body = telegram[21:]
-            #print(len(telegram))
-            #print("Head: " + str(head))
-            #print("Encoder: " + str(encoder))
-            #print("Body:" + str(body))
+            if isinstance(data, str):
+                data = data.encode()
+            raw = np.frombuffer(data, dtype=np.uint8)
+            separators = np.flatnonzero(raw == 0x20)
+            starts = np.r_[0, separators + 1]
+            ends = np.r_[separators, len(raw)]
+            token = lambda i: bytes(data[starts[i]:ends[i]])
+            # head = tokens 0 to 17, encoder = tokens 18 to 18+2n, body = the remaining tokens
 
-            scale_factor = 0.1 # for LMS4000: Factor x 0.1: 3DCCCCCDh (DIST1)
-            try:
-                start_angle = self.uint32(body[4])/10000.0
-            except ValueError:
-                start_angle = int(body[4], 16)/10000.0
-            angle_step = int(body[5], 16) / 10000.0
-            value_count = int(body[6], 16)   
-            distances = list(map(lambda x: (int(x, 16) * scale_factor)/1000.0, body[7:7+value_count]))
-            angles = [start_angle + angle_step * n for n in range(value_count)]
+            num_of_encoders = int(token(18), 16)
+            encoder_current_num_of_ticks = int(token(19), 16) if num_of_encoders else 0
+            body = 19 + 2 * num_of_encoders
 
-            x, y = self.to_cartesian(distances, angles)
+            # IEEE 754 floats: 3DCCCCCDh = 0.1 for LMS4000, 3F800000h = 1.0 (or 40000000h = 2.0) for LMS5xx
+            scale_factor = struct.unpack('>f', bytes.fromhex(token(body + 2).decode()))[0]
+            scale_offset = struct.unpack('>f', bytes.fromhex(token(body + 3).decode()))[0]
+            start_angle = self.hex_2int(token(body + 4))/10000.0
+            angle_step = int(token(body + 5), 16) / 10000.0
+            value_count = int(token(body + 6), 16)
+            first = body + 7
+            distances = (decode_hex_tokens(raw, starts[first:first+value_count], ends[first:first+value_count]) * scale_factor + scale_offset) / 1000.0
 
-            encoder_resolution = 0.2 # 0.2 mm per tick
-            encoder_current_num_of_ticks = int(encoder[1], 16)
-            current_position = (encoder_current_num_of_ticks * encoder_resolution / 1000) # in meters
+            current_position = (encoder_current_num_of_ticks * self._encoder_resolution / 1000) # in meters
 
-            z = [current_position] * len(x)
-
-            # transforma do formato ([x1, x2, x3, ...], [y1, y2, y3, ...], [z1, z2, z3, ...])
-            # para o formato ([x1, y1, z1], [x2, y2, z2], [x3, y3, z3], ...)
-            points = list(zip(*(x, y, z)))
-            return points
+            return to_points(distances, start_angle, angle_step, current_position, self._dtype)
         except Exception as e:
             raise e
 
@@ -106,6 +149,7 @@ class ColaA_TCP():
             logger.info("Trying to connect with LiDAR.")
             self.socket_sick = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket_sick.connect((self._ip, self._port))
+            self._framer = TelegramFramer(self.socket_sick)
             logger.info("socket connection has been created with LiDAR.")
         except Exception as e:
             raise Exception(f"Error in connect(): {e}")
@@ -130,8 +174,7 @@ class ColaA_TCP():
         """
         try:
             data = self.send_socket(
-                message = "sMN SetAccessMode 03 F4724744",
-                buffer = 128
+                message = "sMN SetAccessMode 03 F4724744"
             )
             telegram = data.split()
         except Exception as e:
@@ -146,8 +189,7 @@ class ColaA_TCP():
         """
         try:
             data = self.send_socket(
-                message = "sMN Run",
-                buffer = 128
+                message = "sMN Run"
             )
             # telegram = data.split()
             # if telegram[2] == "1":
@@ -169,8 +211,7 @@ class ColaA_TCP():
         """
         try:
             data = self.send_socket(
-                message = "sRN LMPscancfg",
-                buffer = 128
+                message = "sRN LMPscancfg"
             )
             telegram = data.split()
             scan_freq = int(telegram[2], 16)/100            
@@ -188,6 +229,20 @@ class ColaA_TCP():
             print(f"Erro em read_freq_and_angular_resol(): {e}")
             return False
     
+    def heartbeat(self):
+        """
+        Cheap read (scan configuration) used to check that the connection and the sensor still answer.
+        """
+        try:
+            telegram = self.send_socket(
+                message = "sRN LMPscancfg"
+            ).split()
+        except Exception as e:
+            raise Exception(f"Error in heartbeat(): {e}")
+
+        if not (telegram[:2] == ["sRA", "LMPscancfg"]):
+            raise Exception(f"Unexpected heartbeat answer: {' '.join(telegram[:2])}")
+    
     def config_scandata_content(self, data_channel=True, further_data_channel=2, encoder=True):
         """
         Sessão "4.3.1 Configure the data content for the scan" do manual do Protocolo CoLa A
@@ -234,8 +289,7 @@ class ColaA_TCP():
             p_further_data_channel = str(further_data_channel)
             p_encoder = "01" if encoder else "00"
             data = self.send_socket(
-                message = f"sWN LMDscandatacfg {p_data_channel} 00 {p_further_data_channel} 1 0 {p_encoder} 00 0 0 0 0 +1",
-                buffer = 128
+                message = f"sWN LMDscandatacfg {p_data_channel} 00 {p_further_data_channel} 1 0 {p_encoder} 00 0 0 0 0 +1"
             )
             telegram = data.split()
         except Exception as e:
@@ -254,8 +308,7 @@ class ColaA_TCP():
             hex_start_angle = self.int_2hex(start_angle, 10000)
             hex_stop_angle = self.int_2hex(stop_angle, 10000)
             data = self.send_socket(
-                message = f"sWN LMPoutputRange 1 341 {hex_start_angle} {hex_stop_angle}",
-                buffer = 128
+                message = f"sWN LMPoutputRange 1 341 {hex_start_angle} {hex_stop_angle}"
             )
             telegram = data.split()
         except Exception as e:
@@ -276,8 +329,7 @@ class ColaA_TCP():
         """
         try:
             data = self.send_socket(
-                message = "sMN LIDrstencoderinc",
-                buffer = 128
+                message = "sMN LIDrstencoderinc"
             )
             if (data[2] == "0"):
                 raise Exception("Error trying to reset encoder values.")
@@ -285,13 +337,79 @@ class ColaA_TCP():
             raise e
         
     
+    def poll_one_frame(self) -> memoryview:
+        """
+        Requests one scan and returns its raw telegram, valid only until the next receive.
+        """
+        try:
+            self._send_telegram('sRN LMDscandata')
+            while True:
+                frame = self.receive_frame()
+                if frame[:15] == b"sRA LMDscandata":
+                    return frame
+        except Exception as e:
+            raise e
+    
     def poll_one_telegram(self):
         try:
-            data = self.send_socket(
-                message = 'sRN LMDscandata',
-                buffer = 10240
-            )
-            points = self.extract_telegram(data)
+            points = self.extract_telegram(self.poll_one_frame())
             return points
         except Exception as e:
             raise e
+    
+    def start_scan_stream(self, timeout: float = 1.0):
+        """
+        Section "4.2.2 Send data permanently" from the Sick Telegram Listing
+        - Subscribes to the LMDscandata event, so the sensor pushes every scan without being polled.
+        - timeout: maximum time, in seconds, to wait for a pushed telegram before raising.
+        """
+        try:
+            self.socket_sick.settimeout(timeout)
+            self._send_telegram("sEN LMDscandata 1")
+            while True:
+                telegram = self.receive_telegram().split()
+                if telegram[:2] == ["sEA", "LMDscandata"]:
+                    break
+        except Exception as e:
+            raise e
+        
+        if not (telegram[2] == "1"):
+            raise Exception("Error trying to subscribe to the scan data event.")
+        logger.info("Scan data stream started.")
+    
+    def stop_scan_stream(self, max_telegrams: int = 1000):
+        """
+        Unsubscribes from the LMDscandata event.
+        - Scans already in flight are discarded until the sensor acknowledges the unsubscription.
+        """
+        try:
+            self._send_telegram("sEN LMDscandata 0")
+            for _ in range(max_telegrams):
+                telegram = self.receive_telegram().split()
+                if telegram[:2] == ["sEA", "LMDscandata"]:
+                    logger.info("Scan data stream stopped.")
+                    return
+            raise Exception("The sensor did not acknowledge the unsubscription.")
+        except Exception as e:
+            raise Exception(f"Error in stop_scan_stream(): {e}")
+    
+    def read_stream_frame(self) -> memoryview:
+        """
+        Returns the raw telegram of the next scan pushed by the sensor, valid only until the next receive.
+        """
+        try:
+            while True:
+                frame = self.receive_frame()
+                if frame[:15] == b"sSN LMDscandata":
+                    return frame
+        except Exception as e:
+            raise e
+    
+    def read_stream_telegram(self):
+        """
+        Reads and extracts the next scan pushed by the sensor after start_scan_stream().
+        """
+        try:
+            return self.extract_telegram(self.read_stream_frame())
+        except Exception as e:
+            raise e
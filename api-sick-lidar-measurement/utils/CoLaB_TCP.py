@@ -0,0 +1,313 @@
+import socket
+import struct
+import time
+import numpy as np
+from utils.logger_config import logger
+from utils.scan_geometry import to_points
+from utils.scan_monitor import ScanHeader
+
+class ColaB_TCP():
+    """
+    Class that implements the comunication by Sick CoLa B (binary) protocol via TCP with the LMS4000 and LMS5xx sensors.
+    - Same public surface as ColaA_TCP, so the LMS4000 class can use any of them.
+    - Telegrams are received into a preallocated buffer and the scan data is decoded straight from it.
+    """
+    # Every CoLa B telegram starts with 4 STX bytes followed by the payload length (uint32)
+    STX = b'\x02\x02\x02\x02'
+    # Fixed part of the LMDscandata answer up to the number of encoders:
+    # version, device number, serial number, device status (2x), telegram counter, scan counter,
+    # time since start-up, time of transmission, digital inputs, digital outputs, reserved,
+    # scan frequency, measurement frequency, number of encoders
+    SCAN_HEADER = struct.Struct('>HHIBBHHIIHHHIIH')
+    ENCODER = struct.Struct('>IH')
+    # channel content (5 chars), scale factor, scale offset, start angle, angle step, number of values
+    CHANNEL = struct.Struct('>5sffiHH')
+
+    def __init__(self, ip:str, port:int, dtype=np.float64, encoder_resolution:float=0.2, buffer_size:int=16384) -> None:
+        # --- Dados do arquivo de configuração --- #
+        self._ip = ip
+        self._port = port
+        # --- Tipo dos pontos extraídos dos telegramas --- #
+        self._dtype = dtype
+        # --- Encoder resolution, in mm per tick --- #
+        self._encoder_resolution = encoder_resolution
+        # --- Objeto comunicação Socket --- #
+        self.socket_sick = None
+        # --- Reusable receive buffer --- #
+        self._buffer = bytearray(buffer_size)
+
+    @staticmethod
+    def checksum(payload) -> int:
+        """
+        XOR of all payload bytes.
+        """
+        return int(np.bitwise_xor.reduce(np.frombuffer(payload, dtype=np.uint8))) if len(payload) else 0
+
+    def send_socket(self, message: bytes) -> memoryview:
+        """
+        Sends one CoLa B telegram and returns the payload of the answer.
+        - Scans pushed by an active event subscription (sSN) are skipped.
+        - The returned memoryview points into the receive buffer and is only valid until the next receive.
+        """
+        self._send_telegram(message)
+        while True:
+            payload = self.receive_telegram()
+            if bytes(payload[:4]) != b"sSN ":
+                return payload
+
+    def _send_telegram(self, message: bytes) -> None:
+        """
+        Frames the message (STX, length, payload, checksum) and sends it, reconnecting if the connection was aborted.
+        """
+        frame = self.STX + struct.pack('>I', len(message)) + message + bytes([self.checksum(message)])
+        try:
+            self.socket_sick.sendall(frame)
+        except ConnectionAbortedError:
+            self.connect()
+            time.sleep(0.1)
+            self.socket_sick.sendall(frame)
+
+    def _recv_exact(self, view: memoryview) -> None:
+        """
+        Fills the whole view with bytes from the socket.
+        """
+        while len(view):
+            n = self.socket_sick.recv_into(view)
+            if n == 0:
+                raise ConnectionError("The LiDAR closed the connection.")
+            view = view[n:]
+
+    def receive_telegram(self) -> memoryview:
+        """
+        Reads the next complete telegram and returns its payload (without framing and checksum).
+        """
+        view = memoryview(self._buffer)
+        self._recv_exact(view[:8])
+        if bytes(view[:4]) != self.STX:
+            raise Exception("Invalid CoLa B telegram start.")
+        length = struct.unpack_from('>I', self._buffer, 4)[0]
+
+        if length + 1 > len(self._buffer):
+            # the buffer only grows, so big scans are allocated once per connection
+            self._buffer = bytearray(length + 1)
+            view = memoryview(self._buffer)
+        self._recv_exact(view[:length + 1])
+
+        payload = view[:length]
+        if self.checksum(payload) != self._buffer[length]:
+            raise Exception("Invalid CoLa B telegram checksum.")
+        return payload
+
+    def extract_header(self, payload: memoryview) -> ScanHeader:
+        """
+        Decodes the counters, times (microseconds) and device status of an LMDscandata telegram.
+        """
+        header = self.SCAN_HEADER.unpack_from(payload, len(b"sRA LMDscandata "))
+        return ScanHeader(
+            telegram_counter=header[5],
+            scan_counter=header[6],
+            time_since_startup=header[7],
+            time_of_transmission=header[8],
+            device_status=(header[3], header[4])
+        )
+
+    def extract_telegram(self, payload: memoryview) -> np.ndarray:
+        """
+        Decodes an LMDscandata answer (sRA) or event (sSN) into an (N, 3) array of points in meters.
+        - The distance channel is read with a big-endian uint16 view of the receive buffer.
+        """
+        try:
+            offset = len(b"sRA LMDscandata ")
+            header = self.SCAN_HEADER.unpack_from(payload, offset)
+            offset += self.SCAN_HEADER.size
+
+            num_of_encoders = header[-1]
+            encoder_current_num_of_ticks = 0
+            if num_of_encoders:
+                encoder_current_num_of_ticks = self.ENCODER.unpack_from(payload, offset)[0]
+            offset += num_of_encoders * self.ENCODER.size
+
+            num_of_16bit_channels = struct.unpack_from('>H', payload, offset)[0]
+            offset += 2
+            if num_of_16bit_channels == 0:
+                raise Exception("The telegram has no distance channel.")
+            content, scale_factor, scale_offset, start_angle, angle_step, value_count = self.CHANNEL.unpack_from(payload, offset)
+            offset += self.CHANNEL.size
+            if not content.startswith(b'DIST'):
+                raise Exception(f"Unexpected channel content: {content}")
+
+            raw = np.frombuffer(payload, dtype='>u2', count=value_count, offset=offset)
+            distances = (raw * scale_factor + scale_offset) / 1000.0
+
+            current_position = (encoder_current_num_of_ticks * self._encoder_resolution / 1000) # in meters
+
+            return to_points(distances, start_angle / 10000.0, angle_step / 10000.0, current_position, self._dtype)
+        except Exception as e:
+            raise e
+
+    def connect(self):
+        """
+        Cria a conexão Socket com o LiDAR
+        """
+        try:
+            logger.info("Trying to connect with LiDAR (CoLa B).")
+            self.socket_sick = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket_sick.connect((self._ip, self._port))
+            logger.info("socket connection has been created with LiDAR.")
+        except Exception as e:
+            raise Exception(f"Error in connect(): {e}")
+
+    def release(self) -> None:
+        """
+        Termina a Conexão Socket com o LiDAR
+        """
+        try:
+            self.socket_sick.close()
+            logger.info("Socket connection closed.")
+        except Exception as e:
+            raise e
+
+    """
+    # --- Implementação das mensagens --- #
+    """
+
+    def login(self):
+        """
+        Sends the message to login as Authorized Client
+        """
+        try:
+            data = self.send_socket(b"sMN SetAccessMode " + struct.pack('>BI', 0x03, 0xF4724744))
+        except Exception as e:
+            raise e
+
+        if not (bytes(data[:17]) == b"sAN SetAccessMode" and data[-1] == 1):
+            raise Exception("Could not login in LiDAR.")
+
+    def logout(self):
+        """
+        Logout the Authorized Client login
+        """
+        try:
+            self.send_socket(b"sMN Run")
+        except Exception as e:
+            raise e
+
+    def heartbeat(self):
+        """
+        Cheap read (scan configuration) used to check that the connection and the sensor still answer.
+        """
+        try:
+            data = self.send_socket(b"sRN LMPscancfg")
+        except Exception as e:
+            raise Exception(f"Error in heartbeat(): {e}")
+
+        if not (bytes(data[:14]) == b"sRA LMPscancfg"):
+            raise Exception(f"Unexpected heartbeat answer: {bytes(data[:14])}")
+
+    def config_scandata_content(self, data_channel=True, further_data_channel=2, encoder=True):
+        """
+        Section "4.3.1 Configure the data content for the scan" from the Sick Telegram Listing
+        - Same parameters as ColaA_TCP.config_scandata_content, sent as binary values.
+        """
+        try:
+            data = self.send_socket(
+                b"sWN LMDscandatacfg " + struct.pack(
+                    '>BBBBBBBBBBBh',
+                    1 if data_channel else 0, 0,    # data channel
+                    further_data_channel,
+                    1,                              # resolution: 16 bit
+                    0,                              # unit: digits
+                    1 if encoder else 0, 0,         # encoder
+                    0, 0, 0, 0,                     # position, device name, comment, time
+                    1                               # output rate
+                )
+            )
+        except Exception as e:
+            raise e
+
+        if not (bytes(data[:18]) == b"sWA LMDscandatacfg"):
+            raise Exception("Error trying to configure scan data.")
+
+    def reset_encoder_values(self):
+        """
+        Section "4.6.7 Reset encoder values" from the Sick Telegram Listing
+        """
+        try:
+            data = self.send_socket(b"sMN LIDrstencoderinc")
+            if (bytes(data[:20]) != b"sAN LIDrstencoderinc" or data[-1] == 0):
+                raise Exception("Error trying to reset encoder values.")
+        except Exception as e:
+            raise e
+
+    def poll_one_frame(self) -> memoryview:
+        """
+        Requests one scan and returns its raw payload, valid only until the next receive.
+        """
+        try:
+            return self.send_socket(b"sRN LMDscandata")
+        except Exception as e:
+            raise e
+
+    def poll_one_telegram(self):
+        try:
+            points = self.extract_telegram(self.poll_one_frame())
+            return points
+        except Exception as e:
+            raise e
+
+    def start_scan_stream(self, timeout: float = 1.0):
+        """
+        Section "4.2.2 Send data permanently" from the Sick Telegram Listing
+        - Subscribes to the LMDscandata event, so the sensor pushes every scan without being polled.
+        - timeout: maximum time, in seconds, to wait for a pushed telegram before raising.
+        """
+        try:
+            self.socket_sick.settimeout(timeout)
+            self._send_telegram(b"sEN LMDscandata " + b'\x01')
+            while True:
+                data = self.receive_telegram()
+                if bytes(data[:15]) == b"sEA LMDscandata":
+                    break
+        except Exception as e:
+            raise e
+
+        if not (data[-1] == 1):
+            raise Exception("Error trying to subscribe to the scan data event.")
+        logger.info("Scan data stream started.")
+
+    def stop_scan_stream(self, max_telegrams: int = 1000):
+        """
+        Unsubscribes from the LMDscandata event.
+        - Scans already in flight are discarded until the sensor acknowledges the unsubscription.
+        """
+        try:
+            self._send_telegram(b"sEN LMDscandata " + b'\x00')
+            for _ in range(max_telegrams):
+                data = self.receive_telegram()
+                if bytes(data[:15]) == b"sEA LMDscandata":
+                    logger.info("Scan data stream stopped.")
+                    return
+            raise Exception("The sensor did not acknowledge the unsubscription.")
+        except Exception as e:
+            raise Exception(f"Error in stop_scan_stream(): {e}")
+
+    def read_stream_frame(self) -> memoryview:
+        """
+        Returns the raw payload of the next scan pushed by the sensor, valid only until the next receive.
+        """
+        try:
+            while True:
+                data = self.receive_telegram()
+                if bytes(data[:15]) == b"sSN LMDscandata":
+                    return data
+        except Exception as e:
+            raise e
+
+    def read_stream_telegram(self):
+        """
+        Reads and extracts the next scan pushed by the sensor after start_scan_stream().
+        """
+        try:
+            return self.extract_telegram(self.read_stream_frame())
+        except Exception as e:
+            raise e
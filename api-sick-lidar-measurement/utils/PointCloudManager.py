@@ -1,9 +1,9 @@
-import io
-import base64
+import json
 import open3d as o3d
 import numpy as np
-import matplotlib.pyplot as plt
+from time import perf_counter
 from utils.logger_config import logger
+from utils.warping_plot import WarpingPlot
 
 class PointCloudManager:
     def __init__(self):
@@ -17,28 +17,96 @@ class PointCloudManager:
         except Exception as e:
             raise Exception(f"Error in loading point cloud from list: {e}")
     
-    def save_to_file(self, filename:str, format='pcd'):
+    def load_from_array(self, points:np.ndarray):
+        """
+        Loads an (N, 3) array of points, e.g. the view of the LMS4000 point buffer.
+        - Open3D keeps its own float64 storage, so that is the only copy made (float32 arrays are converted on the way).
+        - Open3D only takes writable arrays, so read-only ones (memory-mapped .npy files) are copied first.
+        """
+        try:
+            self._clear()
+            points = np.ascontiguousarray(points, dtype=np.float64)
+            if not points.flags.writeable:
+                points = points.copy()
+            self.point_cloud.points = o3d.utility.Vector3dVector(points)
+            logger.info(f"Point cloud loaded from array ({len(points)} points)")
+        except Exception as e:
+            raise Exception(f"Error in loading point cloud from array: {e}")
+    
+    def save_to_file(self, filename:str, format='pcd', compressed=False, write_ascii=False):
+        """
+        Saves the point cloud with Open3D (binary by default).
+        - compressed: binary_compressed PCD (only for 'pcd').
+        - write_ascii: ASCII PCD or PLY.
+        """
         try:
             if format == 'pcd' or format == 'ply':
-                o3d.io.write_point_cloud(filename+"."+format, self.point_cloud)
+                o3d.io.write_point_cloud(filename+"."+format, self.point_cloud, write_ascii=write_ascii, compressed=compressed)
             else:
                 raise ValueError("Unsupported file format. Use 'pcd' or 'ply'.")
             logger.info(f"Point cloud saved to {filename}")
         except Exception as e:
             raise Exception(f"Error in saving point cloud to file: {e}")
-
-    def filter_by_distance(self, distance:int):
+    
+    def save_to_npy(self, filename:str, metadata:dict=None):
+        """
+        Saves the points as a float32 (N, 3) NumPy array (filename.npy) with a JSON sidecar of metadata (filename.json).
+        - The .npy file can be memory-mapped back with load_points().
+        """
         try:
-            points = np.asarray(self.point_cloud.points)
-
-            self._filter_statistical_outliers()
+            np.save(filename+".npy", np.asarray(self.point_cloud.points, dtype=np.float32))
+            with open(filename+".json", "w") as file:
+                json.dump(metadata or {}, file, indent=2, default=str)
+            logger.info(f"Point cloud saved to {filename}")
+        except Exception as e:
+            raise Exception(f"Error in saving point cloud to npy: {e}")
+    
+    @staticmethod
+    def load_points(path:str) -> np.ndarray:
+        """
+        Reads the (N, 3) points of a saved file: .npy files are memory-mapped, .pcd/.ply files are read with Open3D.
+        """
+        try:
+            if path.endswith(".npy"):
+                return np.load(path, mmap_mode='r')
+            return np.asarray(o3d.io.read_point_cloud(path).points)
+        except Exception as e:
+            raise Exception(f"Error in loading points from {path}: {e}")
+    
+    def load_from_file(self, path:str):
+        try:
+            self.load_from_array(self.load_points(path))
+        except Exception as e:
+            raise Exception(f"Error in loading point cloud from file: {e}")
+    
+    def filter_by_distance(self, distance:int, outlier_filter:str="statistical", filter_params:dict=None):
+        """
+        Removes the points farther than the distance (Y coordinate) and then the outliers.
+        - The distance cut runs first, so the outlier filter only sees the points that are kept.
+        - outlier_filter: "statistical", "voxel" or "none" (see the _filter_* methods). The scan line filter is not
+          one of them: it needs the scans in the sensor frame, so LidarSensor applies it during the acquisition.
+        - filter_params: keyword arguments of the chosen filter method.
+        """
+        try:
+            filter_params = filter_params or {}
+            start = perf_counter()
 
             if (distance>0):
+                points = np.asarray(self.point_cloud.points)
                 # Filtra os pontos da nuvem onde a coordenada Y é maior que a distância especificada
                 filtered_points = points[points[:, 1] <= distance]
                 self.point_cloud.points = o3d.utility.Vector3dVector(filtered_points)
                 logger.info(f"Points with Y coordinate greater than {distance} have been removed.")
 
+            if outlier_filter == "statistical":
+                self._filter_statistical_outliers(**filter_params)
+            elif outlier_filter == "voxel":
+                self._filter_voxel_outliers(**filter_params)
+            elif outlier_filter != "none":
+                raise ValueError(f"Unsupported outlier filter: {outlier_filter}. Use 'statistical', 'voxel' or 'none'.")
+
+            logger.info(f"Point cloud filtered ({outlier_filter}) in {perf_counter()-start:.3f} s, {len(self.point_cloud.points)} points left.")
+
         except Exception as e:
             raise Exception(f"Error in filtering by distance: {e}")
     
@@ -46,6 +114,7 @@ class PointCloudManager:
         """
         ### WMUSS (Warping Measurement for Upper Surface Scan)
         - Just measures the warping of the top slab in a stack.
+        - Returns the warping and its WarpingPlot.
         """
         try:
             points = np.asarray(self.point_cloud.points)
@@ -70,39 +139,150 @@ class PointCloudManager:
             max_deviation = float(np.max(np.abs(deviations)))
             max_deviation_point = filtered_points[np.argmax(np.abs(deviations))]
 
-            # Plot the points, mean line, and max deviation point
-            plt.figure(figsize=(10, 6))
-            plt.scatter(filtered_z, filtered_y, s=1, c='blue', marker='.', label='Filtered Points')
-            plt.axhline(mean_y, color='green', linestyle='-', linewidth=2, label='Mean')
-            plt.axhline(ucl_y, color='red', linestyle='--', linewidth=2, label='UCL')
-            plt.axhline(lcl_y, color='red', linestyle='--', linewidth=2, label='LCL')
-            plt.scatter(max_deviation_point[2], max_deviation_point[1], color='red', s=50, label='Max Deviation')
-            plt.xlabel('Z')
-            plt.ylabel('Y')
-            plt.grid(True)
-            plt.legend()
-            plt.title(f'Max Deviation (Warping): {(max_deviation*100):.3f} cm')
-
-            # Save the image to a byte buffer
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png')
-            buffer.seek(0)  # Go back to the beginning of the buffer
-            plt.close()  # Close the figure to free memory
-            img_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-            return max_deviation, img_str
+            # Envelope of the points for the chart, rendered only when requested
+            plot = WarpingPlot.from_points(
+                filtered_z, filtered_y, mean_y, ucl_y, lcl_y,
+                (max_deviation_point[2], max_deviation_point[1]), max_deviation
+            )
+
+            return max_deviation, plot
 
         except Exception as e:
             raise Exception(f"Error in WMUSS: {e}")
     
-    def WMLSS(self):
+    def WMRSF(self, sample_size:int=20000, iterations:int=10, outlier_sigma:float=3.0, seed:int=0):
+        """
+        ### WMRSF (Warping Measurement by Reference Surface Fit)
+        - Alternative to WMUSS for the upper surface scan, not biased by the tilt of the slab relative to the sensor.
+        - A reference plane Y = a + b*X + c*Z is fitted by iteratively reweighted least squares (Tukey biweight)
+          on a random subsample of sample_size points, so the fit cost does not grow with the cloud size.
+        - The deviations from the plane are then computed for all the points at once; the ones beyond outlier_sigma
+          robust standard deviations (MAD of the subsample) are left out, as the 3-sigma limits of WMUSS.
+        - Returns the warping (largest deviation from the plane) and its WarpingPlot (deviations along Z).
+        """
+        try:
+            if iterations < 1:
+                raise ValueError("At least one iteration of the plane fit is required.")
+            points = np.asarray(self.point_cloud.points)
+            rng = np.random.default_rng(seed)
+            sample = points[rng.choice(len(points), sample_size, replace=False)] if len(points) > sample_size else points
+
+            # --- Robust plane fit on the subsample --- #
+            design = np.column_stack((np.ones(len(sample)), sample[:, 0], sample[:, 2]))
+            weights = np.ones(len(sample))
+            for _ in range(iterations):
+                root = np.sqrt(weights)
+                coefficients = np.linalg.lstsq(design * root[:, None], sample[:, 1] * root, rcond=None)[0]
+                residuals = sample[:, 1] - design @ coefficients
+                scale = 1.4826 * np.median(np.abs(residuals - np.median(residuals))) or 1e-9
+                # Tukey biweight: points beyond 4.685 robust standard deviations get no weight
+                u = np.clip(residuals / (4.685 * scale), -1, 1)
+                weights = (1 - u**2)**2
+
+            # --- Deviations of all the points from the plane --- #
+            a, b, c = coefficients
+            deviations = points[:, 1] - (a + b * points[:, 0] + c * points[:, 2])
+            limit = outlier_sigma * scale
+            within_control_limits = np.abs(deviations) <= limit
+            deviations = deviations[within_control_limits]
+            z = points[within_control_limits, 2]
+
+            worst = np.argmax(np.abs(deviations))
+            max_deviation = float(abs(deviations[worst]))
+            logger.info(f"WMRSF: plane Y = {a:.4f} + {b:.5f} X + {c:.5f} Z fitted on {len(sample)} points, {int(np.count_nonzero(~within_control_limits))} points beyond {limit*100:.3f} cm.")
+
+            # Envelope of the deviations for the chart, rendered only when requested
+            plot = WarpingPlot.from_points(
+                z, deviations, 0.0, limit, -limit,
+                (z[worst], deviations[worst]), max_deviation
+            )
+
+            return max_deviation, plot
+
+        except Exception as e:
+            raise Exception(f"Error in WMRSF: {e}")
+    
+    def WMLSS(self, stack_axis:int=0, bin_size:float=0.005, gap_ratio:float=0.05, min_thickness:float=0.02, z_bin_size:float=0.01, min_points:int=100):
         """
         ### WMLSS (Warping Measurement for Lateral Stack Scan)
-        - Method for lateral measureent.
-        - Virtual Twine Method.
+        - Method for lateral measureent: the sensor sees the side faces of a stack of slabs.
+        - The slabs are segmented in one pass by a histogram along the stacking axis (stack_axis, X by default):
+          bins with less than gap_ratio of the fullest bin are gaps, runs thinner than min_thickness are ignored.
+        - Virtual Twine Method: the profile of each slab along Z (mean position on the stacking axis per z_bin_size)
+          is compared with a straight twine between its two ends; the warping is the largest deviation.
+          The profiles and twines of all slabs are computed together as (slabs, Z bins) arrays.
+        - Returns the largest warping and the slabs, from the lowest to the highest position on the stacking axis.
         """
         try:
-            pass
+            points = np.asarray(self.point_cloud.points)
+            s = points[:, stack_axis]
+            z = points[:, 2]
+
+            # --- Segmentation of the stack --- #
+            s_min = float(s.min())
+            bins = ((s - s_min) / bin_size).astype(np.int64)
+            counts = np.bincount(bins)
+            occupied = counts > gap_ratio * counts.max()
+            edges = np.diff(np.r_[0, occupied.astype(np.int8), 0])
+            run_starts = np.flatnonzero(edges == 1)
+            run_ends = np.flatnonzero(edges == -1)      # exclusive
+            thick = (run_ends - run_starts) * bin_size >= min_thickness
+            run_starts, run_ends = run_starts[thick], run_ends[thick]
+            if len(run_starts) == 0:
+                raise Exception("No slab was found in the lateral scan.")
+
+            # slab of each histogram bin (-1 for gaps), then of each point
+            bin_index = np.arange(len(counts))
+            bin_slab = np.searchsorted(run_starts, bin_index, side='right') - 1
+            bin_slab[(bin_slab < 0) | (bin_index >= run_ends[np.maximum(bin_slab, 0)])] = -1
+            labels = bin_slab[bins]
+            inside = labels >= 0
+            labels, s, z = labels[inside], s[inside], z[inside]
+
+            # --- Profile of every slab along Z --- #
+            n_slabs = len(run_starts)
+            z_min = float(z.min())
+            z_bins = ((z - z_min) / z_bin_size).astype(np.int64)
+            n_z = int(z_bins.max()) + 1
+            key = labels * n_z + z_bins
+            bin_counts = np.bincount(key, minlength=n_slabs * n_z).reshape(n_slabs, n_z)
+            bin_sums = np.bincount(key, weights=s, minlength=n_slabs * n_z).reshape(n_slabs, n_z)
+            valid = bin_counts > 0
+            profile = np.divide(bin_sums, bin_counts, out=np.full(bin_sums.shape, np.nan), where=valid)
+
+            # --- Virtual twine between the ends of every slab --- #
+            rows = np.arange(n_slabs)
+            first = np.argmax(valid, axis=1)
+            last = n_z - 1 - np.argmax(valid[:, ::-1], axis=1)
+            span = np.maximum(last - first, 1)
+            t = (np.arange(n_z)[None, :] - first[:, None]) / span[:, None]
+            twine = profile[rows, first][:, None] + (profile[rows, last] - profile[rows, first])[:, None] * t
+            deviations = np.where(valid, np.abs(profile - twine), -np.inf)
+            worst = np.argmax(deviations, axis=1)
+            warpings = deviations[rows, worst]
+
+            slab_points = bin_counts.sum(axis=1)
+            slabs = [
+                {
+                    "slab": n,
+                    "bottom": s_min + run_starts[n] * bin_size,
+                    "top": s_min + run_ends[n] * bin_size,
+                    "points": int(slab_points[n]),
+                    "length": (last[n] - first[n] + 1) * z_bin_size,
+                    "warping": float(warpings[n]),
+                    "max_deviation_z": z_min + (worst[n] + 0.5) * z_bin_size,
+                }
+                for n in range(n_slabs) if slab_points[n] >= min_points
+            ]
+            if not slabs:
+                raise Exception("No slab with enough points was found in the lateral scan.")
+            for number, slab in enumerate(slabs):
+                slab["slab"] = number
+
+            warpings_cm = ", ".join(f"{slab['warping']*100:.3f}" for slab in slabs)
+            logger.info(f"WMLSS: {len(slabs)} slab(s) found, warping {warpings_cm} cm.")
+            return max(slab["warping"] for slab in slabs), slabs
+
         except Exception as e:
             raise Exception(f"Error in WMLSS: {e}")
     
@@ -114,6 +294,18 @@ class PointCloudManager:
         except Exception as e:
             raise Exception(f"Error in statistical outlier filtering: {e}")
     
+    def _filter_voxel_outliers(self, voxel_size=0.005, nb_neighbors=20, std_ratio=2.0):
+        """
+        Voxel downsampling followed by the statistical outlier filter on the (much smaller) downsampled cloud.
+        - The points of each voxel are replaced by their centroid.
+        """
+        try:
+            self.point_cloud = self.point_cloud.voxel_down_sample(voxel_size=voxel_size)
+            logger.info(f"Voxel downsampling ({voxel_size} m) applied to the point cloud.")
+            self._filter_statistical_outliers(nb_neighbors=nb_neighbors, std_ratio=std_ratio)
+        except Exception as e:
+            raise Exception(f"Error in voxel outlier filtering: {e}")
+    
     def _clear(self):
         try:
             if self.point_cloud.has_points():
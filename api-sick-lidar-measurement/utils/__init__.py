@@ -1,4 +1,5 @@
 from .config import Config
 from .logger_config import logger
 from .measurement import Measurement
+from .jobs import Job, JobManager
 from .api import API
\ No newline at end of file
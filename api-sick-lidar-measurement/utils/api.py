@@ -1,6 +1,10 @@
 import uvicorn
-from fastapi import FastAPI
-from utils import logger, Config, Measurement
+from datetime import datetime
+from fastapi import FastAPI, Request, Query
+from fastapi.responses import JSONResponse, Response
+from utils import logger, Config, Measurement, JobManager
+from utils.metrics import registry
+from utils.measurement_history import end_time
 
 class API:
     def __init__(self, conf: Config):
@@ -8,31 +12,84 @@ class API:
 
         self.measure = Measurement(conf)
 
+        self.jobs = JobManager(self.measure, max_queued=conf.max_queued_jobs)
+
         self.app = FastAPI()
 
-        @self.app.post("/start")
+        @self.app.post("/start", status_code=202)
         def start_measurement():
-            try:
-                logger.info("Measurement start request received.")
-
-                self.measure.measurement_routine()
+            logger.info("Measurement start request received.")
 
-                logger.info("Warping Measurement Success")
+            job = self.jobs.submit()
+            if job is None:
+                logger.info("Measurement start request rejected: a measurement is already acquiring.")
+                return JSONResponse(status_code=409, content={"Status": "busy"})
 
-                return {"Status": "success"}    
-            except:
-                logger.error("Warping Measurement Error.")
-                return {"Status": "error"}
+            return {"Status": "accepted", "job_id": job.id}
+        
+        @self.app.get("/jobs/{job_id}")
+        def get_job(job_id: str):
+            job = self.jobs.get(job_id)
+            if job is None:
+                return JSONResponse(status_code=404, content={"Status": "not found"})
+            return job.to_dict()
         
         @self.app.get("/warping")
         def get_warping():
             logger.info("Warping result request received.")
-            return {"warping": f"{(self.measure.warping*100):.3f}"}
+            return self.measure.result
+        
+        @self.app.get("/measurements")
+        def get_measurements(
+            start: datetime = Query(None, alias="from"),
+            end: str = Query(None, alias="to"),
+            min_warping: float = None,
+            max_warping: float = None,
+            limit: int = Query(100, ge=1, le=1000),
+            offset: int = Query(0, ge=0)
+        ):
+            """
+            History of the measurements, newest first. Warping values (filters and results) are in cm, as in GET /warping.
+            - from/to: ISO 8601 times, converted to local time if they have a time zone; a date alone as `to` includes the whole day.
+            """
+            logger.info("Measurement history request received.")
+            try:
+                end = end_time(end) if end is not None else None
+            except ValueError:
+                return JSONResponse(status_code=422, content={"Status": f"invalid to: {end}"})
+            items, total = self.measure.history.query(
+                start, end,
+                min_warping/100 if min_warping is not None else None,
+                max_warping/100 if max_warping is not None else None,
+                limit, offset
+            )
+            for item in items:
+                item["warping"] = round(item["warping"]*100, 3)
+            return {"total": total, "limit": limit, "offset": offset, "items": items}
+        
+        if self.measure.provisional_enabled:
+            @self.app.get("/warping/provisional")
+            def get_provisional_warping():
+                logger.info("Provisional warping request received.")
+                warping = self.measure.provisional_warping
+                return {"warping": f"{(warping*100):.3f}" if warping is not None else None}
         
         @self.app.get("/warping_image")
-        def get_warping_image():
+        def get_warping_image(request: Request):
             logger.info("Warping image request received.")
-            return self.measure.warping_image
+            plot = self.measure.warping_plot
+            if plot is None:
+                return JSONResponse(status_code=404, content={"Status": "no measurement"})
+            if request.headers.get("if-none-match") == plot.etag:
+                return Response(status_code=304, headers={"ETag": plot.etag})
+            return Response(content=plot.render(), media_type="image/png", headers={"ETag": plot.etag})
+
+        @self.app.get("/metrics")
+        def get_metrics():
+            """
+            Stage timings and counters of the measurements, in the Prometheus text format.
+            """
+            return Response(content=registry.render(), media_type=registry.CONTENT_TYPE)
 
     def start(self):
         try:
@@ -45,4 +102,7 @@ class API:
         except KeyboardInterrupt:
             logger.info("The API was finished by a KeyboardInterrupt.")
         except Exception as e:
-            logger.error(f"Error starting the API: {e}")
\ No newline at end of file
+            logger.error(f"Error starting the API: {e}")
+        finally:
+            self.jobs.shutdown()
+            self.measure.shutdown()
\ No newline at end of file
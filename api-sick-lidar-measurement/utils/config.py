@@ -3,19 +3,75 @@ from os import getcwd
 from os.path import join, exists
 
 class Config:
+    # Values of [API] warping_method
+    WARPING_METHODS = ("wmuss", "incremental", "surface", "wmlss")
+
     def __init__(self) -> None:
         # API
         self._API_host = ""
         self._API_port = 0
         self._distance = 0
+        self._max_queued_jobs = 0
+        self._warping_method = ""
+        self._provisional_warping = False
+        self._post_processing_workers = 0
+        self._representation = ""
         # LMS4000
         self._LMS4000_lidar_ip = ""
         self._LMS4000_lidar_port = 0
         self._LMS4000_start_angle = 0
         self._LMS4000_stop_angle = 0
+        self._LMS4000_acquisition_mode = ""
+        self._LMS4000_scan_frequency = 0.0
+        self._LMS4000_protocol = ""
+        self._LMS4000_point_dtype = ""
+        self._LMS4000_queue_size = 0
+        self._LMS4000_parser_workers = 0
+        self._LMS4000_persistent_session = False
+        self._LMS4000_keepalive_interval = 0.0
+        self._LMS4000_encoder_resolution = 0.0
+        self._LMS4000_pose = ()
+        # SENSOR:<name> (additional sensors)
+        self._SENSORS_extra = []
+        # FILTER
+        self._FILTER_method = ""
+        self._FILTER_nb_neighbors = 0
+        self._FILTER_std_ratio = 0.0
+        self._FILTER_voxel_size = 0.0
+        self._FILTER_scanline_window = 0
+        self._FILTER_scanline_threshold = 0.0
+        self._FILTER_scanline_min_neighbors = 0
+
+        # HEIGHTMAP
+        self._HEIGHTMAP_z_bin_size = 0.0
+
+        # SURFACE
+        self._SURFACE_sample_size = 0
+        self._SURFACE_iterations = 0
+        self._SURFACE_outlier_sigma = 0.0
+        self._SURFACE_seed = 0
+
+        # WMLSS
+        self._WMLSS_stack_axis = 0
+        self._WMLSS_bin_size = 0.0
+        self._WMLSS_gap_ratio = 0.0
+        self._WMLSS_min_thickness = 0.0
+        self._WMLSS_z_bin_size = 0.0
+        self._WMLSS_min_points = 0
+        # STORAGE
+        self._STORAGE_directory = ""
+        self._STORAGE_format = ""
+        self._STORAGE_max_files = 0
+        self._STORAGE_max_age_days = 0.0
+        self._STORAGE_max_total_mb = 0.0
+        self._STORAGE_database = ""
         # API-MOTOR
         self._API_MOTOR_ip = ""
         self._API_MOTOR_port = 0
+        self._API_MOTOR_connect_timeout = 0.0
+        self._API_MOTOR_read_timeout = 0.0
+        self._API_MOTOR_retries = 0
+        self._API_MOTOR_concurrent_start = False
     
     # --- API --- #
     @property
@@ -29,6 +85,26 @@ class Config:
     @property
     def distance(self):
         return self._distance
+    
+    @property
+    def max_queued_jobs(self):
+        return self._max_queued_jobs
+    
+    @property
+    def warping_method(self):
+        return self._warping_method
+    
+    @property
+    def provisional_warping(self):
+        return self._provisional_warping
+    
+    @property
+    def post_processing_workers(self):
+        return self._post_processing_workers
+    
+    @property
+    def representation(self):
+        return self._representation
     # --- --- #
     
     # --- LMS4000 --- #
@@ -47,6 +123,148 @@ class Config:
     @property
     def LMS4000_stop_angle(self):
         return self._LMS4000_stop_angle
+    
+    @property
+    def LMS4000_acquisition_mode(self):
+        return self._LMS4000_acquisition_mode
+    
+    @property
+    def LMS4000_scan_frequency(self):
+        return self._LMS4000_scan_frequency
+    
+    @property
+    def LMS4000_protocol(self):
+        return self._LMS4000_protocol
+    
+    @property
+    def LMS4000_point_dtype(self):
+        return self._LMS4000_point_dtype
+    
+    @property
+    def LMS4000_queue_size(self):
+        return self._LMS4000_queue_size
+    
+    @property
+    def LMS4000_parser_workers(self):
+        return self._LMS4000_parser_workers
+    
+    @property
+    def LMS4000_persistent_session(self):
+        return self._LMS4000_persistent_session
+    
+    @property
+    def LMS4000_keepalive_interval(self):
+        return self._LMS4000_keepalive_interval
+    
+    @property
+    def LMS4000_encoder_resolution(self):
+        return self._LMS4000_encoder_resolution
+    
+    @property
+    def LMS4000_pose(self):
+        return self._LMS4000_pose
+    
+    @property
+    def sensors(self):
+        """
+        Sensors acquired in each measurement: the [LMS4000] sensor first, then one per [SENSOR:<name>] section.
+        - Each one is a dict with name, model, ip, port, protocol, start_angle, stop_angle, scan_frequency,
+          encoder_resolution (mm per tick) and pose (x, y, z in meters, roll, pitch, yaw in degrees).
+        """
+        primary = {
+            "name": "lms4000",
+            "model": "lms4000",
+            "ip": self._LMS4000_lidar_ip,
+            "port": self._LMS4000_lidar_port,
+            "protocol": self._LMS4000_protocol,
+            "start_angle": self._LMS4000_start_angle,
+            "stop_angle": self._LMS4000_stop_angle,
+            "scan_frequency": self._LMS4000_scan_frequency,
+            "encoder_resolution": self._LMS4000_encoder_resolution,
+            "pose": self._LMS4000_pose,
+        }
+        return [primary] + [dict(sensor) for sensor in self._SENSORS_extra]
+    # --- --- #
+
+    # --- FILTER --- #
+    @property
+    def FILTER_method(self):
+        return self._FILTER_method
+    
+    @property
+    def FILTER_params(self):
+        """
+        Keyword arguments of the configured outlier filter method.
+        """
+        if self._FILTER_method == "statistical":
+            return {"nb_neighbors": self._FILTER_nb_neighbors, "std_ratio": self._FILTER_std_ratio}
+        if self._FILTER_method == "voxel":
+            return {"voxel_size": self._FILTER_voxel_size, "nb_neighbors": self._FILTER_nb_neighbors, "std_ratio": self._FILTER_std_ratio}
+        if self._FILTER_method == "scanline":
+            return {"window": self._FILTER_scanline_window, "threshold": self._FILTER_scanline_threshold, "min_neighbors": self._FILTER_scanline_min_neighbors}
+        return {}
+    # --- --- #
+
+    # --- HEIGHTMAP --- #
+    @property
+    def HEIGHTMAP_z_bin_size(self):
+        return self._HEIGHTMAP_z_bin_size
+    # --- --- #
+
+    # --- SURFACE --- #
+    @property
+    def SURFACE_params(self):
+        """
+        Keyword arguments of PointCloudManager.WMRSF.
+        """
+        return {
+            "sample_size": self._SURFACE_sample_size,
+            "iterations": self._SURFACE_iterations,
+            "outlier_sigma": self._SURFACE_outlier_sigma,
+            "seed": self._SURFACE_seed,
+        }
+    # --- --- #
+
+    # --- WMLSS --- #
+    @property
+    def WMLSS_params(self):
+        """
+        Keyword arguments of PointCloudManager.WMLSS.
+        """
+        return {
+            "stack_axis": self._WMLSS_stack_axis,
+            "bin_size": self._WMLSS_bin_size,
+            "gap_ratio": self._WMLSS_gap_ratio,
+            "min_thickness": self._WMLSS_min_thickness,
+            "z_bin_size": self._WMLSS_z_bin_size,
+            "min_points": self._WMLSS_min_points,
+        }
+    # --- --- #
+
+    # --- STORAGE --- #
+    @property
+    def STORAGE_directory(self):
+        return self._STORAGE_directory
+    
+    @property
+    def STORAGE_format(self):
+        return self._STORAGE_format
+    
+    @property
+    def STORAGE_max_files(self):
+        return self._STORAGE_max_files
+    
+    @property
+    def STORAGE_max_age_days(self):
+        return self._STORAGE_max_age_days
+    
+    @property
+    def STORAGE_max_total_mb(self):
+        return self._STORAGE_max_total_mb
+    
+    @property
+    def STORAGE_database(self):
+        return self._STORAGE_database
     # --- --- #
 
     # --- API-MOTOR --- #
@@ -57,8 +275,31 @@ class Config:
     @property
     def API_MOTOR_port(self):
         return self._API_MOTOR_port
+    
+    @property
+    def API_MOTOR_connect_timeout(self):
+        return self._API_MOTOR_connect_timeout
+    
+    @property
+    def API_MOTOR_read_timeout(self):
+        return self._API_MOTOR_read_timeout
+    
+    @property
+    def API_MOTOR_retries(self):
+        return self._API_MOTOR_retries
+    
+    @property
+    def API_MOTOR_concurrent_start(self):
+        return self._API_MOTOR_concurrent_start
     # --- --- #
 
+    @staticmethod
+    def _read_pose(value:str) -> tuple:
+        pose = tuple(float(v) for v in value.split())
+        if len(pose) != 6:
+            raise ValueError(f"The sensor pose must have 6 values (x y z roll pitch yaw): {value}")
+        return pose
+
     def read_config_file(self):
         """
         Read the config.ini file.
@@ -76,16 +317,98 @@ class Config:
             self._API_host = str(config["API"]["host"])
             self._API_port = int(config["API"]["port"])
             self._distance = int(config["API"]["distance"])
+            self._max_queued_jobs = int(config["API"].get("max_queued_jobs", "0"))
+            self._warping_method = str(config["API"].get("warping_method", "wmuss"))
+            if self._warping_method not in self.WARPING_METHODS:
+                raise ValueError(f"Unsupported warping method: {self._warping_method}. Use one of {', '.join(self.WARPING_METHODS)}.")
+            self._provisional_warping = config["API"].getboolean("provisional_warping", False)
+            self._post_processing_workers = int(config["API"].get("post_processing_workers", "1"))
+            self._representation = str(config["API"].get("representation", "points"))
 
             # LMS4000
             self._LMS4000_lidar_ip = str(config["LMS4000"]["ip"])
             self._LMS4000_lidar_port = int(config["LMS4000"]["port"])
             self._LMS4000_start_angle = int(config["LMS4000"]["start_angle"])
             self._LMS4000_stop_angle = int(config["LMS4000"]["stop_angle"])
+            self._LMS4000_acquisition_mode = str(config["LMS4000"].get("acquisition_mode", "poll"))
+            self._LMS4000_scan_frequency = float(config["LMS4000"].get("scan_frequency", "600"))
+            self._LMS4000_protocol = str(config["LMS4000"].get("protocol", "cola_a"))
+            self._LMS4000_point_dtype = str(config["LMS4000"].get("point_dtype", "float64"))
+            self._LMS4000_queue_size = int(config["LMS4000"].get("queue_size", "1200"))
+            self._LMS4000_parser_workers = int(config["LMS4000"].get("parser_workers", "1"))
+            self._LMS4000_persistent_session = config["LMS4000"].getboolean("persistent_session", False)
+            self._LMS4000_keepalive_interval = float(config["LMS4000"].get("keepalive_interval", "5"))
+            self._LMS4000_encoder_resolution = float(config["LMS4000"].get("encoder_resolution", "0.2"))
+            self._LMS4000_pose = self._read_pose(config["LMS4000"].get("pose", "0 0 0 0 0 0"))
+
+            # SENSOR:<name>
+            self._SENSORS_extra = []
+            for section in config.sections():
+                if not section.startswith("SENSOR:"):
+                    continue
+                sensor = config[section]
+                model = str(sensor.get("model", "lms5xx"))
+                self._SENSORS_extra.append({
+                    "name": section[len("SENSOR:"):],
+                    "model": model,
+                    "ip": str(sensor["ip"]),
+                    "port": int(sensor["port"]),
+                    "protocol": str(sensor.get("protocol", self._LMS4000_protocol)),
+                    "start_angle": int(sensor["start_angle"]),
+                    "stop_angle": int(sensor["stop_angle"]),
+                    "scan_frequency": float(sensor.get("scan_frequency", "600" if model == "lms4000" else "50")),
+                    "encoder_resolution": float(sensor.get("encoder_resolution", "0.2")),
+                    "pose": self._read_pose(sensor.get("pose", "0 0 0 0 0 0")),
+                })
+
+            # FILTER
+            filter_section = config["FILTER"] if config.has_section("FILTER") else {}
+            self._FILTER_method = str(filter_section.get("method", "statistical"))
+            self._FILTER_nb_neighbors = int(filter_section.get("nb_neighbors", "20"))
+            self._FILTER_std_ratio = float(filter_section.get("std_ratio", "2.0"))
+            self._FILTER_voxel_size = float(filter_section.get("voxel_size", "0.005"))
+            self._FILTER_scanline_window = int(filter_section.get("scanline_window", "2"))
+            self._FILTER_scanline_threshold = float(filter_section.get("scanline_threshold", "0.01"))
+            self._FILTER_scanline_min_neighbors = int(filter_section.get("scanline_min_neighbors", "1"))
+
+            # HEIGHTMAP
+            height_map_section = config["HEIGHTMAP"] if config.has_section("HEIGHTMAP") else {}
+            self._HEIGHTMAP_z_bin_size = float(height_map_section.get("z_bin_size", "0.005"))
+
+            # SURFACE
+            surface_section = config["SURFACE"] if config.has_section("SURFACE") else {}
+            self._SURFACE_sample_size = int(surface_section.get("sample_size", "20000"))
+            self._SURFACE_iterations = int(surface_section.get("iterations", "10"))
+            if self._SURFACE_iterations < 1:
+                raise ValueError("[SURFACE] iterations must be at least 1.")
+            self._SURFACE_outlier_sigma = float(surface_section.get("outlier_sigma", "3.0"))
+            self._SURFACE_seed = int(surface_section.get("seed", "0"))
+
+            # WMLSS
+            wmlss_section = config["WMLSS"] if config.has_section("WMLSS") else {}
+            self._WMLSS_stack_axis = {"x": 0, "y": 1}[str(wmlss_section.get("stack_axis", "x")).lower()]
+            self._WMLSS_bin_size = float(wmlss_section.get("bin_size", "0.005"))
+            self._WMLSS_gap_ratio = float(wmlss_section.get("gap_ratio", "0.05"))
+            self._WMLSS_min_thickness = float(wmlss_section.get("min_thickness", "0.02"))
+            self._WMLSS_z_bin_size = float(wmlss_section.get("z_bin_size", "0.01"))
+            self._WMLSS_min_points = int(wmlss_section.get("min_points", "100"))
+
+            # STORAGE
+            storage_section = config["STORAGE"] if config.has_section("STORAGE") else {}
+            self._STORAGE_directory = str(storage_section.get("directory", "PCDs"))
+            self._STORAGE_format = str(storage_section.get("format", "pcd"))
+            self._STORAGE_max_files = int(storage_section.get("max_files", "0"))
+            self._STORAGE_max_age_days = float(storage_section.get("max_age_days", "0"))
+            self._STORAGE_max_total_mb = float(storage_section.get("max_total_mb", "0"))
+            self._STORAGE_database = str(storage_section.get("database", "measurements.db"))
 
             # API-MOTOR
             self._API_MOTOR_ip = str(config["API-MOTOR"]["ip"])
             self._API_MOTOR_port = int(config["API-MOTOR"]["port"])
+            self._API_MOTOR_connect_timeout = float(config["API-MOTOR"].get("connect_timeout", "1"))
+            self._API_MOTOR_read_timeout = float(config["API-MOTOR"].get("read_timeout", "5"))
+            self._API_MOTOR_retries = int(config["API-MOTOR"].get("retries", "2"))
+            self._API_MOTOR_concurrent_start = config["API-MOTOR"].getboolean("concurrent_start", False)
 
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Error reading the configuration file: {e}")
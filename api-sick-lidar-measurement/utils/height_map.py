@@ -0,0 +1,112 @@
+import numpy as np
+
+class HeightMap():
+    """
+    2.5D representation of the slab: the profiles binned on a fixed Z grid (encoder position) by beam, in place of
+    one 3-D point per beam and scan.
+    - Scans at the same encoder position (slow or stopped motor) fall in the same row and are averaged, so the memory
+      grows with the slab length and not with the acquisition time.
+    - Each cell keeps the sum of X and Y of its samples and their number; the rows grow as the encoder advances.
+    - points() gives one point per occupied cell (mean X and Y, Z of the row center) in scan line order,
+      so the filters and warping methods of PointCloudManager run on it as on the raw points.
+    """
+    def __init__(self, z_bin_size:float=0.005, dtype=np.float64, initial_rows:int=1024) -> None:
+        if z_bin_size <= 0:
+            raise ValueError("The Z bin size of the height map must be positive.")
+        self._z_bin_size = z_bin_size
+        self._dtype = np.dtype(dtype)
+        self._initial_rows = initial_rows
+        self._beams = 0
+        self._origin = 0        # row number (Z / z_bin_size) of the first row of the arrays
+        self._rows = 0          # rows in use
+        self._sum_x = np.zeros((0, 0), dtype=self._dtype)
+        self._sum_y = np.zeros((0, 0), dtype=self._dtype)
+        self._count = np.zeros((0, 0), dtype=np.int32)
+        self._samples = 0
+
+    @property
+    def z_bin_size(self):
+        return self._z_bin_size
+
+    @property
+    def shape(self):
+        """
+        (rows, beams) of the filled part of the grid.
+        """
+        return (self._rows, self._beams)
+
+    @property
+    def samples(self):
+        """
+        Number of points added.
+        """
+        return self._samples
+
+    @property
+    def cells(self):
+        """
+        Number of occupied cells, i.e. of points given by points().
+        """
+        return int(np.count_nonzero(self._count[:self._rows]))
+
+    @property
+    def nbytes(self):
+        return self._sum_x.nbytes + self._sum_y.nbytes + self._count.nbytes
+
+    def add(self, points:np.ndarray, valid:np.ndarray=None) -> None:
+        """
+        Adds the (N, 3) points of one scan, N being the same for every scan (one column per beam).
+        - valid: optional (N,) mask of the points to add, the others leave their cell untouched.
+        """
+        if self._beams == 0:
+            self._beams = len(points)
+        elif len(points) != self._beams:
+            raise ValueError(f"Scan with {len(points)} points in a height map of {self._beams} beams.")
+
+        rows = np.floor(points[:, 2] / self._z_bin_size).astype(np.int64)
+        if self._rows == 0:
+            self._origin = int(rows.min())
+        if int(rows.min()) < self._origin:
+            raise ValueError("The height map only grows forward along Z.")
+        self._ensure(int(rows.max()) - self._origin + 1)
+
+        # one cell per beam, so the indexes of a scan are unique and a buffered add is enough;
+        # without a pose (or with one that keeps Z) the whole scan is in one row
+        index = rows[0] - self._origin if rows[0] == rows[-1] and (rows == rows[0]).all() else (rows - self._origin, np.arange(self._beams))
+        if valid is None:
+            self._sum_x[index] += points[:, 0]
+            self._sum_y[index] += points[:, 1]
+            self._count[index] += 1
+            self._samples += len(points)
+        else:
+            self._sum_x[index] += np.where(valid, points[:, 0], 0)
+            self._sum_y[index] += np.where(valid, points[:, 1], 0)
+            self._count[index] += valid
+            self._samples += int(np.count_nonzero(valid))
+
+    def points(self) -> np.ndarray:
+        """
+        (M, 3) array with the mean point of every occupied cell, row by row.
+        """
+        count = self._count[:self._rows]
+        rows, beams = np.nonzero(count)
+        samples = count[rows, beams]
+        points = np.empty((len(rows), 3), dtype=self._dtype)
+        np.divide(self._sum_x[rows, beams], samples, out=points[:, 0], casting='unsafe')
+        np.divide(self._sum_y[rows, beams], samples, out=points[:, 1], casting='unsafe')
+        points[:, 2] = (rows + self._origin + 0.5) * self._z_bin_size
+        return points
+
+    def _ensure(self, rows:int) -> None:
+        if rows <= len(self._count):
+            self._rows = max(self._rows, rows)
+            return
+        capacity = max(len(self._count), self._initial_rows)
+        while capacity < rows:
+            capacity *= 2
+        for name in ("_sum_x", "_sum_y", "_count"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, self._beams), dtype=old.dtype)
+            new[:len(old), :old.shape[1]] = old
+            setattr(self, name, new)
+        self._rows = rows
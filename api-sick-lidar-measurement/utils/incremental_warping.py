@@ -0,0 +1,168 @@
+import threading
+import numpy as np
+from utils.warping_plot import WarpingPlot
+
+class BinnedExtrema():
+    """
+    Count, minimum and maximum of a value per fixed-size bin of a key, on arrays that grow on both sides as new keys arrive.
+    """
+    def __init__(self, bin_size:float) -> None:
+        self._bin_size = bin_size
+        self._origin = 0        # bin number of the first position of the arrays
+        self._count = np.zeros(0, dtype=np.int64)
+        self._min = np.zeros(0)
+        self._max = np.zeros(0)
+
+    @property
+    def bin_size(self):
+        return self._bin_size
+
+    def update(self, keys:np.ndarray, values:np.ndarray) -> None:
+        bins = np.floor(keys / self._bin_size).astype(np.int64)
+        self._ensure(int(bins.min()), int(bins.max()))
+        index = bins - self._origin
+        np.add.at(self._count, index, 1)
+        np.minimum.at(self._min, index, values)
+        np.maximum.at(self._max, index, values)
+
+    def occupied(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Start of each occupied bin, with the minimum and maximum values inside it.
+        """
+        index = np.flatnonzero(self._count)
+        return (index + self._origin) * self._bin_size, self._min[index], self._max[index]
+
+    def _ensure(self, first:int, last:int) -> None:
+        if len(self._count) == 0:
+            self._origin = first
+        start = min(first, self._origin)
+        stop = max(last + 1, self._origin + len(self._count))
+        if start == self._origin and stop == self._origin + len(self._count):
+            return
+        # leave some room to avoid growing on every update
+        margin = max(16, (stop - start) // 2)
+        start = start - margin if start < self._origin else start
+        stop = stop + margin if stop > self._origin + len(self._count) else stop
+
+        count = np.zeros(stop - start, dtype=np.int64)
+        minimum = np.full(stop - start, np.inf)
+        maximum = np.full(stop - start, -np.inf)
+        offset = self._origin - start
+        count[offset:offset + len(self._count)] = self._count
+        minimum[offset:offset + len(self._min)] = self._min
+        maximum[offset:offset + len(self._max)] = self._max
+        self._origin, self._count, self._min, self._max = start, count, minimum, maximum
+
+class IncrementalWarping():
+    """
+    Incremental version of PointCloudManager.WMUSS, updated with each scan while the slab is acquired.
+    - Running mean and variance of Y (Welford, merged per scan).
+    - Y histogram with the minimum and maximum Y of each bin, so the maximum deviation within the 3-sigma limits
+      is found from the occupied bins only (exact up to y_resolution).
+    - Minimum and maximum Y per Z bin (profile of the slab along its length).
+    A provisional warping is available at any time and finalize() does not go over the points again.
+    The statistical outlier filter of PointCloudManager is not applied, only the distance cut.
+    plot() gives the chart from the Z bin extrema.
+    """
+    def __init__(self, distance:float=0, y_resolution:float=0.0001, z_bin_size:float=0.01) -> None:
+        self._distance = distance
+        self._count = 0
+        self._mean = 0.0
+        self._M2 = 0.0
+        self._y_bins = BinnedExtrema(y_resolution)
+        self._z_bins = BinnedExtrema(z_bin_size)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def std(self):
+        return float(np.sqrt(self._M2 / self._count)) if self._count else 0.0
+
+    def update(self, points:np.ndarray) -> None:
+        """
+        Adds the (N, 3) points of one scan.
+        """
+        y = points[:, 1].astype(np.float64)
+        z = points[:, 2].astype(np.float64)
+        if self._distance > 0:
+            inside = y <= self._distance
+            y, z = y[inside], z[inside]
+        if len(y) == 0:
+            return
+
+        batch_count = len(y)
+        batch_mean = float(y.mean())
+        batch_M2 = float(np.square(y - batch_mean).sum())
+        with self._lock:
+            count = self._count + batch_count
+            delta = batch_mean - self._mean
+            self._mean += delta * batch_count / count
+            self._M2 += batch_M2 + delta * delta * self._count * batch_count / count
+            self._count = count
+            self._y_bins.update(y, y)
+            self._z_bins.update(z, y)
+
+    def provisional(self) -> float:
+        """
+        Warping (max deviation from the mean Y within the 3-sigma limits) of the points received so far.
+        """
+        with self._lock:
+            return self._warping()
+
+    def finalize(self) -> dict:
+        """
+        Final warping and the statistics used to compute it.
+        """
+        with self._lock:
+            if self._count == 0:
+                raise Exception("No points were added to the incremental warping.")
+            std = self.std
+            return {
+                "warping": self._warping(),
+                "points": self._count,
+                "mean": self._mean,
+                "ucl": self._mean + 3 * std,
+                "lcl": self._mean - 3 * std,
+            }
+
+    def plot(self) -> WarpingPlot:
+        """
+        Chart of the warping from the Y extrema of each Z bin (limited to the 3-sigma limits).
+        """
+        result = self.finalize()
+        z, y_min, y_max = self.z_profile()
+        y_min = np.clip(y_min, result["lcl"], result["ucl"])
+        y_max = np.clip(y_max, result["lcl"], result["ucl"])
+        # bin extreme farthest from the mean, as the max deviation point
+        deviations = np.maximum(np.abs(y_min - result["mean"]), np.abs(y_max - result["mean"]))
+        n = int(np.argmax(deviations))
+        y = y_min[n] if abs(y_min[n] - result["mean"]) >= abs(y_max[n] - result["mean"]) else y_max[n]
+        z = z + self._z_bins.bin_size / 2
+        return WarpingPlot(z, y_min, y_max, result["mean"], result["ucl"], result["lcl"], (z[n], y), result["warping"])
+
+    def z_profile(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Start of each occupied Z bin with the minimum and maximum Y inside it.
+        """
+        with self._lock:
+            return self._z_bins.occupied()
+
+    def _warping(self) -> float:
+        if self._count == 0:
+            return 0.0
+        std = self.std
+        ucl = self._mean + 3 * std
+        lcl = self._mean - 3 * std
+        _, y_min, y_max = self._y_bins.occupied()
+        candidates = np.concatenate((y_min, y_max))
+        candidates = candidates[(candidates >= lcl) & (candidates <= ucl)]
+        if len(candidates) == 0:
+            return 0.0
+        return float(np.max(np.abs(candidates - self._mean)))
@@ -0,0 +1,156 @@
+import threading
+from uuid import uuid4
+from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger_config import logger
+from utils.measurement import Measurement
+
+class Job():
+    """
+    State of one asynchronous measurement.
+    - state: queued -> running -> processing -> success | error (processing: acquired, post-processing in a worker)
+    - stages: progress of each stage of the measurement routine, in execution order.
+    """
+    def __init__(self) -> None:
+        self._id = uuid4().hex
+        self._state = "queued"
+        self._created = datetime.now()
+        self._started = None
+        self._finished = None
+        self._stages = []
+        self._result = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def done(self):
+        return self._state in ("success", "error")
+
+    @property
+    def acquiring(self):
+        """
+        Queued or running its acquisition, so it is still waiting for the sensors.
+        """
+        return self._state in ("queued", "running")
+
+    def start(self):
+        with self._lock:
+            self._state = "running"
+            self._started = datetime.now()
+
+    def acquired(self):
+        """
+        Callback given to Measurement.measurement_routine, once the acquisition is over.
+        """
+        with self._lock:
+            if self._state == "running":
+                self._state = "processing"
+
+    def progress(self, stage:str, state:str):
+        """
+        Callback given to Measurement.measurement_routine.
+        - state: "running" when the stage starts, "done" or "error" when it ends.
+        """
+        with self._lock:
+            now = datetime.now()
+            if state == "running":
+                self._stages.append({"name": stage, "state": state, "started": now, "finished": None})
+                return
+            for entry in reversed(self._stages):
+                if entry["name"] == stage:
+                    entry["state"] = state
+                    entry["finished"] = now
+                    break
+
+    def succeed(self, result:dict):
+        with self._lock:
+            self._state = "success"
+            self._result = result
+            self._finished = datetime.now()
+
+    def fail(self, error:str):
+        with self._lock:
+            self._state = "error"
+            self._error = error
+            self._finished = datetime.now()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self._id,
+                "state": self._state,
+                "created": self._created.isoformat(),
+                "started": self._started.isoformat() if self._started else None,
+                "finished": self._finished.isoformat() if self._finished else None,
+                "stages": [
+                    {
+                        "name": entry["name"],
+                        "state": entry["state"],
+                        "duration": (entry["finished"] - entry["started"]).total_seconds() if entry["finished"] else None,
+                    }
+                    for entry in self._stages
+                ],
+                "result": self._result,
+                "error": self._error,
+            }
+
+class JobManager():
+    """
+    Runs the measurement routine in background threads, one acquisition at a time.
+    - Measurement serializes the acquisitions, so a job can acquire while the previous ones are post-processed
+      (one executor thread per post-processing worker, plus the acquiring one).
+    - max_queued: jobs accepted while another one is acquiring; beyond that, submit() returns None (rejected).
+    - history: number of finished jobs kept for GET /jobs/{id}.
+    """
+    def __init__(self, measure:Measurement, max_queued:int=0, history:int=100) -> None:
+        self._measure = measure
+        self._max_queued = max_queued
+        self._history = history
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1 + measure.post_processing_workers, thread_name_prefix="measurement")
+
+    def submit(self):
+        """
+        Queues a new measurement job, returning it, or None if there is no room for it.
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.acquiring)
+            if pending > self._max_queued:
+                return None
+            job = Job()
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id:str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job:Job):
+        try:
+            job.start()
+            logger.info(f"Measurement job {job.id} started.")
+            job.succeed(self._measure.measurement_routine(progress=job.progress, acquired=job.acquired))
+            logger.info(f"Measurement job {job.id} finished: Warping Measurement Success")
+        except Exception as e:
+            job.fail(str(e))
+            logger.error(f"Measurement job {job.id} finished: Warping Measurement Error.")
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[job_id]
@@ -0,0 +1,422 @@
+import heapq
+import threading
+from queue import Queue, Full, Empty
+from time import sleep, perf_counter
+from utils.CoLaA_TCP import ColaA_TCP
+from utils.CoLaB_TCP import ColaB_TCP
+from utils.point_buffer import PointBuffer
+from utils.height_map import HeightMap
+from utils.scan_monitor import ScanMonitor
+from utils.scan_geometry import pose_transform, scanline_inliers
+from utils.sensor_session import SensorSession
+from utils.logger_config import logger
+
+class LidarSensor():
+    """
+    Base class of the Sick LiDAR sensors: acquisition of the scans of one sensor, by CoLa A or CoLa B over TCP.
+    - The subclasses give the model: angular range, default scan frequency and configuration telegrams.
+    - pose: (x, y, z, roll, pitch, yaw) of the sensor, in meters and degrees, applied to every scan so the points
+      of several sensors are in the same frame (Z is the encoder position along the conveyor).
+    - height_map: if given, the scans are binned in it instead of being kept as points (see HeightMap).
+    - scanline_filter: if given, keyword arguments of scanline_inliers; the scan line outlier filter is applied to
+      each scan in the sensor frame, before the pose, where the points of one scan are one line.
+    """
+    MODEL = ""
+    # Angular range of the model, in degrees
+    MIN_ANGLE = 0
+    MAX_ANGLE = 360
+    DEFAULT_SCAN_FREQUENCY = 0.0
+    # Time, in seconds, without forward motion after which the acquisition is finished
+    STOPPED_TIMEOUT = 2.0
+    # Interval between two polled scans, in seconds
+    POLL_INTERVAL = 10/1000
+    # Communication classes by protocol name in config.ini
+    PROTOCOLS = {"cola_a": ColaA_TCP, "cola_b": ColaB_TCP}
+    # Configuration telegrams sent before the acquisition: {method of the protocol class: kwargs}
+    CONFIGURATION = {"config_scandata_content": {}}
+
+    def __init__(self, ip:str, port:int, start_angle:int, stop_angle:int, acquisition_mode:str="poll", scan_frequency:float=600.0, protocol:str="cola_a", point_dtype:str="float64", queue_size:int=1200, parser_workers:int=1, session:SensorSession=None,
+                 encoder_resolution:float=0.2, pose:tuple=None, name:str=None, height_map:HeightMap=None,
+                 scanline_filter:dict=None) -> None:
+        # --- Dados provenientes no arquivo config.ini --- #
+        self._name = name or self.MODEL
+        self._ip = ip
+        self._port = port
+        self._start_angle = start_angle
+        self._stop_angle = stop_angle
+        self._acquisition_mode = acquisition_mode
+        self._scan_frequency = scan_frequency
+        self._protocol = protocol
+        self._point_dtype = point_dtype
+        self._queue_size = queue_size
+        self._parser_workers = parser_workers
+        self._encoder_resolution = encoder_resolution
+        # --- Persistent connection kept by the API (None: one connection per acquisition) --- #
+        self._session = session
+        # --- Extrinsic pose: rotation and translation applied to the points (None: sensor frame) --- #
+        self._pose = tuple(pose) if pose else None
+        self._rotation, self._translation = pose_transform(pose, point_dtype) if pose and any(pose) else (None, None)
+
+        if self._acquisition_mode not in ("poll", "stream"):
+            raise ValueError(f"Unsupported acquisition mode: {self._acquisition_mode}. Use 'poll' or 'stream'.")
+        if self._protocol not in self.PROTOCOLS:
+            raise ValueError(f"Unsupported protocol: {self._protocol}. Use 'cola_a' or 'cola_b'.")
+        if self._point_dtype not in ("float32", "float64"):
+            raise ValueError(f"Unsupported point dtype: {self._point_dtype}. Use 'float32' or 'float64'.")
+        if not (self.MIN_ANGLE <= self._start_angle < self._stop_angle <= self.MAX_ANGLE):
+            raise ValueError(f"Invalid angular range for the {self.MODEL}: {self._start_angle} to {self._stop_angle} (use {self.MIN_ANGLE} to {self.MAX_ANGLE}).")
+
+        self._height_map = height_map
+        self._scanline_filter = scanline_filter
+        self._pcd = PointBuffer(self._point_dtype, initial_capacity=1 if height_map is not None else 1_000_000)
+        self._scans_received = 0
+        self._scans_expected = 0
+        # --- Back-pressure metrics of the acquisition pipeline --- #
+        self._frames_received = 0
+        self._frames_dropped = 0
+        self._queue_max_depth = 0
+        # --- Scan loss and latency of the last acquisition, from the telegram headers --- #
+        self._scan_summary = {}
+        # --- Duration, in seconds, of the steps of the last acquisition --- #
+        self._timings = {}
+        # --- Callables notified with the points of each accepted scan --- #
+        self._scan_listeners = []
+        # --- Callables notified when the sensor is ready and the scans start being read --- #
+        self._ready_listeners = []
+        # --- State of the running acquisition (abort() may be called before it starts) --- #
+        self._error = None
+        self._finished = threading.Event()
+    
+    @property
+    def name(self):
+        return self._name
+    
+    @property
+    def pose(self):
+        return self._pose
+    
+    @property
+    def height_map(self):
+        return self._height_map
+    
+    @property
+    def pcd(self):
+        """
+        (N, 3) array with all the points acquired, without copy (one point per occupied cell with a height map).
+        """
+        if self._height_map is not None:
+            return self._height_map.points()
+        return self._pcd.view()
+    
+    @property
+    def scans_received(self):
+        return self._scans_received
+    
+    @property
+    def scans_expected(self):
+        return self._scans_expected
+    
+    @property
+    def frames_received(self):
+        return self._frames_received
+    
+    @property
+    def frames_dropped(self):
+        return self._frames_dropped
+    
+    @property
+    def queue_max_depth(self):
+        return self._queue_max_depth
+    
+    @property
+    def scan_summary(self):
+        """
+        Scan rate, missing scans and latency percentiles of the last acquisition (see ScanMonitor.summary).
+        """
+        return dict(self._scan_summary)
+    
+    @property
+    def timings(self):
+        """
+        Duration, in seconds, of the connection, parameterization, encoder reset (session only) and scanning of the last acquisition.
+        """
+        return dict(self._timings)
+    
+    def add_scan_listener(self, listener):
+        """
+        Registers a callable(points) notified, in scan order, with the (N, 3) points of each scan stored.
+        """
+        self._scan_listeners.append(listener)
+    
+    def add_ready_listener(self, listener):
+        """
+        Registers a callable() notified when the sensor is connected, parameterized and the scans start being read.
+        """
+        self._ready_listeners.append(listener)
+    
+    def abort(self, error:Exception):
+        """
+        Finishes the acquisition (running or about to run) with the error, e.g. when the motor could not start.
+        """
+        self._fail(error)
+    
+    def data_acquisition_routine(self):
+        """
+        Method that fills the point buffer by capturing each scan of the sensor.
+        - poll: each scan is requested to the sensor (sRN LMDscandata).
+        - stream: the sensor pushes every scan after the subscription (sEN LMDscandata 1).
+
+        The acquisition is a producer/consumer pipeline:
+        - a reader thread only pulls raw telegrams from the socket into a bounded queue (frames are dropped when it is full);
+        - parser workers convert the telegrams into points, which are consumed in scan order,
+          where the backward motion and stopped motion conditions finish the acquisition.
+        """
+        try:
+            self._timings = {}
+            if self._session is not None:
+                # connection kept by the session: parameterized only when needed, just the encoder is reset here
+                with self._session.acquire(self.CONFIGURATION) as com:
+                    self._com = com
+                    self._timings.update(self._session.timings)
+                    elapsed_time = self._scan()
+            else:
+                # --- Objeto de Comunicação com o LiDAR (Protocolo CoLa A ou CoLa B via TCP) --- #
+                self._com = self.PROTOCOLS[self._protocol](self._ip, self._port, self._pcd.dtype, self._encoder_resolution)
+
+                start_time = perf_counter()
+                self._com.connect()
+                self._timings["connect"] = perf_counter() - start_time
+                try:
+                    start_time = perf_counter()
+                    self._parameterize()
+                    self._timings["parameterize"] = perf_counter() - start_time
+
+                    elapsed_time = self._scan()
+                finally:
+                    self._com.release() # Finish the connection with the sensor after the measurement
+
+            self._scans_expected = int(elapsed_time * self._scan_frequency)
+            logger.info(f"{self._name}: scans received: {self._scans_received} of {self._scans_expected} expected in {elapsed_time:.2f} s ({self._acquisition_mode} mode).")
+            logger.info(f"{self._name}: acquisition pipeline: {self._frames_received} frames read, {self._frames_dropped} dropped, max queue depth {self._queue_max_depth} of {self._queue_size}.")
+            self._log_scan_summary()
+        
+            if self._height_map is not None:
+                logger.info(f"{self._name}: height map of {self._height_map.shape[0]} x {self._height_map.shape[1]} cells: {self._height_map.samples} points in {self._height_map.cells} cells ({self._height_map.nbytes/1e6:.1f} MB).")
+            if (self._height_map.samples if self._height_map is not None else len(self._pcd)) == 0:
+                logger.error("Despite no errors, no points were loaded.")
+                raise Exception("No points were loaded.")
+
+            logger.info(f"{self._name}: LiDAR data acquisition routine done.")
+
+        except Exception as e:
+            logger.error(f"Error in data acquisition routine: {e}")
+            raise Exception(f"Error in data acquisition routine: {e}")
+        finally:
+            # ready for another acquisition
+            self._error = None
+            self._finished = threading.Event()
+    
+    def _scan(self) -> float:
+        """
+        Runs the acquisition pipeline on the connected and parameterized sensor and returns its duration in seconds.
+        """
+        streaming = self._acquisition_mode == "stream"
+        if streaming:
+            self._com.start_scan_stream()
+            self._max_same_Z_value = int(self.STOPPED_TIMEOUT * self._scan_frequency)
+        else:
+            self._max_same_Z_value = int(self.STOPPED_TIMEOUT / self.POLL_INTERVAL)
+
+        self._old_Z_value = 0.0
+        self._same_Z_value_counter = 0
+        self._scans_received = 0
+        self._frames_received = 0
+        self._frames_dropped = 0
+        self._queue_max_depth = 0
+        self._monitor = ScanMonitor(continuous=streaming)
+        self._scan_summary = {}
+        self._frames = Queue(maxsize=self._queue_size)
+        self._parsed = []           # heap of (sequence, points) parsed out of order
+        self._next_sequence = 0
+        self._parsed_lock = threading.Lock()
+
+        start_time = perf_counter()
+        reader = threading.Thread(target=self._reader, args=(streaming,), name=f"{self._name}-reader", daemon=True)
+        workers = [
+            threading.Thread(target=self._parser_worker, name=f"{self._name}-parser-{n}", daemon=True)
+            for n in range(self._parser_workers)
+        ]
+        for listener in self._ready_listeners:
+            listener()
+        # --- Pipeline Beg --- #
+        reader.start()
+        for worker in workers:
+            worker.start()
+        try:
+            self._finished.wait()
+        finally:
+            self._finished.set()
+            reader.join()
+            for worker in workers:
+                self._stop_worker()
+            for worker in workers:
+                worker.join()
+            if streaming:
+                self._com.stop_scan_stream()
+        # --- Pipeline End --- #
+        elapsed_time = perf_counter() - start_time
+        self._timings["scanning"] = elapsed_time
+        self._scan_summary = self._monitor.summary(self._frames_dropped)
+
+        if self._error is not None:
+            raise self._error
+        return elapsed_time
+    
+    def _reader(self, streaming:bool):
+        """
+        Producer: pulls raw telegrams from the sensor into the queue, without parsing them.
+        """
+        try:
+            sequence = 0
+            while not self._finished.is_set():
+                if streaming:
+                    frame = self._com.read_stream_frame()
+                else:
+                    frame = self._com.poll_one_frame()
+                received = perf_counter()
+                self._frames_received += 1
+                try:
+                    # the frame points into the receive buffer, so the queue keeps a copy
+                    self._frames.put_nowait((sequence, bytes(frame), received))
+                    sequence += 1
+                    self._queue_max_depth = max(self._queue_max_depth, self._frames.qsize())
+                except Full:
+                    self._frames_dropped += 1
+
+                if not streaming:
+                    # Response time of 4.8 ms
+                    # from performance technical details in datasheet
+                    # sleep(4.8/1000)  
+                    # but I will use more time, 10 ms, so:
+                    sleep(self.POLL_INTERVAL)
+        except Exception as e:
+            self._fail(e)
+    
+    def _parser_worker(self):
+        """
+        Consumer: converts telegrams into points and hands them to _consume in scan order.
+        """
+        try:
+            while True:
+                item = self._frames.get()
+                if item is None:
+                    return
+                if self._finished.is_set():
+                    continue
+                sequence, frame, received = item
+                header = self._com.extract_header(frame)
+                points = self._com.extract_telegram(frame)
+                stamp = (header, received, perf_counter())
+                with self._parsed_lock:
+                    heapq.heappush(self._parsed, (sequence, points, stamp))
+                    while self._parsed and self._parsed[0][0] == self._next_sequence:
+                        _, points, stamp = heapq.heappop(self._parsed)
+                        self._next_sequence += 1
+                        self._monitor.add(*stamp)
+                        if not self._finished.is_set() and not self._consume(points):
+                            self._finished.set()
+        except Exception as e:
+            self._fail(e)
+    
+    def _consume(self, points) -> bool:
+        """
+        Evaluates the stop conditions on one parsed scan and stores its points.
+        - Returns False when the acquisition must finish.
+        """
+        self._scans_received += 1
+
+        current_Z_value = points[0][2]
+        if (current_Z_value<self._old_Z_value):    # the lidar is mooving backward
+            logger.info("Data aquisition finished because the lidar was mooving backward.")
+            return False
+        elif (current_Z_value==self._old_Z_value): # the lidar is no longer mooving
+            self._same_Z_value_counter+=1
+            if self._same_Z_value_counter == self._max_same_Z_value:  # stopped for too long, 2.0 s
+                logger.info("Data aquisition finished because the lidar was not mooving.")
+                return False
+        else:                                      # still mooving forward
+            self._old_Z_value = current_Z_value
+            self._same_Z_value_counter = 0
+
+        valid = scanline_inliers(points[:, 1], **self._scanline_filter) if self._scanline_filter else None
+        if self._rotation is not None:
+            points = points @ self._rotation.T + self._translation
+        if self._height_map is not None:
+            self._height_map.add(points, valid)
+        if valid is not None:
+            points = points[valid]
+        if self._height_map is None:
+            self._pcd.append(points)
+        for listener in self._scan_listeners:
+            listener(points)
+        return True
+    
+    def _log_scan_summary(self):
+        summary = self._scan_summary
+        if summary.get("scans", 0) < 2:
+            return
+        latency, parse = summary["latency_ms"], summary["parse_ms"]
+        logger.info(
+            f"{self._name}: {summary['scan_rate']:.1f} scans/s received (sensor {summary['sensor_scan_rate'] or 0:.1f}), "
+            f"latency p50 {latency['p50']:.2f} / p95 {latency['p95']:.2f} / p99 {latency['p99']:.2f} ms above the minimum, "
+            f"parsing p50 {parse['p50']:.2f} / p95 {parse['p95']:.2f} ms."
+        )
+        if summary.get("missing_scans"):
+            logger.warning(
+                f"{self._name}: {summary['missing_scans']} scans missing in {summary['gaps']} gaps of the scan counter "
+                f"(largest {summary['largest_gap']}): {summary['dropped_by_host']} dropped by the queue, {summary['lost_before_host']} lost before the host."
+            )
+        if summary["status_errors"]:
+            logger.warning(f"{self._name}: {summary['status_errors']} scans with a device status error or warning.")
+    
+    def _stop_worker(self):
+        """
+        Sends the stop sentinel to one parser worker, discarding pending telegrams if the queue is full.
+        """
+        while True:
+            try:
+                self._frames.put_nowait(None)
+                return
+            except Full:
+                try:
+                    self._frames.get_nowait()
+                except Empty:
+                    pass
+    
+    def _fail(self, error:Exception):
+        """
+        Stores the first error of a pipeline thread and finishes the acquisition.
+        """
+        if self._error is None:
+            self._error = error
+        self._finished.set()
+    
+    def _parameterize(self):
+        """
+        Method that sends all messages of configuration.
+        """
+        try:
+            self._com.login()
+            # self._com.read_freq_and_angular_resol()
+            for method, kwargs in self.CONFIGURATION.items():
+                getattr(self._com, method)(**kwargs)
+            # self._com.config_scandata_measurement_output(self._start_angle, self._stop_angle)
+            # self._com.set_encoder_settings()
+            self._com.reset_encoder_values()    # to ensure that the encoder will start at 0 mm
+            self._com.logout()
+
+            logger.info("LiDAR parameterization done.")
+        except Exception as e:
+            logger.error(f"Error in parameterization: {e}")
+            raise Exception(f"Error in parameterization: {e}")
+    
@@ -0,0 +1,307 @@
+import struct
+import socket
+import threading
+import socketserver
+import numpy as np
+from time import perf_counter, sleep
+from utils.logger_config import logger
+from utils.telegram_framer import TelegramFramer
+from utils.CoLaA_TCP import ColaA_TCP
+
+class SlabProfile():
+    """
+    Synthetic scene seen by the simulated sensor: a warped slab passing under it over a flat floor.
+    - The slab surface is at `distance` meters from the sensor, lifted by warping * sin(pi * z / slab_length) along its length.
+    - After the slab, the floor is seen `floor_offset` meters below the slab surface.
+    - The encoder moves at `speed` m/s from the encoder reset until `travel` meters, then stops.
+    """
+    def __init__(self, distance:float=1.5, slab_length:float=10.0, warping:float=0.01, speed:float=1.0,
+                 travel:float=None, floor_offset:float=0.3, noise:float=0.001, seed:int=0) -> None:
+        self.distance = distance
+        self.slab_length = slab_length
+        self.warping = warping
+        self.speed = speed
+        self.travel = travel if travel is not None else slab_length
+        self.floor_offset = floor_offset
+        self.noise = noise
+        self._rng = np.random.default_rng(seed)
+
+    def position(self, elapsed:float) -> float:
+        """
+        Encoder position, in meters, after `elapsed` seconds of motion.
+        """
+        return min(self.speed * elapsed, self.travel)
+
+    def distances(self, z:float, sin_angles:np.ndarray) -> np.ndarray:
+        """
+        Range of each beam, in meters, at the slab position z.
+        """
+        if 0 <= z <= self.slab_length:
+            y = self.distance - self.warping * np.sin(np.pi * z / self.slab_length)
+        else:
+            y = self.distance + self.floor_offset
+        return y / sin_angles + self._rng.normal(0, self.noise, len(sin_angles))
+
+def scan_telegram(command:str, telegram_counter:int, scan_counter:int, time_since_startup:int, time_of_transmission:int,
+                  encoder_ticks:int, distances_mm:np.ndarray, start_angle:float=55.0, angle_step:float=1/12, scan_frequency:float=600) -> bytes:
+    """
+    CoLa A LMDscandata telegram (sRA answer or sSN event), framed with STX/ETX, in the layout read by ColaA_TCP.extract_telegram.
+    - Times in microseconds, distances in millimeters (sent with the LMS4000 scale factor of 0.1).
+    """
+    values = np.round(np.asarray(distances_mm) * 10).astype(np.int64).clip(0, 0xFFFF)
+    start = int(round(start_angle * 10000)) & 0xFFFFFFFF
+    head = (
+        f"{command} LMDscandata 1 1 89A27F 0 0 {telegram_counter & 0xFFFF:X} {scan_counter & 0xFFFF:X} "
+        f"{time_since_startup & 0xFFFFFFFF:X} {time_of_transmission & 0xFFFFFFFF:X} 0 0 0 0 0 "
+        f"{int(scan_frequency*100):X} {int(scan_frequency*len(values)):X} "
+        f"1 {encoder_ticks & 0xFFFFFFFF:X} 0 "
+        f"1 DIST1 3DCCCCCD 00000000 {start:X} {int(round(angle_step*10000)):X} {len(values):X} "
+    )
+    return b"\x02" + head.encode() + " ".join(map("{:X}".format, values.tolist())).encode() + b" 0 0 0 0 0 0\x03"
+
+class Capture():
+    """
+    Recorded telegrams with their reception time.
+    - File format: sequence of records [float64 seconds since the first telegram][uint32 length][telegram], little-endian.
+    """
+    RECORD = struct.Struct('<dI')
+
+    def __init__(self, records:list) -> None:
+        self._records = records     # [(seconds, telegram without STX/ETX)]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, index:int) -> tuple[float, bytes]:
+        return self._records[index]
+
+    @classmethod
+    def load(cls, path:str):
+        records = []
+        with open(path, "rb") as file:
+            data = file.read()
+        offset = 0
+        while offset < len(data):
+            seconds, length = cls.RECORD.unpack_from(data, offset)
+            offset += cls.RECORD.size
+            records.append((seconds, data[offset:offset + length]))
+            offset += length
+        return cls(records)
+
+    @classmethod
+    def record(cls, ip:str, port:int, path:str, duration:float):
+        """
+        Records the LMDscandata events of a real sensor for `duration` seconds.
+        """
+        com = ColaA_TCP(ip, port)
+        com.connect()
+        try:
+            com.login()
+            com.config_scandata_content()
+            com.logout()
+            com.start_scan_stream()
+            count = 0
+            with open(path, "wb") as file:
+                start = perf_counter()
+                while perf_counter() - start < duration:
+                    frame = com.read_stream_frame()
+                    file.write(cls.RECORD.pack(perf_counter() - start, len(frame)))
+                    file.write(frame)
+                    count += 1
+            com.stop_scan_stream()
+            logger.info(f"{count} telegrams recorded to {path}.")
+        finally:
+            com.release()
+
+class _SensorSession(socketserver.BaseRequestHandler):
+    """
+    One client connection of the simulator (the LMS4000 accepts several clients, each with its own subscription).
+    """
+    def setup(self):
+        self.simulator = self.server.simulator
+        self.lock = threading.Lock()        # one telegram at a time on the socket
+        self.streaming = threading.Event()
+        self.stream_thread = None
+        self.polled = 0                     # next capture record answered to sRN
+        self.server.sessions.add(self.request)
+
+    def finish(self):
+        self.server.sessions.discard(self.request)
+
+    def send(self, telegram:bytes):
+        with self.lock:
+            self.request.sendall(telegram)
+
+    def answer(self, message:str):
+        self.send(f"\x02{message}\x03".encode())
+
+    def handle(self):
+        framer = TelegramFramer(self.request, capacity=4096)
+        try:
+            while True:
+                message = str(framer.next_frame(), "ascii")
+                self.dispatch(message)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.streaming.clear()
+            if self.stream_thread:
+                self.stream_thread.join()
+
+    def dispatch(self, message:str):
+        tokens = message.split()
+        command = " ".join(tokens[:2])
+        if command == "sMN SetAccessMode":
+            self.answer("sAN SetAccessMode 1")
+        elif command == "sWN LMDscandatacfg":
+            self.answer("sWA LMDscandatacfg")
+        elif command == "sWN LMPoutputRange":
+            self.answer("sWA LMPoutputRange")
+        elif command == "sMN LIDrstencoderinc":
+            self.simulator.reset_encoder()
+            self.answer("sAN LIDrstencoderinc 1")
+        elif command == "sMN Run":
+            self.answer("sAN Run 1")
+        elif command == "sRN LMPscancfg":
+            self.answer(f"sRA LMPscancfg {int(self.simulator.scan_frequency*100):X} 1 {int(round(self.simulator.angle_step*10000)):X} "
+                        f"{int(round(self.simulator.start_angle*10000)):X} {int(round(self.simulator.stop_angle*10000)):X}")
+        elif command == "sRN LMDscandata":
+            self.send(self.polled_telegram())
+        elif command == "sEN LMDscandata" and len(tokens) == 3:
+            if tokens[2] == "1" and not self.streaming.is_set():
+                self.answer("sEA LMDscandata 1")
+                self.streaming.set()
+                self.stream_thread = threading.Thread(target=self.stream, daemon=True)
+                self.stream_thread.start()
+            elif tokens[2] == "0":
+                self.streaming.clear()
+                if self.stream_thread:
+                    self.stream_thread.join()
+                    self.stream_thread = None
+                self.answer("sEA LMDscandata 0")
+            else:
+                self.answer(f"sEA LMDscandata {tokens[2]}")
+        else:
+            # Sopas error 2: unknown method/variable
+            self.answer("sFA 2")
+
+    def polled_telegram(self) -> bytes:
+        capture = self.simulator.capture
+        if capture is None:
+            return self.simulator.next_scan("sRA")
+        _, telegram = capture[self.polled % len(capture)]
+        self.polled += 1
+        return b"\x02sRA" + telegram[3:] + b"\x03"
+
+    def stream(self):
+        """
+        Pushes scans (sSN) at the scan frequency, or the capture at its original timing, until unsubscribed.
+        """
+        start = perf_counter()
+        if self.simulator.capture is not None:
+            for seconds, telegram in self.simulator.capture:
+                if not self.wait_until(start + seconds):
+                    return
+                self.send(b"\x02" + telegram + b"\x03")
+            return
+
+        period = 1.0 / self.simulator.scan_frequency
+        deadline = start
+        while self.wait_until(deadline):
+            self.send(self.simulator.next_scan("sSN"))
+            deadline += period
+
+    def wait_until(self, deadline:float) -> bool:
+        remaining = deadline - perf_counter()
+        if remaining > 0.002:
+            sleep(remaining - 0.001)
+        while perf_counter() < deadline:
+            pass
+        return self.streaming.is_set()
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler) -> None:
+        super().__init__(address, handler)
+        self.sessions = set()       # client sockets, closed when the simulator stops (like a sensor going offline)
+
+class LMS4000Simulator():
+    """
+    Local TCP stand-in of the LMS4000 for the subset of CoLa A used by ColaA_TCP and LMS4000:
+    SetAccessMode, LMDscandatacfg, LMPoutputRange, LIDrstencoderinc, Run, LMPscancfg, sRN/sEN LMDscandata.
+    - Scans come from a SlabProfile with a moving encoder, or from a Capture replayed at its original timing.
+    """
+    def __init__(self, host:str="127.0.0.1", port:int=2112, scan_frequency:float=600.0, start_angle:float=55.0,
+                 stop_angle:float=125.0, angle_step:float=1/12, profile:SlabProfile=None, capture:Capture=None) -> None:
+        self.scan_frequency = scan_frequency
+        self.start_angle = start_angle
+        self.stop_angle = stop_angle
+        self.angle_step = angle_step
+        self.profile = profile or SlabProfile()
+        self.capture = capture
+
+        value_count = int(round((stop_angle - start_angle) / angle_step)) + 1
+        self._sin_angles = np.sin(np.radians(start_angle + angle_step * np.arange(value_count)))
+        self._lock = threading.Lock()
+        self._boot = perf_counter()
+        self._reset = None              # time of the last encoder reset (motion starts there)
+        self._telegram_counter = 0
+        self._scan_counter = 0
+
+        self._server = _Server((host, port), _SensorSession)
+        self._server.simulator = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def reset_encoder(self):
+        with self._lock:
+            self._reset = perf_counter()
+
+    def next_scan(self, command:str) -> bytes:
+        """
+        Telegram of the scan at the current time.
+        """
+        with self._lock:
+            now = perf_counter()
+            elapsed = now - self._reset if self._reset is not None else 0.0
+            z = self.profile.position(elapsed)
+            self._telegram_counter += 1
+            self._scan_counter += 1
+            telegram_counter, scan_counter = self._telegram_counter, self._scan_counter
+        distances_mm = self.profile.distances(z, self._sin_angles) * 1000
+        microseconds = int((now - self._boot) * 1e6)
+        return scan_telegram(
+            command, telegram_counter, scan_counter, microseconds, microseconds,
+            int(round(z / 0.0002)), distances_mm, self.start_angle, self.angle_step, self.scan_frequency
+        )
+
+    def start(self):
+        """
+        Serves in a background thread (e.g. inside a benchmark).
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="lms4000-simulator", daemon=True)
+        self._thread.start()
+        logger.info(f"LMS4000 simulator listening on {self.address[0]}:{self.address[1]}.")
+
+    def serve_forever(self):
+        logger.info(f"LMS4000 simulator listening on {self.address[0]}:{self.address[1]}.")
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        for client in list(self._server.sessions):
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,14 @@
+from utils.lidar_sensor import LidarSensor
+
+class LMS5xx(LidarSensor):
+    """
+    Class that abstracts the LMS5xx LiDAR sensors (e.g. LMS511 Heavy Duty).
+    - 25 to 100 Hz, -5° to 185°, distances in mm (scale factor 1, or 2 beyond 65 m), read from the telegram.
+    - The encoder input must be enabled in the sensor (SOPAS); its resolution is given in config.ini.
+    """
+    MODEL = "lms5xx"
+    MIN_ANGLE = -5
+    MAX_ANGLE = 185
+    DEFAULT_SCAN_FREQUENCY = 50.0
+    # Distance values with the encoder; in the LMS5xx the third field only selects the remission (0: none)
+    CONFIGURATION = {"config_scandata_content": {"data_channel": True, "further_data_channel": 0, "encoder": True}}
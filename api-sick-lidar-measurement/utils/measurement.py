@@ -1,75 +1,402 @@
-import requests
-from os import getcwd, makedirs
-from os.path import join, exists
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from os import getcwd
+from os.path import join, isabs
 from datetime import datetime
 from utils.config import Config
 from utils.lms4000 import LMS4000
+from utils.lms5xx import LMS5xx
+from utils.lidar_sensor import LidarSensor
+from utils.sensor_array import SensorArray
+from utils.sensor_session import SensorSession
+from utils.height_map import HeightMap
+from utils.motor_client import MotorClient
 from utils.logger_config import logger
-from utils.PointCloudManager import PointCloudManager
+from utils.incremental_warping import IncrementalWarping
+from utils.point_cloud_writer import PointCloudWriter
+from utils.post_processing import PostProcessor, warping_task
+from utils.measurement_history import MeasurementHistory
+from utils import metrics
 
 class Measurement:
+    # Sensor classes by model name in config.ini
+    SENSOR_MODELS = {"lms4000": LMS4000, "lms5xx": LMS5xx}
+
     def __init__(self, conf: Config) -> None:
         self._conf = conf
         self._warping = 0.0
-        self._warping_image = None
+        self._warping_plot = None
+        self._slabs = []
+        self._scans = {}
+        self._incremental = None
+        self._provisional_enabled = conf.warping_method == "incremental" or conf.provisional_warping
+        self._file_path = None
+        self._timings = {}
+        self._run = threading.local()               # progress callback and timings of the measurement of each job thread
+        self._acquisition_lock = threading.Lock()   # one acquisition at a time, post-processing may overlap
+        self._result_lock = threading.Lock()
+
+        # --- Writer of the point clouds (directory, format and retention) --- #
+        directory = conf.STORAGE_directory if isabs(conf.STORAGE_directory) else join(getcwd(), conf.STORAGE_directory)
+        self._writer = PointCloudWriter(
+            directory,
+            conf.STORAGE_format,
+            conf.STORAGE_max_files,
+            conf.STORAGE_max_age_days,
+            conf.STORAGE_max_total_mb
+        )
+
+        # --- History of the measurement results --- #
+        database = conf.STORAGE_database if isabs(conf.STORAGE_database) else join(getcwd(), conf.STORAGE_database)
+        self._history = MeasurementHistory(database)
+
+        # --- Client of the motor API, with the connection kept between measurements --- #
+        self._motor = MotorClient(
+            conf.API_MOTOR_ip,
+            conf.API_MOTOR_port,
+            conf.API_MOTOR_connect_timeout,
+            conf.API_MOTOR_read_timeout,
+            conf.API_MOTOR_retries
+        )
+
+        # --- Connection with each sensor kept between measurements --- #
+        self._sessions = {}
+        if conf.LMS4000_persistent_session:
+            for sensor in conf.sensors:
+                self._sessions[sensor["name"]] = SensorSession(
+                    LidarSensor.PROTOCOLS[sensor["protocol"]],
+                    sensor["ip"],
+                    sensor["port"],
+                    conf.LMS4000_point_dtype,
+                    sensor["encoder_resolution"],
+                    conf.LMS4000_keepalive_interval
+                )
+                self._sessions[sensor["name"]].start()
+
+        # --- Worker processes for the post-processing of the acquired points --- #
+        self._post_processor = PostProcessor(conf.post_processing_workers)
+        self._post_processor.start()
 
     @property
     def warping(self):
         return self._warping
     
     @property
-    def warping_image(self):
-        return self._warping_image
+    def warping_plot(self):
+        """
+        WarpingPlot of the last measurement, rendered (and cached) only when its PNG is requested.
+        """
+        return self._warping_plot
     
-    def measurement_routine(self):
+    @property
+    def slabs(self):
+        """
+        Slabs of the last measurement with their warping (WMLSS only, empty for the other methods).
+        """
+        return list(self._slabs)
+    
+    @property
+    def result(self):
+        """
+        Result of the last measurement as given by the API: warping in cm, for WMLSS the warping of each slab in cm,
+        and the scan summary of each sensor (scan rate, missing scans, latency percentiles).
+        """
+        with self._result_lock:
+            return self._format_result(self._warping, self._slabs, self._scans)
+    
+    @property
+    def post_processing_workers(self):
+        return self._post_processor.workers
+    
+    @property
+    def provisional_enabled(self):
+        """
+        Whether the warping is updated with each scan (incremental method or [API] provisional_warping).
+        """
+        return self._provisional_enabled
+    
+    @property
+    def provisional_warping(self):
+        """
+        Warping of the points acquired so far by the running (or last) measurement, if provisional_enabled.
+        """
+        return self._incremental.provisional() if self._incremental else None
+    
+    @property
+    def history(self):
+        return self._history
+    
+    @property
+    def timings(self):
+        """
+        Duration, in seconds, of each stage of the last measurement.
+        """
+        return dict(self._timings)
+    
+    @property
+    def file_path(self):
+        """
+        File where the point cloud of the last measurement is saved.
+        """
+        return self._file_path
+    
+    def shutdown(self):
+        """
+        Waits for the measurements still being post-processed and saved and closes the history, the sensor sessions and the motor client.
+        """
+        for session in self._sessions.values():
+            session.close()
+        self._motor.close()
+        self._post_processor.shutdown(wait=True)
+        self._history.close()
+    
+    @contextmanager
+    def _stage(self, name:str):
+        """
+        Notifies the progress callback when a stage of the measurement routine starts and ends, and records its duration.
+        """
+        progress = self._run.progress
+        if progress:
+            progress(name, "running")
+        start = perf_counter()
         try:
-            logger.info("Starting measurement.")
-            
-            # --- LiDAR sensor object --- #
-            lidar = LMS4000(self._conf.LMS4000_lidar_ip, self._conf.LMS4000_lidar_port, self._conf.LMS4000_start_angle, self._conf.LMS4000_stop_angle)
-
-            # Start the motor
-            logger.info("Starting the motor.")
-            url = f"http://{self._conf._API_MOTOR_ip}:{self._conf._API_MOTOR_port}/start"
-            response = requests.post(url)
-            if response.status_code == 200:
-                response_data = response.json()
-                message = response_data.get("message")
+            yield
+        except Exception:
+            if progress:
+                progress(name, "error")
+            raise
+        finally:
+            self._record_timing(name, perf_counter() - start)
+        if progress:
+            progress(name, "done")
+    
+    def _record_timing(self, name:str, seconds:float):
+        self._run.timings[name] = seconds
+        metrics.stage_duration.observe(seconds, stage=name)
+        metrics.stage_last_duration.set(seconds, stage=name)
+    
+    def _record_scan_summary(self, scans:dict):
+        for name, summary in scans.items():
+            if summary.get("scans", 0) < 2:
+                continue
+            metrics.last_scan_rate.set(summary["scan_rate"] or 0, sensor=name)
+            for quantile in ("p50", "p95", "p99"):
+                metrics.last_scan_latency.set(summary["latency_ms"][quantile] / 1000, sensor=name, quantile=quantile)
+            if "missing_scans" in summary:
+                metrics.scans_missing_total.inc(summary["dropped_by_host"], where="host")
+                metrics.scans_missing_total.inc(summary["lost_before_host"], where="upstream")
+    
+    def _start_motor(self):
+        logger.info("Starting the motor.")
+        self._motor.start()
+        logger.info("Motor started successfully.")
+    
+    def _sensors(self) -> SensorArray:
+        """
+        Sensors of config.ini ([LMS4000] and [SENSOR:<name>] sections), acquired together.
+        """
+        if self._conf.representation not in ("points", "heightmap"):
+            raise ValueError(f"Unsupported representation: {self._conf.representation}. Use 'points' or 'heightmap'.")
+        sensors = []
+        for sensor in self._conf.sensors:
+            if sensor["model"] not in self.SENSOR_MODELS:
+                raise ValueError(f"Unsupported sensor model: {sensor['model']}. Use {' or '.join(self.SENSOR_MODELS)}.")
+            sensors.append(self.SENSOR_MODELS[sensor["model"]](
+                sensor["ip"],
+                sensor["port"],
+                sensor["start_angle"],
+                sensor["stop_angle"],
+                self._conf.LMS4000_acquisition_mode,
+                sensor["scan_frequency"],
+                sensor["protocol"],
+                self._conf.LMS4000_point_dtype,
+                self._conf.LMS4000_queue_size,
+                self._conf.LMS4000_parser_workers,
+                self._sessions.get(sensor["name"]),
+                sensor["encoder_resolution"],
+                sensor["pose"],
+                sensor["name"],
+                HeightMap(self._conf.HEIGHTMAP_z_bin_size, self._conf.LMS4000_point_dtype) if self._conf.representation == "heightmap" else None,
+                self._conf.FILTER_params if self._conf.FILTER_method == "scanline" else None
+            ))
+        return SensorArray(sensors)
+    
+    def _acquire(self, lidar:SensorArray):
+        with self._stage("acquisition"):
+            try:
+                lidar.data_acquisition_routine()
+            finally:
+                for step, seconds in lidar.timings.items():
+                    self._record_timing(f"sensor_{step}", seconds)
+                metrics.scans_received_total.inc(lidar.scans_received)
+                metrics.frames_dropped_total.inc(lidar.frames_dropped)
+    
+    def _acquire_with_concurrent_start(self, lidar:SensorArray):
+        """
+        Runs the motor start (HTTP) and the sensor acquisition at the same time and logs the start skew:
+        time between the sensor being ready to read scans and the motor API confirming the start.
+        - If the motor cannot start, the acquisition is aborted with the error.
+        """
+        events = {}
+        lidar.add_ready_listener(lambda: events.setdefault("sensor_ready", perf_counter()))
+        progress, timings = self._run.progress, self._run.timings
+
+        def start_motor():
+            # stages of the same measurement as the calling thread
+            self._run.progress, self._run.timings = progress, timings
+            try:
+                with self._stage("motor"):
+                    self._start_motor()
+                events["motor_running"] = perf_counter()
+            except Exception as e:
+                events["motor_error"] = e
+                lidar.abort(e)
+
+        motor = threading.Thread(target=start_motor, name="motor-start", daemon=True)
+        motor.start()
+        try:
+            self._acquire(lidar)
+        finally:
+            motor.join()
+        if "motor_error" in events:
+            raise events["motor_error"]
+
+        if "sensor_ready" in events:
+            skew = events["motor_running"] - events["sensor_ready"]
+            metrics.motor_start_skew.set(skew)
+            if skew >= 0:
+                logger.info(f"Start skew: motor confirmed {skew*1000:.1f} ms after the sensor was ready.")
             else:
-                raise Exception(f"Error in requisition: {response.status_code}")
-            
-            # Check if the motor is running
-            if not (message == "running"):
-                raise Exception(f"Error starting the motor: {message}")
-            
-            logger.info("Motor started successfully.")
-
-            # Perform data acquisition routine
-            lidar.data_acquisition_routine()
-            
-            # --- PointCloudManager object --- #
-            pcm = PointCloudManager()
-
-            # Load point cloud into pcm
-            pcm.load_from_list(lidar.pcd)
-            
-            # Apply filters to the point cloud
-            pcm.filter_by_distance(self._conf.distance)
-
-            # compute warping
-            self._warping, self._warping_image = pcm.WMUSS()
-            # pcm.WMLSS()
-
-            # Saving the Point Cloud
-            DIR = join(getcwd(), "PCDs")
-            if not exists(DIR):
-                makedirs(DIR)
-            pcm.save_to_file(
-                filename=join(DIR, str(datetime.now().strftime('%Y%m%d_%H%M%S'))), 
-                format='pcd'
-            )
+                logger.warning(f"Start skew: motor confirmed {-skew*1000:.1f} ms before the sensor was ready, first profiles may be missed.")
+    
+    @staticmethod
+    def _format_result(warping:float, slabs:list, scans:dict=None) -> dict:
+        result = {"warping": f"{(warping*100):.3f}"}
+        if scans:
+            result["scans"] = scans
+        if slabs:
+            result["slabs"] = [
+                {"slab": slab["slab"], "points": slab["points"], "warping": f"{(slab['warping']*100):.3f}"}
+                for slab in slabs
+            ]
+        return result
+    
+    def _post_processing_task(self, name:str, started:datetime, lidar:SensorArray, warping:float=None) -> dict:
+        """
+        Task of the post-processing worker (see utils.post_processing._post_process).
+        """
+        metadata = {
+            "timestamp": started.isoformat(),
+            "warping_method": self._conf.warping_method,
+            "representation": self._conf.representation,
+            "scans_received": lidar.scans_received,
+            "scan_summary": lidar.scan_summary,
+            # encoder_resolution in mm per tick (Z of the points is in meters)
+            "sensors": {
+                sensor["name"]: {key: sensor[key] for key in ("model", "protocol", "scan_frequency", "encoder_resolution", "pose")}
+                for sensor in self._conf.sensors
+            },
+        }
+        if warping is not None:
+            metadata["warping"] = warping
+        task = warping_task(self._conf)
+        if task["filter_method"] == "scanline":
+            # already applied to each scan during the acquisition
+            task["filter_method"], task["filter_params"] = "none", {}
+        return dict(
+            task,
+            storage={"directory": self._writer.directory, "format": self._conf.STORAGE_format, "name": name},
+            metadata=metadata,
+        )
+    
+    def measurement_routine(self, progress=None, acquired=None) -> dict:
+        """
+        Runs a whole measurement: motor start, acquisition, filtering, warping computation and saving.
+        - progress: optional callable(stage, state), notified with "running" when each stage starts and "done" or "error" when it ends.
+        - acquired: optional callable(), notified when the points are handed over to the post-processing worker;
+          from then on the next measurement can start its acquisition.
+        - Returns the result of this measurement (see result).
+        """
+        self._run.progress = progress
+        self._run.timings = {}
+        try:
+            logger.info("Starting measurement.")
+
+            # --- Acquisition, one at a time: the sensors and the motor are shared --- #
+            with self._acquisition_lock:
+                started = datetime.now()
+                
+                # --- LiDAR sensors (one or more, acquired together) --- #
+                lidar = self._sensors()
+
+                # --- Warping updated with each scan during the acquisition, only if it is used --- #
+                if self._provisional_enabled:
+                    incremental = IncrementalWarping(self._conf.distance)
+                    self._incremental = incremental
+                    lidar.add_scan_listener(incremental.update)
+
+                if self._conf.API_MOTOR_concurrent_start:
+                    # the motor is started while the sensor connection is opened, so the first profiles are not missed
+                    self._acquire_with_concurrent_start(lidar)
+                else:
+                    # Start the motor
+                    with self._stage("motor"):
+                        self._start_motor()
+
+                    # Perform data acquisition routine
+                    self._acquire(lidar)
+                scans = lidar.scan_summary
+                self._record_scan_summary(scans)
+                points = lidar.pcd
+                metrics.last_scans.set(lidar.scans_received, kind="received")
+                metrics.last_scans.set(lidar.scans_expected, kind="expected")
+                metrics.points_acquired_total.inc(len(points))
+                metrics.last_points.set(len(points), kind="acquired")
+
+                warping, plot = None, None
+                if self._conf.warping_method == "incremental":
+                    # only the finalize step of the statistics accumulated during the acquisition
+                    with self._stage("warping"):
+                        result = incremental.finalize()
+                        warping, plot = result["warping"], incremental.plot()
+                        logger.info(f"Incremental warping finalized over {result['points']} points.")
+
+                # Points copied to shared memory for the worker, the sensor buffers are free after this
+                with self._stage("handoff"):
+                    name = started.strftime('%Y%m%d_%H%M%S')
+                    future = self._post_processor.submit(points, self._post_processing_task(name, started, lidar, warping))
+                del points, lidar
+
+            if acquired:
+                acquired()
+
+            # Loading, filtering, warping and saving in the worker process
+            with self._stage("post_processing"):
+                processed = future.result()
+            for stage, seconds in processed["timings"].items():
+                self._record_timing(stage, seconds)
+            self._writer.apply_retention()
+
+            if processed["warping"] is not None:
+                warping, plot = processed["warping"], processed["plot"]
+            slabs = processed["slabs"]
+            timings = dict(self._run.timings)
+            with self._result_lock:
+                self._warping, self._warping_plot, self._slabs, self._scans = warping, plot, slabs, scans
+                self._file_path = processed["file_path"]
+                self._timings = timings
+
+            metrics.last_points.set(processed["points"], kind="filtered")
+            metrics.last_warping.set(warping)
+            metrics.measurements_total.inc(result="success")
+            logger.info("Measurement timings: " + ", ".join(f"{name} {seconds:.3f} s" for name, seconds in timings.items()))
+
+            self._history.add(started, warping, processed["points"], timings, processed["file_path"])
+            return self._format_result(warping, slabs, scans)
         
         except Exception as e:
+            metrics.measurements_total.inc(result="error")
             logger.error(f"Error in measurement routine: {e}")
             raise Exception(f"Error in measurement routine: {e}")
         
\ No newline at end of file
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+import threading
+from os import makedirs
+from os.path import dirname, exists
+from datetime import datetime, date, time
+
+class MeasurementHistory():
+    """
+    Local SQLite store of the measurement results, indexed by time and by warping.
+    - One row per measurement: timestamp, warping (meters), point count, stage timings (seconds) and point cloud file.
+    """
+    def __init__(self, path:str) -> None:
+        self._path = path
+        if dirname(path) and not exists(dirname(path)):
+            makedirs(dirname(path))
+        # one connection shared by the API threads, serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS measurements (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    warping REAL NOT NULL,
+                    point_count INTEGER NOT NULL,
+                    timings TEXT NOT NULL,
+                    file_path TEXT
+                )
+                """
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_measurements_timestamp ON measurements (timestamp)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_measurements_warping ON measurements (warping)")
+
+    def add(self, timestamp:datetime, warping:float, point_count:int, timings:dict, file_path:str=None) -> int:
+        """
+        Stores one measurement result and returns its id.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO measurements (timestamp, warping, point_count, timings, file_path) VALUES (?, ?, ?, ?, ?)",
+                (timestamp.isoformat(), float(warping), int(point_count), json.dumps(timings), file_path)
+            )
+            return cursor.lastrowid
+
+    def query(self, start:datetime=None, end:datetime=None, min_warping:float=None, max_warping:float=None, limit:int=100, offset:int=0) -> tuple[list[dict], int]:
+        """
+        Measurements matching the filters, newest first, and the total number of matches (for pagination).
+        - start/end: timestamp range (inclusive); aware datetimes are converted to the local time of the stored timestamps.
+        - min_warping/max_warping: warping range in meters (inclusive).
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(local_time(start).isoformat())
+        if end is not None:
+            conditions.append("timestamp <= ?")
+            params.append(local_time(end).isoformat())
+        if min_warping is not None:
+            conditions.append("warping >= ?")
+            params.append(min_warping)
+        if max_warping is not None:
+            conditions.append("warping <= ?")
+            params.append(max_warping)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._connection.execute(f"SELECT COUNT(*) FROM measurements {where}", params).fetchone()[0]
+            rows = self._connection.execute(
+                f"SELECT * FROM measurements {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._to_dict(row) for row in rows], total
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _to_dict(row:sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "warping": row["warping"],
+            "point_count": row["point_count"],
+            "timings": json.loads(row["timings"]),
+            "file_path": row["file_path"],
+        }
+
+def local_time(value:datetime) -> datetime:
+    """
+    Naive local time of a datetime, as the timestamps of the measurements (aware values are converted).
+    """
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+def end_time(value:str) -> datetime:
+    """
+    End of a time range given as text: a date alone includes the whole day.
+    """
+    try:
+        return datetime.combine(date.fromisoformat(value), time.max)
+    except ValueError:
+        return local_time(datetime.fromisoformat(value))
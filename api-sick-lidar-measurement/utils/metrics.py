@@ -0,0 +1,171 @@
+import math
+import threading
+
+class _Metric():
+    """
+    Base of the metrics: one value (or set of values) per combination of label values.
+    """
+    TYPE = ""
+
+    def __init__(self, name:str, help:str, labelnames:tuple=()) -> None:
+        self._name = name
+        self._help = help
+        self._labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self._name
+
+    def _key(self, labels:dict) -> tuple:
+        if set(labels) != set(self._labelnames):
+            raise ValueError(f"Metric {self._name} expects the labels {', '.join(self._labelnames)}.")
+        return tuple(str(labels[name]) for name in self._labelnames)
+
+    def _labels(self, key:tuple, extra:dict=None) -> str:
+        pairs = list(zip(self._labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self._name} {self._help}", f"# TYPE {self._name} {self.TYPE}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key:tuple, value) -> list[str]:
+        return [f"{self._name}{self._labels(key)} {_format(value)}"]
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount:float=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value:float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """
+    Cumulative histogram with fixed bucket upper bounds, plus the sum and count of the observations.
+    """
+    TYPE = "histogram"
+
+    def __init__(self, name:str, help:str, labelnames:tuple=(), buckets:tuple=()) -> None:
+        super().__init__(name, help, labelnames)
+        # the last bucket (+Inf) counts every observation
+        self._buckets = tuple(sorted(set(buckets) | {math.inf}))
+
+    def observe(self, value:float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self._buckets), 0.0))
+            for n, bound in enumerate(self._buckets):
+                if value <= bound:
+                    counts[n] += 1
+            self._values[key] = (counts, total + value)
+
+    def _samples(self, key:tuple, value) -> list[str]:
+        counts, total = value
+        lines = [
+            f"{self._name}_bucket{self._labels(key, {'le': _format(bound)})} {count}"
+            for bound, count in zip(self._buckets, counts)
+        ]
+        lines.append(f"{self._name}_sum{self._labels(key)} {_format(total)}")
+        lines.append(f"{self._name}_count{self._labels(key)} {counts[-1]}")
+        return lines
+
+class MetricsRegistry():
+    """
+    Metrics of the service, exposed in the Prometheus text format (version 0.0.4) by GET /metrics.
+    """
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name:str, help:str, labelnames:tuple=()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name:str, help:str, labelnames:tuple=()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name:str, help:str, labelnames:tuple=(), buckets:tuple=()) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric:_Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+def _format(value:float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return str(value)
+
+# --- Metrics of the measurement service --- #
+registry = MetricsRegistry()
+
+# from a few milliseconds (chart, saving) to the whole slab acquisition
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+stage_duration = registry.histogram(
+    "lidar_measurement_stage_duration_seconds",
+    "Duration of each stage of the measurement routine.",
+    ("stage",), STAGE_BUCKETS
+)
+stage_last_duration = registry.gauge(
+    "lidar_measurement_stage_last_duration_seconds",
+    "Duration of each stage in the last measurement.",
+    ("stage",)
+)
+measurements_total = registry.counter(
+    "lidar_measurements_total",
+    "Measurements run, by result.",
+    ("result",)
+)
+scans_received_total = registry.counter("lidar_scans_received_total", "Scans stored by the acquisitions.")
+frames_dropped_total = registry.counter("lidar_frames_dropped_total", "Telegrams dropped because the acquisition queue was full.")
+points_acquired_total = registry.counter("lidar_points_acquired_total", "Points acquired by the measurements.")
+last_scans = registry.gauge("lidar_last_scans", "Scans of the last measurement, received and expected from its duration.", ("kind",))
+last_points = registry.gauge("lidar_last_points", "Points of the last measurement, acquired and kept by the filters.", ("kind",))
+last_warping = registry.gauge("lidar_last_warping_meters", "Warping of the last measurement.")
+motor_start_skew = registry.gauge(
+    "lidar_motor_start_skew_seconds",
+    "Time from the sensor being ready to the motor start confirmation in the last measurement (negative: motor first)."
+)
+scans_missing_total = registry.counter(
+    "lidar_scans_missing_total",
+    "Scans missing in the scan counter of the sensors, by where they were lost.",
+    ("where",)
+)
+last_scan_latency = registry.gauge(
+    "lidar_last_scan_latency_seconds",
+    "Telegram latency (reception minus transmission, above the minimum) in the last measurement, by sensor and quantile.",
+    ("sensor", "quantile")
+)
+last_scan_rate = registry.gauge("lidar_last_scan_rate_hertz", "Scans received per second in the last measurement, by sensor.", ("sensor",))
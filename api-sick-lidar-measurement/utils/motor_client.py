@@ -0,0 +1,49 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.logger_config import logger
+
+class MotorClient():
+    """
+    Client of the ESP32 motor control API, kept for the life of the measurement service.
+    - One requests.Session, so the TCP connection is reused (keep-alive) between measurements.
+    - connect_timeout / read_timeout bound every request, in seconds.
+    - retries: new attempts only when the connection could not be opened, so a start that reached
+      the motor API is never sent twice.
+    """
+    def __init__(self, ip:str, port:int, connect_timeout:float=1.0, read_timeout:float=5.0, retries:int=2) -> None:
+        self._url = f"http://{ip}:{port}"
+        self._timeout = (connect_timeout, read_timeout)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=2,
+            max_retries=Retry(total=retries, connect=retries, read=0, status=0, other=0, backoff_factor=0.05)
+        )
+        self._session.mount("http://", adapter)
+
+    @property
+    def url(self):
+        return self._url
+
+    def start(self):
+        """
+        Starts the motor routine and returns once the motor API confirms it is running.
+        """
+        try:
+            response = self._session.post(f"{self._url}/start", timeout=self._timeout)
+        except requests.RequestException as e:
+            raise Exception(f"Error in requisition: {e}")
+
+        if response.status_code == 200:
+            message = response.json().get("message")
+        else:
+            raise Exception(f"Error in requisition: {response.status_code}")
+
+        # Check if the motor is running
+        if not (message == "running"):
+            raise Exception(f"Error starting the motor: {message}")
+
+    def close(self):
+        self._session.close()
+        logger.info("Motor client closed.")
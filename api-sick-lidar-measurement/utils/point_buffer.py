@@ -0,0 +1,58 @@
+import numpy as np
+
+class PointBuffer():
+    """
+    Growable (N, 3) NumPy array of points, used to accumulate the scans of one acquisition.
+    - The storage is preallocated and doubles when full, so appends are amortized O(1) and no Python object is kept per point.
+    - view() returns the filled part without copying it.
+    """
+    def __init__(self, dtype=np.float64, initial_capacity:int=1_000_000) -> None:
+        self._dtype = np.dtype(dtype)
+        self._data = np.empty((max(initial_capacity, 1), 3), dtype=self._dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def append(self, points: np.ndarray) -> None:
+        """
+        Copies an (M, 3) array of points (e.g. one scan) into the storage.
+        """
+        count = len(points)
+        if self._size + count > len(self._data):
+            self._grow(self._size + count)
+        self._data[self._size:self._size + count] = points
+        self._size += count
+
+    def view(self) -> np.ndarray:
+        """
+        Filled part of the storage, without copy.
+        - The view is invalidated by the next append that needs to grow the storage.
+        """
+        return self._data[:self._size]
+
+    def clear(self) -> None:
+        """
+        Empties the buffer keeping the allocated storage for the next acquisition.
+        """
+        self._size = 0
+
+    def _grow(self, required: int) -> None:
+        capacity = len(self._data)
+        while capacity < required:
+            capacity *= 2
+        data = np.empty((capacity, 3), dtype=self._dtype)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
@@ -0,0 +1,102 @@
+import json
+import threading
+from os import listdir, makedirs, remove, stat
+from os.path import join, exists, splitext
+from time import time
+from utils.logger_config import logger
+from utils.PointCloudManager import PointCloudManager
+
+class PointCloudWriter():
+    """
+    Saves the point clouds of the measurements (in the post-processing workers) and applies the retention policy.
+    - format:
+        - pcd: binary PCD (Open3D).
+        - pcd_compressed: binary_compressed PCD (Open3D).
+        - pcd_ascii: ASCII PCD (Open3D), the biggest one.
+        - npy: float32 NumPy array, that can be memory-mapped back.
+      Every format gets a JSON sidecar (name.json) with the metadata of the measurement.
+    - Retention (zero disables each rule), applied by apply_retention after every measurement:
+        - max_files: number of point clouds kept.
+        - max_age_days: age of the oldest point cloud kept.
+        - max_total_mb: total size of the directory.
+    """
+    FORMATS = ("pcd", "pcd_compressed", "pcd_ascii", "npy")
+    EXTENSIONS = (".pcd", ".ply", ".npy")
+
+    def __init__(self, directory:str, format:str="pcd", max_files:int=0, max_age_days:float=0, max_total_mb:float=0) -> None:
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported storage format: {format}. Use one of {', '.join(self.FORMATS)}.")
+        self._directory = directory
+        self._format = format
+        self._max_files = max_files
+        self._max_age_days = max_age_days
+        self._max_total_mb = max_total_mb
+        self._retention_lock = threading.Lock()
+
+        if not exists(self._directory):
+            makedirs(self._directory)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def path_for(self, name:str) -> str:
+        """
+        Full path of the file that will be written for the name (without extension).
+        """
+        return join(self._directory, name + (".npy" if self._format == "npy" else ".pcd"))
+
+    def write(self, pcm:PointCloudManager, name:str, metadata:dict=None) -> str:
+        """
+        Saves the point cloud as name (without extension) in the calling thread, without the retention policy,
+        and returns the written path (used by the post-processing workers).
+        """
+        filename = join(self._directory, name)
+        if self._format == "npy":
+            pcm.save_to_npy(filename, metadata)
+        else:
+            pcm.save_to_file(
+                filename=filename,
+                format='pcd',
+                compressed=self._format == "pcd_compressed",
+                write_ascii=self._format == "pcd_ascii"
+            )
+            with open(filename + ".json", "w") as file:
+                json.dump(metadata or {}, file, indent=2, default=str)
+        return self.path_for(name)
+
+    def apply_retention(self):
+        """
+        Deletes the oldest point clouds (and their sidecars) that break the retention rules.
+        """
+        with self._retention_lock:
+            files = []
+            for entry in listdir(self._directory):
+                base, extension = splitext(entry)
+                if extension in self.EXTENSIONS:
+                    path = join(self._directory, entry)
+                    sidecar = join(self._directory, base + ".json")
+                    info = stat(path)
+                    size = info.st_size + (stat(sidecar).st_size if exists(sidecar) else 0)
+                    files.append((info.st_mtime, path, sidecar, size))
+            files.sort()    # oldest first
+
+            total = sum(size for _, _, _, size in files)
+            now = time()
+            removed = 0
+            while files:
+                mtime, path, sidecar, size = files[0]
+                too_many = self._max_files > 0 and len(files) > self._max_files
+                too_old = self._max_age_days > 0 and now - mtime > self._max_age_days * 86400
+                too_big = self._max_total_mb > 0 and total > self._max_total_mb * 1024 * 1024
+                if not (too_many or too_old or too_big):
+                    break
+                remove(path)
+                if exists(sidecar):
+                    remove(sidecar)
+                total -= size
+                removed += 1
+                files.pop(0)
+
+            if removed:
+                logger.info(f"Retention policy removed {removed} point cloud(s) from {self._directory}.")
@@ -0,0 +1,174 @@
+import numpy as np
+import threading
+import multiprocessing
+from time import perf_counter
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.logger_config import logger
+
+class PostProcessor():
+    """
+    Runs the CPU-bound stages of a measurement (loading, filtering, warping and saving) in worker processes,
+    so they do not compete with the acquisition threads for the GIL and slab N is processed while slab N+1 is acquired.
+    - The points are handed over in shared memory: they are copied once into a SharedMemory block, which the
+      worker attaches by name and loads into Open3D, so the array is never pickled.
+    - The block is released when the worker is done with it, whatever the result.
+    - workers: processes of the pool, started with "spawn" (the API process has running threads).
+    - A worker that dies (OOM kill, crash in Open3D) breaks the whole pool: the measurements running in it fail,
+      and the pool is replaced by a new one, so the next measurements are not affected.
+    """
+    def __init__(self, workers:int=1) -> None:
+        if workers < 1:
+            raise ValueError("At least one post-processing worker is required.")
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    @property
+    def workers(self):
+        return self._workers
+
+    def start(self):
+        """
+        Starts the worker processes now (they import Open3D), so the first measurement does not wait for them.
+        """
+        with self._lock:
+            self._start_workers()
+
+    def submit(self, points:np.ndarray, task:dict):
+        """
+        Copies the (N, 3) points into shared memory and queues their post-processing.
+        - task: see _post_process.
+        - Returns the Future of the result; the points can be reused as soon as this returns.
+        """
+        points = np.ascontiguousarray(points)
+        block = SharedMemory(create=True, size=max(points.nbytes, 1))
+        try:
+            shared = np.ndarray(points.shape, dtype=points.dtype, buffer=block.buf)
+            shared[:] = points
+            del shared
+            with self._lock:
+                executor = self._executor
+                try:
+                    future = executor.submit(_post_process, block.name, points.shape, points.dtype.str, task)
+                except BrokenProcessPool:
+                    # broken since the last measurement, this one did not start yet
+                    executor = self._restart(executor)
+                    future = executor.submit(_post_process, block.name, points.shape, points.dtype.str, task)
+        except Exception:
+            block.close()
+            block.unlink()
+            raise
+        future.add_done_callback(lambda done: self._done(done, executor, block))
+        return future
+
+    def shutdown(self, wait:bool=True):
+        with self._lock:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _done(self, future, executor:ProcessPoolExecutor, block:SharedMemory):
+        _release(block)
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            with self._lock:
+                self._restart(executor)
+
+    def _restart(self, broken:ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """
+        Replaces the broken pool (the lock must be held); does nothing if it was already replaced.
+        """
+        if self._executor is broken:
+            logger.warning("A post-processing worker terminated abruptly, starting a new pool.")
+            broken.shutdown(wait=False)
+            self._executor = self._new_executor()
+            self._start_workers()
+        return self._executor
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _start_workers(self):
+        for _ in range(self._workers):
+            self._executor.submit(_warm_up)
+
+def warping_task(conf) -> dict:
+    """
+    Filtering and warping parameters of the Config, as used by compute_warping.
+    """
+    return {
+        "warping_method": conf.warping_method,
+        "distance": conf.distance,
+        "filter_method": conf.FILTER_method,
+        "filter_params": conf.FILTER_params,
+        "wmlss_params": conf.WMLSS_params,
+        "surface_params": conf.SURFACE_params,
+    }
+
+def compute_warping(pcm, task:dict, timings:dict) -> tuple:
+    """
+    Filtering and warping of the loaded point cloud with the parameters of the task (see warping_task).
+    - Returns the warping, its plot (None for WMLSS) and the slabs (WMLSS only); adds the stage durations to timings.
+    """
+    start = perf_counter()
+    pcm.filter_by_distance(task["distance"], task["filter_method"], task["filter_params"])
+    timings["filtering"] = perf_counter() - start
+
+    start = perf_counter()
+    plot, slabs = None, []
+    if task["warping_method"] == "wmlss":
+        warping, slabs = pcm.WMLSS(**task["wmlss_params"])
+    elif task["warping_method"] == "surface":
+        warping, plot = pcm.WMRSF(**task["surface_params"])
+    elif task["warping_method"] == "wmuss":
+        warping, plot = pcm.WMUSS()
+    else:
+        raise ValueError(f"Unsupported warping method: {task['warping_method']}. Use wmuss, surface or wmlss.")
+    timings["warping"] = perf_counter() - start
+    return warping, plot, slabs
+
+def _release(block:SharedMemory):
+    block.close()
+    block.unlink()
+
+def _warm_up():
+    import utils.PointCloudManager    # noqa: F401
+
+def _post_process(name:str, shape:tuple, dtype:str, task:dict) -> dict:
+    """
+    Worker side of PostProcessor.submit.
+    - task: warping_task of the Config, plus
+        - warping_method "incremental": warping already computed, only loading and saving.
+        - storage: {"directory", "format", "name"} of the PointCloudWriter file.
+        - metadata: saved with the point cloud, completed with the warping, slabs and points.
+    - Returns the warping, plot, slabs, points, file path and the duration of each stage.
+    """
+    from utils.PointCloudManager import PointCloudManager
+    from utils.point_cloud_writer import PointCloudWriter
+
+    timings = {}
+    pcm = PointCloudManager()
+
+    start = perf_counter()
+    block = SharedMemory(name=name)
+    try:
+        pcm.load_from_array(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+    finally:
+        block.close()
+    timings["loading"] = perf_counter() - start
+
+    warping, plot, slabs = None, None, []
+    if task["warping_method"] != "incremental":
+        warping, plot, slabs = compute_warping(pcm, task, timings)
+
+    points = len(pcm.point_cloud.points)
+    storage = task["storage"]
+    metadata = dict(task["metadata"], points=points, slabs=slabs)
+    if warping is not None:
+        metadata["warping"] = warping
+
+    start = perf_counter()
+    path = PointCloudWriter(storage["directory"], storage["format"]).write(pcm, storage["name"], metadata)
+    timings["saving"] = perf_counter() - start
+    logger.info(f"Post-processing of {storage['name']} done: " + ", ".join(f"{stage} {seconds:.3f} s" for stage, seconds in timings.items()))
+
+    return {"warping": warping, "plot": plot, "slabs": slabs, "points": points, "file_path": path, "timings": timings}
@@ -0,0 +1,152 @@
+import csv
+import json
+import sqlite3
+import hashlib
+from os import listdir, stat, cpu_count
+from os.path import join, splitext, basename
+from time import perf_counter
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.logger_config import logger
+from utils.measurement_history import local_time
+
+# Columns of the results file, in order
+COLUMNS = ("file", "timestamp", "warping_method", "parameters", "points", "filtered_points", "warping", "warping_cm", "slabs", "duration", "cached", "error")
+
+class ResultCache():
+    """
+    SQLite cache of the reprocessing results, so an interrupted or repeated run only processes what is missing.
+    - Key: hash of the parameter set + file path, size and modification time, so a rewritten file is processed again.
+    """
+    def __init__(self, path:str) -> None:
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL)")
+
+    @staticmethod
+    def parameters_key(task:dict) -> str:
+        return hashlib.sha256(json.dumps(task, sort_keys=True).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def key(parameters_key:str, path:str) -> str:
+        info = stat(path)
+        return f"{parameters_key}:{path}:{info.st_size}:{info.st_mtime_ns}"
+
+    def get(self, key:str):
+        row = self._connection.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key:str, result:dict):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)", (key, json.dumps(result)))
+
+    def close(self):
+        self._connection.close()
+
+def find_point_clouds(directory:str, start:datetime=None, end:datetime=None) -> list[str]:
+    """
+    Point clouds saved by Measurement in the directory (.pcd, .ply and .npy), oldest first.
+    - start/end: timestamp range (inclusive) from the file name (YYYYMMDD_HHMMSS); files without it are left out
+      when a range is given.
+    """
+    start = local_time(start) if start else None
+    end = local_time(end) if end else None
+    files = []
+    for entry in listdir(directory):
+        base, extension = splitext(entry)
+        if extension not in (".pcd", ".ply", ".npy"):
+            continue
+        timestamp = _timestamp(base)
+        if (start or end) and timestamp is None:
+            continue
+        if (start and timestamp < start) or (end and timestamp > end):
+            continue
+        files.append(join(directory, entry))
+    return sorted(files)
+
+def reprocess(files:list[str], task:dict, cache:ResultCache, workers:int=None) -> list[dict]:
+    """
+    Loads, filters and computes the warping of every file with the task parameters (see post_processing.warping_task),
+    in a pool of worker processes (one per CPU core by default).
+    - Cached results for the same parameters and file are reused; new results are cached as soon as they arrive.
+    - A file that fails gives a row with its error instead of stopping the run.
+    - Returns one row per file (see COLUMNS), in the order of the files.
+    """
+    if task["warping_method"] == "incremental":
+        raise ValueError("The incremental method needs the scans of the acquisition; use wmuss, surface or wmlss to reprocess.")
+    if task["filter_method"] == "scanline":
+        raise ValueError("The scan line filter needs the scans of the acquisition; use the statistical, voxel or none filter to reprocess.")
+    parameters = ResultCache.parameters_key(task)
+    rows, pending = {}, {}
+    for path in files:
+        key = ResultCache.key(parameters, path)
+        cached = cache.get(key)
+        if cached is not None:
+            rows[path] = dict(cached, cached=True)
+        else:
+            pending[path] = key
+    logger.info(f"Reprocessing {len(pending)} of {len(files)} point clouds ({len(files) - len(pending)} cached, parameters {parameters}).")
+
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or cpu_count()) as executor:
+        futures = {executor.submit(_reprocess_file, path, task): path for path in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            row = dict(future.result(), parameters=parameters)
+            if not row["error"]:
+                cache.put(pending[path], row)
+            rows[path] = dict(row, cached=False)
+            if done % 50 == 0 or done == len(futures):
+                logger.info(f"Reprocessed {done} of {len(futures)} point clouds in {perf_counter() - start:.1f} s.")
+    return [rows[path] for path in files]
+
+def write_results(rows:list[dict], path:str):
+    """
+    Writes the rows as CSV, or as Parquet if the path ends with .parquet (requires pandas with pyarrow).
+    - The results stay in the cache, so a failed write only needs a new run with another output.
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pandas as pd
+            pd.DataFrame(rows, columns=COLUMNS).to_parquet(path, index=False)
+        except ImportError:
+            raise Exception("Parquet output requires pandas and pyarrow (pip install pandas pyarrow), or use a .csv file.")
+    else:
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    logger.info(f"{len(rows)} results written to {path}.")
+
+def _reprocess_file(path:str, task:dict) -> dict:
+    from utils.PointCloudManager import PointCloudManager
+    from utils.post_processing import compute_warping
+
+    start = perf_counter()
+    timestamp = _timestamp(splitext(basename(path))[0])
+    row = {
+        "file": path,
+        "timestamp": timestamp.isoformat() if timestamp else None,
+        "warping_method": task["warping_method"],
+        "points": None, "filtered_points": None, "warping": None, "warping_cm": None, "slabs": None,
+        "error": None,
+    }
+    try:
+        pcm = PointCloudManager()
+        pcm.load_from_file(path)
+        row["points"] = len(pcm.point_cloud.points)
+        warping, _, slabs = compute_warping(pcm, task, {})
+        row["filtered_points"] = len(pcm.point_cloud.points)
+        row["warping"] = warping
+        row["warping_cm"] = round(warping * 100, 3)
+        row["slabs"] = json.dumps([{"slab": slab["slab"], "warping": slab["warping"]} for slab in slabs]) if slabs else None
+    except Exception as e:
+        row["error"] = str(e)
+    row["duration"] = perf_counter() - start
+    return row
+
+def _timestamp(name:str):
+    try:
+        return datetime.strptime(name, "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
@@ -0,0 +1,79 @@
+from functools import lru_cache
+import numpy as np
+
+# Value of each ASCII character as a hexadecimal digit (0 for any other character)
+_HEX_DIGITS = np.zeros(256, dtype=np.uint64)
+for _value, _char in enumerate(b"0123456789ABCDEF"):
+    _HEX_DIGITS[_char] = _value
+    _HEX_DIGITS[bytes([_char]).lower()[0]] = _value
+
+@lru_cache(maxsize=16)
+def trig_tables(start_angle: float, angle_step: float, value_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine and sine of every beam angle of a scan, in degrees.
+    - Cached by sensor configuration, so the trigonometry is computed once and not once per scan.
+    - The returned arrays are read-only because they are shared between scans.
+    """
+    angles = np.radians(start_angle + angle_step * np.arange(value_count))
+    cos, sin = np.cos(angles), np.sin(angles)
+    cos.flags.writeable = False
+    sin.flags.writeable = False
+    return cos, sin
+
+def to_points(
+        distances: np.ndarray,
+        start_angle: float,
+        angle_step: float,
+        z: float,
+        dtype=np.float64
+    ) -> np.ndarray:
+    """
+    Converts the polar distances of one scan into an (N, 3) array of [x, y, z] points.
+    """
+    cos, sin = trig_tables(start_angle, angle_step, len(distances))
+    points = np.empty((len(distances), 3), dtype=dtype)
+    np.multiply(distances, cos, out=points[:, 0], casting='unsafe')
+    np.multiply(distances, sin, out=points[:, 1], casting='unsafe')
+    points[:, 2] = z
+    return points
+
+def decode_hex_tokens(raw: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Decodes many hexadecimal ASCII tokens at once.
+    - raw: telegram bytes as an uint8 array.
+    - starts/ends: position of the first character and position after the last character of each token.
+    """
+    lengths = ends - starts
+    # position of every digit in raw and its weight (power of 16) inside its token
+    first_digit = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    digit_index = np.arange(len(first_digit)) - first_digit
+    positions = np.repeat(starts, lengths) + digit_index
+    shifts = (np.repeat(lengths, lengths) - digit_index - 1).astype(np.uint64) * np.uint64(4)
+    weighted = _HEX_DIGITS[raw[positions]] << shifts
+    return np.add.reduceat(weighted, np.cumsum(lengths) - lengths)
+
+def pose_transform(pose: tuple, dtype=np.float64) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rotation matrix and translation of an extrinsic pose (x, y, z, roll, pitch, yaw), in meters and degrees.
+    - The rotation is applied as yaw (about Z) * pitch (about Y) * roll (about X); points are transformed with p @ R.T + t.
+    """
+    x, y, z, roll, pitch, yaw = pose
+    r, p, w = np.radians([roll, pitch, yaw])
+    rot_x = np.array([[1, 0, 0], [0, np.cos(r), -np.sin(r)], [0, np.sin(r), np.cos(r)]])
+    rot_y = np.array([[np.cos(p), 0, np.sin(p)], [0, 1, 0], [-np.sin(p), 0, np.cos(p)]])
+    rot_z = np.array([[np.cos(w), -np.sin(w), 0], [np.sin(w), np.cos(w), 0], [0, 0, 1]])
+    return (rot_z @ rot_y @ rot_x).astype(dtype), np.array([x, y, z], dtype=dtype)
+
+def scanline_inliers(y: np.ndarray, window: int = 2, threshold: float = 0.01, min_neighbors: int = 1) -> np.ndarray:
+    """
+    Mask of the points of one scan kept by the scan line outlier filter, a 1-D neighbor filter in scan order.
+    - y: Y of the points of the scan, in the sensor frame (before the pose), in beam order.
+    - Neighbors of a point are the `window` points before and after it in the scan.
+    - A point is kept if at least `min_neighbors` of them are within `threshold` meters in Y.
+    """
+    support = np.zeros(len(y), dtype=np.int32)
+    for k in range(1, window + 1):
+        neighbors = np.abs(y[k:] - y[:-k]) <= threshold
+        support[k:] += neighbors
+        support[:-k] += neighbors
+    return support >= min_neighbors
@@ -0,0 +1,90 @@
+import threading
+from collections import namedtuple
+import numpy as np
+
+# Header fields of an LMDscandata telegram; times in microseconds of the sensor clock
+ScanHeader = namedtuple("ScanHeader", ("telegram_counter", "scan_counter", "time_since_startup", "time_of_transmission", "device_status"))
+
+class ScanMonitor():
+    """
+    Scan loss and throughput of one acquisition, from the header of every parsed telegram.
+    - Gaps in the scan counter are scans that never got parsed: lost before the host (sensor or network)
+      or dropped by the acquisition queue. Only meaningful when every scan is sent (continuous, stream mode).
+    - Latency: reception time on the host minus time of transmission on the sensor. The two clocks have an unknown
+      offset, so it is given above the smallest value of the acquisition (network and buffering delay, not absolute).
+    - Parsing: time between the reception of a telegram and the end of its parsing (queue wait included).
+    """
+    COUNTER_MODULO = 1 << 16        # scan counter, 16 bits
+    CLOCK_MODULO = 1 << 32          # sensor clock, 32 bits in microseconds
+
+    def __init__(self, continuous:bool=True) -> None:
+        self._continuous = continuous
+        self._scan_counters = []
+        self._transmissions = []
+        self._received = []
+        self._parsed = []
+        self._status_errors = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._scan_counters)
+
+    def add(self, header:ScanHeader, received:float, parsed:float) -> None:
+        """
+        Records one scan, in scan order.
+        - received, parsed: perf_counter() when the telegram was read and when its parsing ended.
+        """
+        with self._lock:
+            self._scan_counters.append(header.scan_counter)
+            self._transmissions.append(header.time_of_transmission)
+            self._received.append(received)
+            self._parsed.append(parsed)
+            if any(header.device_status):
+                self._status_errors += 1
+
+    def summary(self, dropped:int=0) -> dict:
+        """
+        Per-acquisition summary; dropped: telegrams discarded by the acquisition queue (they show up as gaps).
+        """
+        with self._lock:
+            scans = len(self._scan_counters)
+            if scans < 2:
+                return {"scans": scans}
+            counters = np.asarray(self._scan_counters, dtype=np.int64)
+            transmissions = self._unwrap(np.asarray(self._transmissions, dtype=np.int64), self.CLOCK_MODULO) / 1e6
+            received = np.asarray(self._received)
+            parsed = np.asarray(self._parsed)
+            status_errors = self._status_errors
+
+        steps = np.diff(counters) % self.COUNTER_MODULO
+        duration = float(received[-1] - received[0])
+        sensor_duration = float(transmissions[-1] - transmissions[0])
+        offsets = received - transmissions
+        summary = {
+            "scans": scans,
+            "duration": duration,
+            "scan_rate": (scans - 1) / duration if duration > 0 else None,
+            "sensor_scan_rate": float(steps.sum()) / sensor_duration if sensor_duration > 0 else None,
+            "status_errors": status_errors,
+            "latency_ms": self._percentiles((offsets - offsets.min()) * 1000),
+            "parse_ms": self._percentiles((parsed - received) * 1000),
+        }
+        if self._continuous:
+            missing = int((steps - 1).clip(min=0).sum())
+            summary.update({
+                "missing_scans": missing,
+                "gaps": int(np.count_nonzero(steps > 1)),
+                "largest_gap": int(steps.max() - 1),
+                "dropped_by_host": dropped,
+                "lost_before_host": max(0, missing - dropped),
+            })
+        return summary
+
+    @staticmethod
+    def _unwrap(values:np.ndarray, modulo:int) -> np.ndarray:
+        return values[0] + np.r_[0, np.cumsum(np.diff(values) % modulo)]
+
+    @staticmethod
+    def _percentiles(values:np.ndarray) -> dict:
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(values.max())}
@@ -0,0 +1,127 @@
+import threading
+import numpy as np
+from time import perf_counter
+from utils.lidar_sensor import LidarSensor
+from utils.logger_config import logger
+
+class SensorArray():
+    """
+    Acquisition from N sensors at the same time, merged into one cloud for PointCloudManager.
+    - Each sensor runs its own acquisition pipeline (reader and parser threads) in its own thread.
+    - The points are aligned by the encoder (Z, reset in every sensor at the start) and by the pose of each
+      sensor, so the merged cloud covers wider slabs or the lateral face in one pass.
+    - Same interface as LidarSensor for Measurement: listeners, abort(), pcd, counters and timings.
+    """
+    def __init__(self, sensors:list[LidarSensor]) -> None:
+        if not sensors:
+            raise ValueError("At least one sensor is required.")
+        self._sensors = sensors
+        self._timings = {}
+        self._ready_listeners = []
+        self._ready_count = 0
+        self._ready_lock = threading.Lock()
+        for sensor in self._sensors:
+            sensor.add_ready_listener(self._sensor_ready)
+
+    @property
+    def sensors(self):
+        return list(self._sensors)
+
+    @property
+    def pcd(self):
+        """
+        (N, 3) array with the points of all the sensors (without copy when there is only one sensor).
+        """
+        if len(self._sensors) == 1:
+            return self._sensors[0].pcd
+        return np.concatenate([sensor.pcd for sensor in self._sensors])
+
+    @property
+    def scans_received(self):
+        return sum(sensor.scans_received for sensor in self._sensors)
+
+    @property
+    def scans_expected(self):
+        return sum(sensor.scans_expected for sensor in self._sensors)
+
+    @property
+    def frames_dropped(self):
+        return sum(sensor.frames_dropped for sensor in self._sensors)
+
+    @property
+    def scan_summary(self):
+        """
+        Scan loss and latency summary of the last acquisition of each sensor, by sensor name.
+        """
+        return {sensor.name: sensor.scan_summary for sensor in self._sensors}
+
+    @property
+    def timings(self):
+        """
+        Timings of the sensor steps, prefixed by the sensor name when there are several sensors.
+        """
+        return dict(self._timings)
+
+    def add_scan_listener(self, listener):
+        """
+        Registers a callable(points) notified with the points of each scan of every sensor (from the sensor threads).
+        """
+        for sensor in self._sensors:
+            sensor.add_scan_listener(listener)
+
+    def add_ready_listener(self, listener):
+        """
+        Registers a callable() notified when all the sensors are ready and reading scans.
+        """
+        self._ready_listeners.append(listener)
+
+    def abort(self, error:Exception):
+        for sensor in self._sensors:
+            sensor.abort(error)
+
+    def data_acquisition_routine(self):
+        """
+        Runs the acquisition of every sensor concurrently and waits for all of them.
+        - If one sensor fails the others are aborted and the first error is raised.
+        """
+        self._ready_count = 0
+        self._timings = {}
+        if len(self._sensors) == 1:
+            try:
+                self._sensors[0].data_acquisition_routine()
+            finally:
+                self._timings = self._sensors[0].timings
+            return
+
+        errors = {}
+        def acquire(sensor:LidarSensor):
+            try:
+                sensor.data_acquisition_routine()
+            except Exception as e:
+                errors.setdefault(sensor.name, e)
+                self.abort(Exception(f"Acquisition aborted because {sensor.name} failed."))
+
+        start = perf_counter()
+        threads = [threading.Thread(target=acquire, args=(sensor,), name=f"{sensor.name}-acquisition", daemon=True) for sensor in self._sensors]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for sensor in self._sensors:
+            for step, seconds in sensor.timings.items():
+                self._timings[f"{sensor.name}_{step}"] = seconds
+        self._timings["scanning"] = perf_counter() - start
+
+        if errors:
+            name, error = next(iter(errors.items()))
+            raise Exception(f"Error in {name} acquisition: {error}")
+        logger.info(f"Sensor array acquisition done: {', '.join(f'{s.name} {len(s.pcd)} points' for s in self._sensors)}.")
+
+    def _sensor_ready(self):
+        with self._ready_lock:
+            self._ready_count += 1
+            if self._ready_count != len(self._sensors):
+                return
+        for listener in self._ready_listeners:
+            listener()
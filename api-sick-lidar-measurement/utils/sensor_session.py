@@ -0,0 +1,144 @@
+import socket
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+from utils.logger_config import logger
+
+class SensorSession():
+    """
+    Long-lived connection with the sensor, kept by the API process between measurements.
+    - A keepalive thread checks the connection (heartbeat telegram) while no measurement is running
+      and reconnects when it is lost; TCP keepalive is enabled as well.
+    - Configuration telegrams are sent only when the requested configuration differs from the one applied
+      on the current connection (any reconnection applies it again, the sensor may have restarted).
+    - acquire() gives the communication object to one measurement at a time, with the encoder reset done.
+    """
+    def __init__(self, com_class, ip:str, port:int, dtype, encoder_resolution:float=0.2, keepalive_interval:float=5.0, timeout:float=2.0) -> None:
+        self._com_class = com_class
+        self._ip = ip
+        self._port = port
+        self._dtype = dtype
+        self._encoder_resolution = encoder_resolution
+        self._keepalive_interval = keepalive_interval
+        self._timeout = timeout
+        self._com = None
+        self._applied = {}          # configuration method -> kwargs applied on the current connection
+        self._timings = {}
+        self._connections = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._keepalive = None
+
+    @property
+    def connected(self):
+        return self._com is not None
+
+    @property
+    def connections(self):
+        """
+        Number of connections opened since the session started.
+        """
+        return self._connections
+
+    @property
+    def timings(self):
+        """
+        Duration, in seconds, of the connection, parameterization and encoder reset of the last acquire().
+        """
+        return dict(self._timings)
+
+    def start(self):
+        """
+        Starts the keepalive thread; the connection itself is opened on the first check or acquisition.
+        """
+        if self._keepalive_interval > 0 and self._keepalive is None:
+            self._keepalive = threading.Thread(target=self._keepalive_routine, name="sensor-keepalive", daemon=True)
+            self._keepalive.start()
+
+    def close(self):
+        self._stop.set()
+        if self._keepalive is not None:
+            self._keepalive.join()
+        with self._lock:
+            self._disconnect()
+
+    @contextmanager
+    def acquire(self, configuration:dict):
+        """
+        Gives the connected and configured communication object to one measurement.
+        - configuration: {configuration method of the protocol class: kwargs}, e.g. {"config_scandata_content": {}}.
+        - If the measurement fails the connection is closed, since its state is unknown (e.g. still streaming).
+        """
+        with self._lock:
+            self._timings = {}
+            try:
+                if self._com is None:
+                    start = perf_counter()
+                    self._connect()
+                    self._timings["connect"] = perf_counter() - start
+
+                # the encoder reset needs the authorized client access level, so it is done while logged in
+                start = perf_counter()
+                self._com.login()
+                self._configure(configuration)
+                self._timings["parameterize"] = perf_counter() - start
+
+                start = perf_counter()
+                self._com.reset_encoder_values()    # to ensure that the encoder will start at 0 mm
+                self._com.logout()
+                self._timings["encoder_reset"] = perf_counter() - start
+            except Exception as e:
+                self._disconnect()
+                raise Exception(f"Error in sensor session: {e}")
+
+            try:
+                yield self._com
+            except Exception:
+                self._disconnect()
+                raise
+
+    def _connect(self):
+        com = self._com_class(self._ip, self._port, self._dtype, self._encoder_resolution)
+        com.connect()
+        com.socket_sick.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        com.socket_sick.settimeout(self._timeout)
+        self._com = com
+        self._applied = {}
+        self._connections += 1
+        logger.info(f"Sensor session connected to {self._ip}:{self._port} (connection {self._connections}).")
+
+    def _disconnect(self):
+        if self._com is not None:
+            try:
+                self._com.release()
+            except Exception as e:
+                logger.warning(f"Error closing the sensor session: {e}")
+        self._com = None
+        self._applied = {}
+
+    def _configure(self, configuration:dict):
+        """
+        Sends the configuration telegrams not applied yet on this connection (the client must be logged in).
+        """
+        pending = {method: kwargs for method, kwargs in configuration.items() if self._applied.get(method) != kwargs}
+        if not pending:
+            return
+        for method, kwargs in pending.items():
+            getattr(self._com, method)(**kwargs)
+            self._applied[method] = dict(kwargs)
+        logger.info(f"LiDAR parameterization done ({', '.join(pending)}).")
+
+    def _keepalive_routine(self):
+        while not self._stop.wait(self._keepalive_interval):
+            # a running measurement is already using the connection
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._com is None:
+                    self._connect()
+                self._com.heartbeat()
+            except Exception as e:
+                logger.warning(f"Sensor session with {self._ip}:{self._port} lost, reconnecting on the next check: {e}")
+                self._disconnect()
+            finally:
+                self._lock.release()
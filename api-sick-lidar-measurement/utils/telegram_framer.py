@@ -0,0 +1,70 @@
+import socket
+
+class TelegramFramer():
+    """
+    Splits the CoLa A byte stream of a socket into STX (0x02) ... ETX (0x03) frames.
+    - Bytes are received with recv_into into one preallocated bytearray, which is reused for the whole connection.
+    - A recv may hold a partial telegram or several coalesced ones; every complete frame is returned, one per call.
+    - Frames are memoryviews into the buffer (no copy and no decode), valid only until the next call to next_frame().
+    """
+    STX = 0x02
+    ETX = 0x03
+
+    def __init__(self, sock: socket.socket, capacity: int = 65536) -> None:
+        self._socket = sock
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # --- Unconsumed bytes are in self._buffer[self._start:self._end] --- #
+        self._start = 0
+        self._end = 0
+
+    @property
+    def capacity(self):
+        return len(self._buffer)
+
+    def reset(self) -> None:
+        """
+        Discards every byte received and not consumed yet.
+        """
+        self._start = 0
+        self._end = 0
+
+    def next_frame(self) -> memoryview:
+        """
+        Returns the content of the next complete frame, without STX and ETX.
+        """
+        while True:
+            etx = self._buffer.find(self.ETX, self._start, self._end)
+            if etx >= 0:
+                stx = self._buffer.rfind(self.STX, self._start, etx)
+                self._start = etx + 1
+                if stx >= 0:
+                    return self._view[stx + 1:etx]
+                # bytes without a STX before the ETX are not a telegram
+                continue
+            self._receive()
+
+    def _receive(self) -> None:
+        """
+        Receives more bytes after the unconsumed ones, making room in the buffer if needed.
+        """
+        if self._start == self._end:
+            self.reset()
+        elif self._end == len(self._buffer):
+            pending = self._end - self._start
+            if pending == len(self._buffer):
+                # a single frame is bigger than the buffer (e.g. a wider angular range)
+                buffer = bytearray(2 * len(self._buffer))
+                buffer[:pending] = self._view[self._start:self._end]
+                self._buffer = buffer
+                self._view = memoryview(self._buffer)
+            else:
+                # move the partial frame to the beginning of the buffer
+                self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = pending
+
+        n = self._socket.recv_into(self._view[self._end:])
+        if n == 0:
+            raise ConnectionError("The LiDAR closed the connection.")
+        self._end += n
@@ -0,0 +1,87 @@
+import io
+import threading
+from uuid import uuid4
+from time import perf_counter
+import numpy as np
+from matplotlib.figure import Figure
+from utils import metrics
+
+class WarpingPlot():
+    """
+    Chart of the warping of one measurement, drawn only when it is requested.
+    - Keeps a per-Z-bin min/max envelope of Y instead of the points, so the rendering cost does not depend on the point count.
+    - The PNG is rendered once and cached; etag identifies it for HTTP caching.
+    """
+    def __init__(self, z:np.ndarray, y_min:np.ndarray, y_max:np.ndarray, mean:float, ucl:float, lcl:float, max_deviation_point:tuple, warping:float) -> None:
+        self._z = z
+        self._y_min = y_min
+        self._y_max = y_max
+        self._mean = mean
+        self._ucl = ucl
+        self._lcl = lcl
+        self._max_deviation_point = max_deviation_point    # (z, y)
+        self._warping = warping
+        self._etag = f'"{uuid4().hex}"'
+        self._png = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # sent back by the post-processing workers: the lock is not picklable
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def etag(self):
+        return self._etag
+
+    @classmethod
+    def from_points(cls, z:np.ndarray, y:np.ndarray, mean:float, ucl:float, lcl:float, max_deviation_point:tuple, warping:float, bins:int=1000):
+        """
+        Builds the envelope of Y along Z from the points, in one pass.
+        """
+        z_min, z_max = float(z.min()), float(z.max())
+        width = (z_max - z_min) / bins or 1.0
+        index = np.minimum(((z - z_min) / width).astype(np.int64), bins - 1)
+        y_min = np.full(bins, np.inf)
+        y_max = np.full(bins, -np.inf)
+        np.minimum.at(y_min, index, y)
+        np.maximum.at(y_max, index, y)
+        occupied = np.isfinite(y_min)
+        z_centers = z_min + (np.arange(bins) + 0.5) * width
+        return cls(z_centers[occupied], y_min[occupied], y_max[occupied], mean, ucl, lcl, max_deviation_point, warping)
+
+    def render(self) -> bytes:
+        """
+        PNG of the chart, rendered on the first call.
+        """
+        with self._lock:
+            if self._png is None:
+                start = perf_counter()
+                self._png = self._draw()
+                metrics.stage_duration.observe(perf_counter() - start, stage="render")
+            return self._png
+
+    def _draw(self) -> bytes:
+        # Figure without pyplot, so it can be drawn from any API thread
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        ax.fill_between(self._z, self._y_min, self._y_max, color='blue', alpha=0.5, linewidth=0, label='Filtered Points (min/max)')
+        ax.axhline(self._mean, color='green', linestyle='-', linewidth=2, label='Mean')
+        ax.axhline(self._ucl, color='red', linestyle='--', linewidth=2, label='UCL')
+        ax.axhline(self._lcl, color='red', linestyle='--', linewidth=2, label='LCL')
+        ax.scatter(self._max_deviation_point[0], self._max_deviation_point[1], color='red', s=50, label='Max Deviation')
+        ax.set_xlabel('Z')
+        ax.set_ylabel('Y')
+        ax.grid(True)
+        ax.legend(loc='upper right')
+        ax.set_title(f'Max Deviation (Warping): {(self._warping*100):.3f} cm')
+
+        # Save the image to a byte buffer
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()